@@ -1,6 +1,6 @@
 import json
 from functools import lru_cache
-from typing import Dict, List, Any ,Optional
+from typing import Dict, List, Any ,Optional, Callable, Awaitable
 from dataclasses import dataclass
 import os
 from openai import AsyncOpenAI
@@ -12,11 +12,11 @@ import logging
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from core.state import MarketingState
+from core.result_store import LazyResultSets, first_record, preview_result_sets
 import sys
 import re
 
 
-_sf_connected=False
 # logging.basicConfig removed to allow server.py to configure logging
 logger = logging.getLogger(__name__)
 # Choose the org that hosts these MemberDefinition records
@@ -53,11 +53,12 @@ def _load_planning_config(input_schema: Dict[str, Any], mcp_name: str) -> Dict[s
     }
 
 def ensure_sf_connected():
-    """Ensure Salesforce is connected (call this at runtime, not import time)"""
-    global _sf_connected
-    if not _sf_connected:
-        _sf_connected = sf_client.connect()
-    return _sf_connected
+    """Ensure Salesforce is connected (call this at runtime, not import time).
+
+    The client tracks session expiry itself, so this refreshes an expired or
+    soon-to-expire session instead of trusting a one-shot flag.
+    """
+    return sf_client.connect()
 @lru_cache
 def _load_agent_member_dependency_cached(
     parent_member: str 
@@ -69,8 +70,6 @@ def _load_agent_member_dependency_cached(
     if not sf_client.connect():
         raise RuntimeError(f"[{SF_ORG_TYPE}] Salesforce connection failed for MCP registry")
 
-    sf = sf_client.sf
-
     md_query = f"""
         SELECT Id, Name, EntityType__c, Description__c, Intent__c, Status__c,
                InputSchema__c, OutputSchema__c,ExecutionEndpoint__c
@@ -78,7 +77,7 @@ def _load_agent_member_dependency_cached(
         WHERE Status__c = 'Active'
           
     """
-    md_result = sf.query(md_query)
+    md_result = sf_client.run(lambda sf: sf.query(md_query))
     md_records = md_result.get("records", [])
 
     # 2) Get dependencies for the given parent_member and dependency_type
@@ -94,7 +93,7 @@ def _load_agent_member_dependency_cached(
 
     
     """
-    dep_result = sf.query(dep_query)
+    dep_result = sf_client.run(lambda sf: sf.query(dep_query))
     dep_records = dep_result.get("records", [])
 
     # Build a map: memberName -> list of dependency info
@@ -206,7 +205,7 @@ def fetch_prompt_metadata(template_name: str) -> Optional[Dict[str, Any]]:
         ORDER BY VersionNumber__c DESC 
         LIMIT 1
         """
-        version_result = sf_client.sf.query(version_query)
+        version_result = sf_client.run(lambda sf: sf.query(version_query))
         if not version_result['records']:
             logger.warning(f"No active version found for template {template_name}")
             return None
@@ -231,12 +230,12 @@ def fetch_prompt_metadata(template_name: str) -> Optional[Dict[str, Any]]:
         ORDER BY Name
         """
         try:
-            config_result = sf_client.sf.query(config_query)
+            config_result = sf_client.run(lambda sf: sf.query(config_query))
         except Exception as e:
             # Fallback for StatePath__c if it doesn't exist yet
             logger.warning(f"Failed to query StatePath__c, retrying without it: {e}")
             config_query = config_query.replace(",\n            StatePath__c", "")
-            config_result = sf_client.sf.query(config_query)
+            config_result = sf_client.run(lambda sf: sf.query(config_query))
         
         # Parse configs
         configs = []
@@ -784,7 +783,7 @@ def _is_batch_capable_tool(tool_meta: Dict[str, Any], tool_name: str) -> bool:
     
     Detection strategies:
     1. Tool name contains 'batch' (e.g., send_batch_emails, batch_upsert_salesforce_records)
-    2. Tool schema has array parameters like 'recipients' or 'records'
+    2. Tool schema has array parameters like 'recipients', 'records' or 'record_ids'
     3. Explicit configuration in MCP metadata
     
     Returns:
@@ -800,7 +799,7 @@ def _is_batch_capable_tool(tool_meta: Dict[str, Any], tool_name: str) -> bool:
     properties = schema.get("properties", {})
     
     # Check for array parameters that indicate batch support
-    batch_param_names = ['recipients', 'records', 'items', 'batch_data', 'message_versions']
+    batch_param_names = ['recipients', 'records', 'record_ids', 'items', 'batch_data', 'message_versions']
     for param_name, param_schema in properties.items():
         if param_name in batch_param_names:
             if param_schema.get("type") == "array":
@@ -822,7 +821,7 @@ def _get_batch_parameter_name(tool_meta: Dict[str, Any]) -> Optional[str]:
     properties = schema.get("properties", {})
     
     # Common batch parameter names in priority order
-    batch_param_candidates = ['message_versions', 'records', 'recipients', 'items', 'batch_data']
+    batch_param_candidates = ['message_versions', 'records', 'record_ids', 'recipients', 'items', 'batch_data']
     
     for param_name in batch_param_candidates:
         if param_name in properties:
@@ -833,6 +832,39 @@ def _get_batch_parameter_name(tool_meta: Dict[str, Any]) -> Optional[str]:
     return None
 
 
+def _collect_record_ids(resolved_args_list: List[Dict[str, Any]]) -> List[str]:
+    """
+    Gather record IDs from per-item resolved arguments for id-list batch tools
+    (e.g. delete_salesforce_records). Accepts either a single 'record_id' or a
+    'record_ids' list per item, and keeps first-seen order without duplicates.
+    """
+    record_ids: List[str] = []
+    seen = set()
+    for resolved_args in resolved_args_list:
+        candidates = resolved_args.get("record_ids")
+        if not isinstance(candidates, list):
+            candidates = [resolved_args.get("record_id") or resolved_args.get("Id")]
+        for record_id in candidates:
+            if record_id and record_id not in seen:
+                seen.add(record_id)
+                record_ids.append(record_id)
+    return record_ids
+
+
+def _resolve_id_batch_tool(tool_name: str, tools_meta: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Return the id-list batch tool to use instead of per-item calls, if any.
+
+    Matches the tool itself when it takes 'record_ids', or its plural sibling
+    (delete_salesforce_record -> delete_salesforce_records) when that exists.
+    """
+    for candidate in (tool_name, f"{tool_name}s"):
+        meta = next((t for t in tools_meta if t["name"] == candidate), None)
+        if meta and _get_batch_parameter_name(meta) == 'record_ids':
+            return candidate
+    return None
+
+
 def _prepare_batch_arguments(
     arguments: Dict[str, Any],
     batch_records: List[Dict[str, Any]],
@@ -920,8 +952,8 @@ async def call_mcp(
             all_tool_results: List[Dict[str, Any]] = []
             # Track multiple named result sets for cross-tool referencing
             # Initialize from SHARED state to allow cross-agent data access
-            import copy
-            result_sets: Dict[str, List[Dict[str, Any]]] = copy.deepcopy(state.get("shared_result_sets", {}))
+            # Stored (out-of-line) sets are loaded only when a call iterates them
+            result_sets: Dict[str, List[Dict[str, Any]]] = LazyResultSets(state.get("shared_result_sets") or {})
             previous_results: Optional[List[Dict[str, Any]]] = None  # Backward compatibility
             max_iterations = 10
             iteration = 0
@@ -1008,6 +1040,12 @@ async def call_mcp(
                             f"🔁 Processing {len(iteration_source)} items from '{iterate_over}'"
                         )
                         
+                        # ✅ BATCH OPTIMIZATION: Collapse per-record deletes into the id-list batch tool
+                        id_batch_tool = _resolve_id_batch_tool(tool_name, tools_meta)
+                        if id_batch_tool and id_batch_tool != tool_name:
+                            logging.info(f"🔀 [{service_name}] Collapsing per-item {tool_name} calls into {id_batch_tool}")
+                            tool_name = id_batch_tool
+
                         # ✅ BATCH OPTIMIZATION: Check if tool supports batch operations
                         tool_meta = next((t for t in tools_meta if t["name"] == tool_name), None)
                         supports_batch = tool_meta and _is_batch_capable_tool(tool_meta, tool_name)
@@ -1092,6 +1130,12 @@ async def call_mcp(
                                     "object_name": arguments.get("object_name", ""),
                                     "records": batch_records
                                 }
+                            elif _get_batch_parameter_name(tool_meta) == 'record_ids':
+                                # Salesforce delete_salesforce_records expects a flat list of IDs
+                                batch_args = {
+                                    **{k: v for k, v in arguments.items() if k not in ("record_id", "record_ids", "object_name")},
+                                    "record_ids": _collect_record_ids(batch_records)
+                                }
                             else:
                                 # Generic batch format
                                 batch_args = {
@@ -1430,7 +1474,7 @@ async def call_mcp_v2(
             
             # ✅ CRITICAL: Initialize result_sets with shared_result_sets from state
             shared_result_sets = state.get("shared_result_sets", {})
-            result_sets = shared_result_sets.copy() if shared_result_sets else {}
+            result_sets = LazyResultSets(shared_result_sets or {})
             
             if result_sets:
                 logging.info(f"   🔄 Initialized result_sets from session with keys: {list(result_sets.keys())}")
@@ -1447,7 +1491,7 @@ async def call_mcp_v2(
                 planning_context = {
                     "user_goal": state.get("user_goal"),
                     "session_context": state.get("session_context", {}),
-                    "shared_result_sets": result_sets,
+                    "shared_result_sets": preview_result_sets(result_sets),
                 }
                 
                 # Check if we have a plan override (resume from interrupt)
@@ -1660,6 +1704,34 @@ async def call_mcp_v2(
                             
                             logging.info(f"🔁 Iterating over {len(iteration_source)} items from '{iterate_over}'")
                             
+                            # ✅ BATCH OPTIMIZATION: One id-list call instead of N per-record deletes
+                            id_batch_tool = _resolve_id_batch_tool(tool_name, tools_meta)
+                            if id_batch_tool:
+                                resolved_list = [resolve_tool_placeholders(arguments, item, result_sets) for item in iteration_source]
+                                batch_args = {
+                                    **{k: v for k, v in arguments.items() if k not in ("record_id", "record_ids", "object_name")},
+                                    "record_ids": _collect_record_ids(resolved_list)
+                                }
+                                logging.info(f"   📦 Calling {id_batch_tool} once with {len(batch_args['record_ids'])} record ids")
+                                try:
+                                    result = await session.call_tool(id_batch_tool, batch_args)
+                                    is_error = getattr(result, 'isError', False)
+                                    iteration_results.append({
+                                        "tool_name": id_batch_tool,
+                                        "request": batch_args,
+                                        "response": result,
+                                        "status": "error" if is_error else "success"
+                                    })
+                                except Exception as e:
+                                    logging.error(f"   ❌ Batch call failed: {e}")
+                                    iteration_results.append({
+                                        "tool_name": id_batch_tool,
+                                        "request": batch_args,
+                                        "error": str(e),
+                                        "status": "error"
+                                    })
+                                continue
+                            
                             # Execute tool for each item
                             for item_idx, item in enumerate(iteration_source, start=1):
                                 resolved_args = resolve_tool_placeholders(arguments, item, result_sets)
@@ -2223,7 +2295,7 @@ def resolve_tool_placeholders(
                     
                     if actual_result_key:
                         # Get first item from named result set
-                        named_record = result_sets[actual_result_key][0]
+                        named_record = first_record(dict.get(result_sets, actual_result_key)) or {}
                         if field_name in named_record:
                             replacement = named_record[field_name]
                             
@@ -2319,10 +2391,12 @@ async def execute_single_tool(
     service_name: str,
     tool_name: str,
     arguments: Dict[str, Any],
+    progress_callback: Optional[Callable[[float, Optional[float], Optional[str]], Awaitable[None]]] = None,
 ) -> Dict[str, Any]:
     """
     Executes a SINGLE MCP tool directly without any planning logic.
     Useful for deterministic workflows (LangGraph nodes).
+    progress_callback receives the tool's progress notifications (see core.progress.tool_progress).
     """
 
     # Get config
@@ -2341,7 +2415,7 @@ async def execute_single_tool(
             logging.info(f"   Args: {json.dumps(arguments, indent=2)[:500]}...")
 
             try:
-                result = await session.call_tool(tool_name, arguments)
+                result = await session.call_tool(tool_name, arguments, progress_callback=progress_callback)
                 
                 # Check for error
                 is_error = getattr(result, 'isError', False)
@@ -0,0 +1,187 @@
+# core/checkpointer.py
+"""
+Disk-backed LangGraph checkpointer shared by all WebSocket sessions.
+
+Checkpoints live in SQLite (CHECKPOINT_DB_PATH) so a client can reconnect and
+resume its thread_id after a disconnect or server restart. Serialized state is
+compressed, each thread keeps only its last CHECKPOINT_KEEP_LAST checkpoints,
+and threads idle longer than CHECKPOINT_THREAD_TTL_SECONDS are deleted along
+with their stored result sets and tool payloads, which have no TTL of their
+own, so a resumable thread never holds expired handles.
+"""
+import asyncio
+import logging
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from core.result_store import result_store
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "10"))
+THREAD_TTL_SECONDS = int(os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", str(7 * 86400)))
+PRUNE_INTERVAL_SECONDS = int(os.getenv("CHECKPOINT_PRUNE_INTERVAL_SECONDS", "600"))
+COMPRESS_MIN_BYTES = 1024
+
+_pruner_task: Optional[asyncio.Task] = None
+
+
+def _default_db_path() -> Path:
+    override = os.getenv("CHECKPOINT_DB_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "checkpoints.sqlite3"
+
+
+class CompressedSerializer(JsonPlusSerializer):
+    """JsonPlus (msgpack) serialization with zstd (or zlib) compression for larger blobs."""
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = super().dumps_typed(obj)
+        if len(data) < COMPRESS_MIN_BYTES:
+            return type_, data
+        if zstandard is not None:
+            return f"zstd+{type_}", zstandard.ZstdCompressor(level=3).compress(data)
+        return f"zlib+{type_}", zlib.compress(data, 6)
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.startswith("zstd+"):
+            return super().loads_typed((type_[5:], zstandard.ZstdDecompressor().decompress(payload)))
+        if type_.startswith("zlib+"):
+            return super().loads_typed((type_[5:], zlib.decompress(payload)))
+        return super().loads_typed(data)
+
+
+async def open_checkpointer():
+    """SQLite checkpointer, or MemorySaver if langgraph-checkpoint-sqlite is not installed."""
+    try:
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+    except ImportError:
+        logging.warning("⚠️ langgraph-checkpoint-sqlite not installed; checkpoints will be kept in memory only")
+        return MemorySaver()
+
+    path = _default_db_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = await aiosqlite.connect(str(path))
+    await conn.execute("PRAGMA journal_mode=WAL")
+    saver = AsyncSqliteSaver(conn, serde=CompressedSerializer())
+    await saver.setup()
+    await conn.execute(
+        "CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+    )
+    await conn.commit()
+    logging.info(f"💾 Checkpoints stored in {path}")
+    return saver
+
+
+async def close_checkpointer(saver) -> None:
+    global _pruner_task
+    if _pruner_task:
+        _pruner_task.cancel()
+        _pruner_task = None
+    conn = getattr(saver, "conn", None)
+    if conn is not None:
+        await conn.close()
+
+
+async def thread_exists(saver, thread_id: str) -> bool:
+    return await saver.aget_tuple({"configurable": {"thread_id": thread_id}}) is not None
+
+
+async def touch_thread(saver, thread_id: str) -> None:
+    """Mark a thread active and trim its checkpoint history to the last KEEP_LAST."""
+    conn = getattr(saver, "conn", None)
+    if conn is None:
+        return
+    async with saver.lock:
+        await conn.execute(
+            "INSERT OR REPLACE INTO thread_activity (thread_id, last_seen) VALUES (?, ?)", (thread_id, time.time())
+        )
+        # checkpoint_id is a uuid6, so it sorts by creation time
+        await conn.execute(
+            """
+            DELETE FROM checkpoints WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, ROW_NUMBER() OVER (
+                        PARTITION BY checkpoint_ns ORDER BY checkpoint_id DESC
+                    ) AS rn
+                    FROM checkpoints WHERE thread_id = ?
+                ) WHERE rn > ?
+            )
+            """,
+            (thread_id, KEEP_LAST)
+        )
+        await conn.execute(
+            """
+            DELETE FROM writes WHERE thread_id = ? AND NOT EXISTS (
+                SELECT 1 FROM checkpoints c
+                WHERE c.thread_id = writes.thread_id
+                  AND c.checkpoint_ns = writes.checkpoint_ns
+                  AND c.checkpoint_id = writes.checkpoint_id
+            )
+            """,
+            (thread_id,)
+        )
+        await conn.commit()
+
+
+async def prune_idle_threads(saver) -> int:
+    """
+    Delete every checkpoint of threads idle longer than THREAD_TTL_SECONDS, plus
+    stored result sets of sessions that never recorded thread activity.
+    """
+    conn = getattr(saver, "conn", None)
+    cutoff = time.time() - THREAD_TTL_SECONDS
+    if conn is None:
+        # In-memory checkpoints: no activity table, so go by the age of the stored sets alone
+        stale = await asyncio.to_thread(result_store.sessions_before, cutoff)
+        for thread_id in stale:
+            await asyncio.to_thread(result_store.drop_session, thread_id)
+        return len(stale)
+    async with saver.lock:
+        async with conn.execute("SELECT thread_id FROM thread_activity WHERE last_seen < ?", (cutoff,)) as cur:
+            idle = [row[0] for row in await cur.fetchall()]
+        for thread_id in idle:
+            await conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            await conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            await conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        await conn.commit()
+        async with conn.execute("SELECT thread_id FROM thread_activity") as cur:
+            active = {row[0] for row in await cur.fetchall()}
+    # e.g. a turn that failed before touch_thread ran
+    stale = await asyncio.to_thread(result_store.sessions_before, cutoff)
+    idle.extend(s for s in stale if s not in active and s not in idle)
+    for thread_id in idle:
+        # Result sets are tagged with the session id, which is the thread id
+        await asyncio.to_thread(result_store.drop_session, thread_id)
+    return len(idle)
+
+
+def start_checkpoint_pruner(saver) -> Optional[asyncio.Task]:
+    global _pruner_task
+
+    async def _loop():
+        while True:
+            try:
+                removed = await prune_idle_threads(saver)
+                if removed:
+                    logging.info(f"🧹 Pruned {removed} idle checkpoint thread(s)")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"❌ Checkpoint pruning failed: {e}")
+            await asyncio.sleep(PRUNE_INTERVAL_SECONDS)
+
+    _pruner_task = asyncio.create_task(_loop())
+    return _pruner_task
@@ -0,0 +1,97 @@
+"""
+Background engagement sync.
+
+An asyncio task in the server process that periodically runs the engagement
+workflow (fetch members, fetch clicks, update statuses) for campaigns
+registered in core.engagement_store, a few at a time. Each run saves its
+summary to the store, so the interactive "track engagement" request can
+return it without redoing the work.
+"""
+import asyncio
+import logging
+import os
+import random
+from typing import Optional
+
+from core.engagement_store import engagement_store
+
+logger = logging.getLogger(__name__)
+
+_scheduler_task: Optional[asyncio.Task] = None
+_engagement_graph = None
+
+
+def _get_engagement_graph():
+    # Imported lazily: the workflow pulls in baseagent and the MCP plumbing
+    global _engagement_graph
+    if _engagement_graph is None:
+        from workflows.engagement_workflow import build_engagement_workflow
+        _engagement_graph = build_engagement_workflow()
+    return _engagement_graph
+
+
+async def run_engagement_sync(campaign_id: str) -> None:
+    """One background run of the engagement workflow for a campaign."""
+    state = {
+        "user_goal": f"track engagement for campaign {campaign_id}",
+        "messages": [],
+        "shared_result_sets": {},
+        # Background runs always recompute instead of reading the precomputed summary
+        "engagement_workflow_context": {"background_sync": True},
+    }
+    try:
+        result = await _get_engagement_graph().ainvoke(state)
+        ctx = result.get("engagement_workflow_context") or {}
+        error = ctx.get("error") or ctx.get("update_error")
+        engagement_store.mark_run(campaign_id, "error" if error else "success", error)
+        logger.info(f"✅ Engagement sync for {campaign_id}: {ctx.get('update_summary', 'done')}")
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        engagement_store.mark_run(campaign_id, "error", str(e))
+        logger.error(f"❌ Engagement sync for {campaign_id} failed: {e}")
+
+
+async def _engagement_sync_loop(tick_seconds: int, max_concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(max_concurrency)
+    running: set = set()
+
+    async def run_one(campaign_id: str):
+        async with semaphore:
+            await run_engagement_sync(campaign_id)
+
+    while True:
+        try:
+            engagement_store.prune_expired()
+            # Skip campaigns whose previous run is still in flight
+            due = [c for c in engagement_store.due_campaigns(limit=max_concurrency * 4) if c not in running]
+            for campaign_id in due:
+                running.add(campaign_id)
+                task = asyncio.create_task(run_one(campaign_id))
+                task.add_done_callback(lambda _t, c=campaign_id: running.discard(c))
+            if due:
+                logger.info(f"⏰ Engagement sync: started {len(due)} campaign(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Engagement scheduler tick failed: {e}")
+        await asyncio.sleep(tick_seconds + random.uniform(0, tick_seconds * 0.2))
+
+
+def start_engagement_scheduler() -> Optional[asyncio.Task]:
+    """
+    Start the scheduler on the running event loop. Disabled with
+    ENGAGEMENT_SYNC_ENABLED=false; ENGAGEMENT_SYNC_TICK_SECONDS and
+    ENGAGEMENT_SYNC_MAX_CONCURRENCY tune how often schedules are polled and how
+    many campaigns sync at once.
+    """
+    global _scheduler_task
+    if os.getenv("ENGAGEMENT_SYNC_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    if _scheduler_task and not _scheduler_task.done():
+        return _scheduler_task
+    tick = int(os.getenv("ENGAGEMENT_SYNC_TICK_SECONDS", "30"))
+    concurrency = int(os.getenv("ENGAGEMENT_SYNC_MAX_CONCURRENCY", "2"))
+    _scheduler_task = asyncio.create_task(_engagement_sync_loop(tick, concurrency))
+    logger.info(f"⏰ Engagement sync scheduler started (tick {tick}s, concurrency {concurrency})")
+    return _scheduler_task
@@ -0,0 +1,146 @@
+"""
+Engagement scoring for CampaignMembers.
+
+Brevo email events and Linkly click totals are merged into one stream of
+signals and folded into a weighted score and a last-engaged timestamp per
+member in a single pass. Members are indexed once by email and by link id, so
+the whole stage is linear in members + events. Results are compared with the
+scores last written for the campaign so only changed members are sent to
+Salesforce.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+# Brevo event names as returned by the statistics API / event store, plus Linkly clicks
+SCORE_WEIGHTS = {
+    "opened": 1.0,
+    "clicks": 3.0,
+    "linkly_click": 5.0,
+    "softBounces": -1.0,
+    "hardBounces": -5.0,
+    "hard_bounce": -5.0,
+    "unsubscribe": -3.0,
+    "unsubscribed": -3.0,
+    "complaint": -5.0,
+}
+ENGAGED_EVENTS = {"opened", "clicks", "linkly_click"}
+CLICK_EVENTS = {"clicks", "linkly_click"}
+
+# Optional CampaignMember fields to write the score / recency to; unset means Status only
+SCORE_FIELD = os.getenv("ENGAGEMENT_SCORE_FIELD")
+LAST_ENGAGED_FIELD = os.getenv("ENGAGEMENT_LAST_ENGAGED_FIELD")
+
+# (kind, key, event, count, timestamp) where kind is "email" or "link"
+Signal = Tuple[str, str, str, int, Optional[float]]
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def signal_stream(
+    brevo_events_by_email: Dict[str, List[Dict[str, Any]]],
+    message_ids_by_email: Dict[str, str],
+    clicks_per_link: Dict[Any, int],
+    last_click_per_link: Dict[Any, Any],
+) -> Iterator[Signal]:
+    """
+    Yield Brevo events that belong to this campaign's send (matched on message
+    id) followed by one aggregated signal per clicked Linkly link.
+    """
+    for email, events in brevo_events_by_email.items():
+        expected = message_ids_by_email.get(email)
+        if not expected:
+            continue
+        for event in events:
+            if event.get("messageId") == expected and event.get("event") in SCORE_WEIGHTS:
+                yield ("email", email, event["event"], 1, _timestamp(event.get("date")))
+    for link_id, count in clicks_per_link.items():
+        if count:
+            key = str(link_id)
+            yield ("link", key, "linkly_click", int(count), _timestamp(last_click_per_link.get(key)))
+
+
+def score_members(members: Dict[str, List[Any]], signals: Iterator[Signal]) -> Dict[int, Dict[str, Any]]:
+    """
+    Fold signals into per-member scores. `members` is column-oriented
+    (member_id, email, link_id, ...); results are keyed by row index and only
+    cover members that had at least one signal.
+    """
+    by_email = {e.lower(): i for i, e in enumerate(members["email"]) if e}
+    by_link = {l: i for i, l in enumerate(members["link_id"]) if l}
+    scores: Dict[int, Dict[str, Any]] = {}
+
+    for kind, key, event, count, ts in signals:
+        idx = (by_email if kind == "email" else by_link).get(key)
+        if idx is None:
+            continue
+        acc = scores.get(idx)
+        if acc is None:
+            acc = scores[idx] = {"score": 0.0, "last_engaged_at": None, "opens": 0, "email_clicks": 0, "linkly_clicks": 0}
+        acc["score"] += SCORE_WEIGHTS[event] * count
+        if event == "opened":
+            acc["opens"] += count
+        elif event == "clicks":
+            acc["email_clicks"] += count
+        elif event == "linkly_click":
+            acc["linkly_clicks"] += count
+        if event in ENGAGED_EVENTS and ts is not None and (acc["last_engaged_at"] is None or ts > acc["last_engaged_at"]):
+            acc["last_engaged_at"] = ts
+    return scores
+
+
+def changed_members(
+    members: Dict[str, List[Any]],
+    scores: Dict[int, Dict[str, Any]],
+    previous: Dict[str, Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """
+    Members whose score, recency or status differs from what was last written.
+    Any click makes a member 'Responded'; statuses are never downgraded.
+    """
+    changed = []
+    for idx, acc in scores.items():
+        member_id = members["member_id"][idx]
+        status = members["status"][idx]
+        clicked = acc["email_clicks"] + acc["linkly_clicks"] > 0
+        new_status = "Responded" if clicked else status
+        score = round(acc["score"], 1)
+        prev = previous.get(member_id) or {}
+        last_engaged = max(filter(None, [acc["last_engaged_at"], prev.get("last_engaged_at")]), default=None)
+
+        if new_status == status and score == prev.get("score") and last_engaged == prev.get("last_engaged_at"):
+            continue
+        changed.append({
+            "member_id": member_id,
+            "email": members["email"][idx],
+            "name": members["name"][idx],
+            "link_id": members["link_id"][idx],
+            "status": status,
+            "new_status": new_status,
+            "score": score,
+            "last_engaged_at": last_engaged,
+            "click_count": acc["linkly_clicks"] + acc["email_clicks"],
+        })
+    return changed
+
+
+def update_fields(member: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """CampaignMember fields to write for a changed member (may be empty)."""
+    previous = previous or {}
+    fields: Dict[str, Any] = {}
+    if member["new_status"] != member["status"]:
+        fields["Status"] = member["new_status"]
+    if SCORE_FIELD and member["score"] != previous.get("score"):
+        fields[SCORE_FIELD] = member["score"]
+    if LAST_ENGAGED_FIELD and member["last_engaged_at"] and member["last_engaged_at"] != previous.get("last_engaged_at"):
+        fields[LAST_ENGAGED_FIELD] = datetime.fromtimestamp(member["last_engaged_at"], timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return fields
@@ -0,0 +1,202 @@
+"""
+Local store for engagement sync schedules and precomputed summaries.
+
+Campaigns are registered when emails go out (and whenever someone tracks
+their engagement); the background scheduler in core.engagement_scheduler
+re-runs the engagement workflow for registered campaigns until they expire,
+and each run's summary is saved here so the interactive "track engagement"
+path can answer from it immediately. The Brevo message id sent to each
+recipient and the last engagement score written per member are kept too, so
+scoring can attribute events to the campaign and write back only changes.
+"""
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+DEFAULT_SYNC_INTERVAL_SECONDS = int(os.getenv("ENGAGEMENT_SYNC_INTERVAL_SECONDS", "900"))
+DEFAULT_ACTIVE_DAYS = int(os.getenv("ENGAGEMENT_SYNC_ACTIVE_DAYS", "14"))
+SUMMARY_MAX_AGE_SECONDS = int(os.getenv("ENGAGEMENT_SUMMARY_MAX_AGE_SECONDS", "1800"))
+
+
+def _default_store_path() -> Path:
+    override = os.getenv("ENGAGEMENT_STORE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "engagement.sqlite3"
+
+
+class EngagementStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else _default_store_path()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS engagement_schedules (
+                    campaign_id TEXT PRIMARY KEY,
+                    interval_seconds INTEGER NOT NULL,
+                    next_run_at REAL NOT NULL,
+                    active_until REAL NOT NULL,
+                    last_run_at REAL,
+                    last_status TEXT,
+                    last_error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_engagement_schedules_due ON engagement_schedules (next_run_at);
+                CREATE TABLE IF NOT EXISTS engagement_summaries (
+                    campaign_id TEXT PRIMARY KEY,
+                    summary TEXT,
+                    context TEXT,
+                    computed_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS campaign_messages (
+                    campaign_id TEXT NOT NULL,
+                    email TEXT NOT NULL,
+                    message_id TEXT NOT NULL,
+                    PRIMARY KEY (campaign_id, email)
+                );
+                CREATE TABLE IF NOT EXISTS member_scores (
+                    campaign_id TEXT NOT NULL,
+                    member_id TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    status TEXT,
+                    last_engaged_at REAL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (campaign_id, member_id)
+                );
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    # ---------- schedules ----------
+
+    def register_campaign(self, campaign_id: str, interval_seconds: Optional[int] = None,
+                          active_days: Optional[int] = None) -> None:
+        """Start (or extend) periodic engagement syncs for a campaign."""
+        if not campaign_id:
+            return
+        interval = interval_seconds or DEFAULT_SYNC_INTERVAL_SECONDS
+        now = time.time()
+        active_until = now + (active_days or DEFAULT_ACTIVE_DAYS) * 86400
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO engagement_schedules (campaign_id, interval_seconds, next_run_at, active_until)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(campaign_id) DO UPDATE SET
+                    interval_seconds = excluded.interval_seconds,
+                    active_until = MAX(active_until, excluded.active_until)
+                """,
+                (campaign_id, interval, now + interval * random.uniform(0.5, 1.0), active_until)
+            )
+
+    def due_campaigns(self, limit: int) -> List[str]:
+        now = time.time()
+        rows = self._connection().execute(
+            "SELECT campaign_id FROM engagement_schedules "
+            "WHERE next_run_at <= ? AND active_until > ? ORDER BY next_run_at LIMIT ?",
+            (now, now, limit)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def mark_run(self, campaign_id: str, status: str, error: Optional[str] = None, jitter: float = 0.1) -> None:
+        """Record a run and schedule the next one with +/- jitter."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            row = conn.execute(
+                "SELECT interval_seconds FROM engagement_schedules WHERE campaign_id = ?", (campaign_id,)
+            ).fetchone()
+            interval = row[0] if row else DEFAULT_SYNC_INTERVAL_SECONDS
+            next_run = now + interval * random.uniform(1 - jitter, 1 + jitter)
+            conn.execute(
+                "UPDATE engagement_schedules SET last_run_at = ?, last_status = ?, last_error = ?, next_run_at = ? "
+                "WHERE campaign_id = ?",
+                (now, status, error, next_run, campaign_id)
+            )
+
+    def prune_expired(self) -> int:
+        conn = self._connection()
+        with conn:
+            cur = conn.execute("DELETE FROM engagement_schedules WHERE active_until <= ?", (time.time(),))
+        return cur.rowcount
+
+    # ---------- scoring ----------
+
+    def record_messages(self, campaign_id: str, message_ids_by_email: Dict[str, str]) -> None:
+        rows = [(campaign_id, e.lower(), m) for e, m in (message_ids_by_email or {}).items() if e and m]
+        if not campaign_id or not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO campaign_messages (campaign_id, email, message_id) VALUES (?, ?, ?)", rows
+            )
+
+    def message_ids(self, campaign_id: str) -> Dict[str, str]:
+        """email -> Brevo message id of this campaign's send."""
+        rows = self._connection().execute(
+            "SELECT email, message_id FROM campaign_messages WHERE campaign_id = ?", (campaign_id,)
+        ).fetchall()
+        return dict(rows)
+
+    def member_scores(self, campaign_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT member_id, score, status, last_engaged_at FROM member_scores WHERE campaign_id = ?",
+            (campaign_id,)
+        ).fetchall()
+        return {r[0]: {"score": r[1], "status": r[2], "last_engaged_at": r[3]} for r in rows}
+
+    def save_member_scores(self, campaign_id: str, scores: List[Dict[str, Any]]) -> None:
+        """scores: dicts with member_id, score, new_status, last_engaged_at"""
+        now = time.time()
+        rows = [
+            (campaign_id, m["member_id"], m["score"], m.get("new_status"), m.get("last_engaged_at"), now)
+            for m in scores if m.get("member_id")
+        ]
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO member_scores "
+                "(campaign_id, member_id, score, status, last_engaged_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    # ---------- summaries ----------
+
+    def save_summary(self, campaign_id: str, summary: str, context: Dict[str, Any]) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO engagement_summaries (campaign_id, summary, context, computed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (campaign_id, summary, json.dumps(context, default=str), time.time())
+            )
+
+    def get_summary(self, campaign_id: str, max_age_seconds: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """The latest summary if it is younger than max_age_seconds, else None."""
+        max_age = SUMMARY_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+        row = self._connection().execute(
+            "SELECT summary, context, computed_at FROM engagement_summaries WHERE campaign_id = ?",
+            (campaign_id,)
+        ).fetchone()
+        if not row or time.time() - row[2] > max_age:
+            return None
+        return {"summary": row[0], "context": json.loads(row[1] or "{}"), "computed_at": row[2]}
+
+
+engagement_store = EngagementStore()
@@ -0,0 +1,34 @@
+# core/progress.py
+"""
+Progress events for long-running workflow nodes.
+
+Nodes call emit_progress() to report what they are doing (and how far along a
+batched step is). When the graph is run with stream_mode "custom" (server.py)
+the event is forwarded to the client as a "progress" frame; otherwise, e.g. in
+background engagement syncs, it is a no-op.
+
+MCP tools report their own progress (links created, recipients sent) through
+the FastMCP Context; tool_progress() turns that into emit_progress() calls so
+execute_single_tool can forward it.
+"""
+from typing import Any, Awaitable, Callable, Optional
+
+
+def emit_progress(message: str, **data: Any) -> None:
+    try:
+        from langgraph.config import get_stream_writer
+        writer = get_stream_writer()
+    except (ImportError, RuntimeError):
+        # Not inside a graph run
+        return
+    writer({"stage": "step", "message": message, **data})
+
+
+def tool_progress(message: str) -> Callable[[float, Optional[float], Optional[str]], Awaitable[None]]:
+    """MCP progress callback that re-emits the tool's done/total counts under `message`."""
+    async def forward(progress: float, total: Optional[float], tool_message: Optional[str] = None) -> None:
+        data = {"done": int(progress)}
+        if total is not None:
+            data["total"] = int(total)
+        emit_progress(tool_message or message, **data)
+    return forward
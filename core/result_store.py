@@ -0,0 +1,280 @@
+# core/result_store.py
+"""
+Out-of-line storage for large shared_result_sets.
+
+Result sets over RESULT_SET_INLINE_MAX_ROWS rows are written to SQLite in a
+columnar layout (column names once per set, one JSON value array per row) and
+replaced in MarketingState by a small handle carrying the row count, columns
+and a preview. Checkpoints then copy the handle instead of the records, and
+readers load the rows only when they actually iterate them. Raw MCP tool
+payloads referenced from mcp_results (see core.tool_results) are kept here too.
+
+Rows written during a WebSocket session live as long as its checkpoint thread:
+core.checkpointer drops them (drop_session) when it prunes the idle thread.
+Only rows without a session, e.g. from background engagement syncs, expire
+after RESULT_STORE_TTL_SECONDS.
+"""
+import contextvars
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+INLINE_MAX_ROWS = int(os.getenv("RESULT_SET_INLINE_MAX_ROWS", "200"))
+PREVIEW_ROWS = int(os.getenv("RESULT_SET_PREVIEW_ROWS", "5"))
+STORE_TTL_SECONDS = int(os.getenv("RESULT_STORE_TTL_SECONDS", str(2 * 86400)))
+HANDLE_KEY = "__result_set__"
+
+# Set per WebSocket connection (to the thread id) so stored sets are cleaned up with their thread
+current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("result_store_session", default=None)
+
+
+def _default_store_path() -> Path:
+    override = os.getenv("RESULT_STORE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "result_sets.sqlite3"
+
+
+def strip_attributes(value: Any) -> Any:
+    """Drop Salesforce 'attributes' blocks (type/url per record) at any depth."""
+    if isinstance(value, dict):
+        return {k: strip_attributes(v) for k, v in value.items() if k != "attributes"}
+    if isinstance(value, list):
+        return [strip_attributes(v) for v in value]
+    return value
+
+
+def is_handle(value: Any) -> bool:
+    return isinstance(value, dict) and HANDLE_KEY in value
+
+
+class ResultSetStore:
+    def __init__(self, path: Optional[Path] = None, cache_size: int = 4):
+        self.path = Path(path) if path else _default_store_path()
+        self._local = threading.local()
+        self._cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._last_prune = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS result_sets (
+                    handle TEXT PRIMARY KEY,
+                    session_id TEXT,
+                    name TEXT,
+                    columns TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_result_sets_session ON result_sets (session_id);
+                CREATE TABLE IF NOT EXISTS result_rows (
+                    handle TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    row_values TEXT NOT NULL,
+                    PRIMARY KEY (handle, idx)
+                );
+                CREATE TABLE IF NOT EXISTS tool_payloads (
+                    ref TEXT PRIMARY KEY,
+                    session_id TEXT,
+                    body BLOB NOT NULL,
+                    created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_tool_payloads_session ON tool_payloads (session_id);
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, handle: str, rows: List[Dict[str, Any]]) -> None:
+        self._cache[handle] = rows
+        self._cache.move_to_end(handle)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def put(self, name: str, rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Store rows and return the handle that replaces them in state."""
+        rows = strip_attributes(rows)
+        columns: List[str] = []
+        seen = set()
+        for row in rows:
+            for key in (row.keys() if isinstance(row, dict) else ()):
+                if key not in seen:
+                    seen.add(key)
+                    columns.append(key)
+
+        handle = uuid.uuid4().hex
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO result_sets (handle, session_id, name, columns, row_count, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (handle, current_session.get(), name, json.dumps(columns), len(rows), time.time())
+            )
+            conn.executemany(
+                "INSERT INTO result_rows (handle, idx, row_values) VALUES (?, ?, ?)",
+                (
+                    (handle, i, json.dumps([row.get(c) for c in columns] if isinstance(row, dict) else row, default=str))
+                    for i, row in enumerate(rows)
+                )
+            )
+        self._remember(handle, rows)
+        self._maybe_prune()
+        logging.info(f"🗄️ Stored result set '{name}' out of line ({len(rows)} rows, handle {handle[:8]})")
+        return {HANDLE_KEY: handle, "name": name, "count": len(rows), "columns": columns, "preview": rows[:PREVIEW_ROWS]}
+
+    def get(self, handle: str) -> List[Dict[str, Any]]:
+        if handle in self._cache:
+            self._cache.move_to_end(handle)
+            return self._cache[handle]
+        conn = self._connection()
+        meta = conn.execute("SELECT columns FROM result_sets WHERE handle = ?", (handle,)).fetchone()
+        if not meta:
+            logging.warning(f"⚠️ Result set {handle[:8]} not found (expired?)")
+            return []
+        columns = json.loads(meta[0])
+        rows = []
+        for (values,) in conn.execute("SELECT row_values FROM result_rows WHERE handle = ? ORDER BY idx", (handle,)):
+            values = json.loads(values)
+            rows.append(dict(zip(columns, values)) if isinstance(values, list) and columns else values)
+        self._remember(handle, rows)
+        return rows
+
+    def put_payload(self, text: str) -> str:
+        ref = uuid.uuid4().hex
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO tool_payloads (ref, session_id, body, created_at) VALUES (?, ?, ?, ?)",
+                (ref, current_session.get(), zlib.compress(text.encode("utf-8")), time.time())
+            )
+        return ref
+
+    def get_payload(self, ref: str) -> Optional[str]:
+        row = self._connection().execute("SELECT body FROM tool_payloads WHERE ref = ?", (ref,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def drop_session(self, session_id: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM tool_payloads WHERE session_id = ?", (session_id,))
+            conn.execute(
+                "DELETE FROM result_rows WHERE handle IN (SELECT handle FROM result_sets WHERE session_id = ?)",
+                (session_id,)
+            )
+            conn.execute("DELETE FROM result_sets WHERE session_id = ?", (session_id,))
+
+    def sessions_before(self, cutoff: float) -> List[str]:
+        """Sessions whose newest stored set or payload is older than cutoff."""
+        rows = self._connection().execute(
+            """
+            SELECT session_id FROM (
+                SELECT session_id, created_at FROM result_sets WHERE session_id IS NOT NULL
+                UNION ALL
+                SELECT session_id, created_at FROM tool_payloads WHERE session_id IS NOT NULL
+            ) GROUP BY session_id HAVING MAX(created_at) < ?
+            """,
+            (cutoff,)
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def _maybe_prune(self) -> None:
+        # At most once an hour: drop session-less sets older than the TTL (session sets go with their thread)
+        now = time.time()
+        if now - self._last_prune < 3600:
+            return
+        self._last_prune = now
+        cutoff = now - STORE_TTL_SECONDS
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "DELETE FROM result_rows WHERE handle IN "
+                "(SELECT handle FROM result_sets WHERE session_id IS NULL AND created_at < ?)", (cutoff,)
+            )
+            conn.execute("DELETE FROM result_sets WHERE session_id IS NULL AND created_at < ?", (cutoff,))
+            conn.execute("DELETE FROM tool_payloads WHERE session_id IS NULL AND created_at < ?", (cutoff,))
+
+
+result_store = ResultSetStore()
+
+
+def materialize(value: Any) -> Any:
+    """Rows for a handle; anything else is returned unchanged."""
+    if is_handle(value):
+        return result_store.get(value[HANDLE_KEY])
+    return value
+
+
+def first_record(value: Any) -> Optional[Dict[str, Any]]:
+    """First row of a result set without loading a stored one."""
+    if is_handle(value):
+        preview = value.get("preview") or []
+        return preview[0] if preview else None
+    if isinstance(value, list) and value:
+        return value[0]
+    return None
+
+
+def compact_result_sets(result_sets: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    State-ready copy of result_sets: large lists become handles, small ones lose
+    their 'attributes' blocks, existing handles pass through untouched.
+    """
+    if not result_sets:
+        return result_sets
+    compact = {}
+    for name, value in dict.items(result_sets):
+        if isinstance(value, list) and len(value) > INLINE_MAX_ROWS:
+            try:
+                compact[name] = result_store.put(name, value)
+                continue
+            except sqlite3.Error as e:
+                logging.warning(f"⚠️ Could not store result set '{name}' out of line: {e}")
+        compact[name] = strip_attributes(value) if isinstance(value, list) else value
+    return compact
+
+
+def preview_result_sets(result_sets: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """JSON-safe view for prompts/planners: handles are replaced by their preview rows."""
+    return {
+        name: (value.get("preview") or []) if is_handle(value) else value
+        for name, value in dict.items(result_sets or {})
+    }
+
+
+class LazyResultSets(dict):
+    """
+    dict of result sets whose item access loads stored sets on demand.
+    The underlying values stay as handles, so passing it back into
+    compact_result_sets is cheap.
+    """
+
+    def __getitem__(self, key):
+        return materialize(dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def values(self):
+        return [self[k] for k in self]
+
+    def items(self):
+        return [(k, self[k]) for k in self]
+
+    def count(self, key) -> int:
+        value = dict.get(self, key)
+        if is_handle(value):
+            return value.get("count", 0)
+        return len(value) if isinstance(value, list) else 0
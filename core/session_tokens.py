@@ -0,0 +1,57 @@
+# core/session_tokens.py
+"""
+Resume tokens for WebSocket chat threads.
+
+A thread_id alone does not prove that a client owns the conversation, so the
+session frame also carries an HMAC of the thread_id, and a reconnecting client
+must send it back to resume. The key is SESSION_TOKEN_SECRET if set. Otherwise
+a random key is generated once and stored with the other caches
+(SESSION_TOKEN_SECRET_PATH), so tokens stay valid across restarts, like the
+checkpoints they unlock.
+"""
+import hashlib
+import hmac
+import os
+import secrets
+from pathlib import Path
+from typing import Optional
+
+_key: Optional[bytes] = None
+
+
+def _default_secret_path() -> Path:
+    override = os.getenv("SESSION_TOKEN_SECRET_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "session_secret"
+
+
+def _load_or_create_key(path: Path) -> bytes:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        # O_EXCL: if two processes start at once, exactly one writes the key
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return path.read_bytes()
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def _signing_key() -> bytes:
+    global _key
+    if _key is None:
+        configured = os.getenv("SESSION_TOKEN_SECRET")
+        _key = configured.encode("utf-8") if configured else _load_or_create_key(_default_secret_path())
+    return _key
+
+
+def issue_resume_token(thread_id: str) -> str:
+    return hmac.new(_signing_key(), thread_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def verify_resume_token(thread_id: str, token: Optional[str]) -> bool:
+    if not token:
+        return False
+    return hmac.compare_digest(issue_resume_token(thread_id), token)
@@ -1,8 +1,13 @@
 # core/state.py
 from typing import TypedDict, List, Dict, Any, Optional, Annotated
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, HumanMessage
 from langgraph.graph.message import add_messages
 import operator
+import os
+
+# Size budgets for state that grows across turns (checkpointed on every step)
+SESSION_HISTORY_MAX_ITEMS = int(os.getenv("SESSION_HISTORY_MAX_ITEMS", "200"))
+MESSAGE_HISTORY_MAX = int(os.getenv("MESSAGE_HISTORY_MAX", "100"))
 
 
 def merge_dicts(left: Optional[Dict], right: Optional[Dict]) -> Optional[Dict]:
@@ -23,17 +28,43 @@ def merge_dicts(left: Optional[Dict], right: Optional[Dict]) -> Optional[Dict]:
 
 def merge_history(left: Optional[List[Dict]], right: Optional[List[Dict]]) -> Optional[List[Dict]]:
     """
-    Reducer that appends new history items to the existing list.
+    Reducer that appends new history items to the existing list, keeping the
+    newest SESSION_HISTORY_MAX_ITEMS. Neither input is mutated: checkpoints and
+    returned snapshots may still hold the previous list.
+
+    This copies at most SESSION_HISTORY_MAX_ITEMS references per update. The
+    checkpointer serializes the whole list after every step anyway, and readers
+    expect a plain list, so a chunked or persistent structure would not save work.
     """
     if left is None:
         return right
-    if right is None:
+    if not right:
         return left
-    return left + right
+    overflow = len(left) + len(right) - SESSION_HISTORY_MAX_ITEMS
+    if overflow <= 0:
+        return left + right
+    if overflow >= len(left):
+        return right[-SESSION_HISTORY_MAX_ITEMS:]
+    # Slice before concatenating so trimmed items are never copied
+    return left[overflow:] + right
+
+
+def add_messages_bounded(left, right):
+    """
+    add_messages, then drop whole old turns once the history passes
+    MESSAGE_HISTORY_MAX. The kept history always starts at a HumanMessage.
+    """
+    merged = add_messages(left, right)
+    if len(merged) <= MESSAGE_HISTORY_MAX:
+        return merged
+    start = len(merged) - MESSAGE_HISTORY_MAX * 3 // 4
+    while start < len(merged) and not isinstance(merged[start], HumanMessage):
+        start += 1
+    return merged[start:] if start < len(merged) else merged[-1:]
 
 class MarketingState(TypedDict):
     user_goal: str
-    messages: Annotated[List[BaseMessage], add_messages]
+    messages: Annotated[List[BaseMessage], add_messages_bounded]
     
     # Orchestrator routing
     iteration_count: int
@@ -49,6 +80,7 @@ class MarketingState(TypedDict):
     
     # Generic MCP results storage for dynamic handling
     # 🔴 Removed merge_dicts to allow clearing (overwrite with None) via server.py
+    # Entries are compact summaries (core.tool_results); raw payloads live in the result store
     mcp_results: Optional[Dict[str, Any]]
     
     # Persistent Session History
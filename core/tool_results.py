@@ -0,0 +1,154 @@
+# core/tool_results.py
+"""
+Compact tool-result entries for MarketingState.mcp_results.
+
+mcp_results is checkpointed after every node, so entries keep only what the
+orchestrator and completion summaries read: tool name, status, a trimmed
+request and a response preview. Responses longer than TOOL_RESULT_INLINE_CHARS
+are written to the result store and reloaded on first access to `.text`.
+Entries keep the MCP CallToolResult shape (`response.content[i].text`), so
+existing readers work unchanged.
+"""
+import json
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from core.result_store import result_store
+
+INLINE_CHARS = int(os.getenv("TOOL_RESULT_INLINE_CHARS", "2000"))
+MAX_TOOL_RESULTS = int(os.getenv("MCP_RESULTS_MAX_TOOL_RESULTS", "50"))
+REQUEST_LIST_MAX = 20
+
+
+@dataclass
+class TextContent:
+    preview: str
+    payload_ref: Optional[str] = None
+    type: str = "text"
+
+    @property
+    def text(self) -> str:
+        if self.payload_ref is None:
+            return self.preview
+        try:
+            payload = result_store.get_payload(self.payload_ref)
+        except sqlite3.Error as e:
+            logging.warning(f"⚠️ Could not load tool payload {self.payload_ref[:8]}: {e}")
+            payload = None
+        return payload if payload is not None else self.preview
+
+
+@dataclass
+class ToolResponse:
+    content: List[TextContent] = field(default_factory=list)
+    isError: bool = False
+
+
+def _text_content(text: str) -> TextContent:
+    if len(text) <= INLINE_CHARS:
+        return TextContent(preview=text)
+    try:
+        ref = result_store.put_payload(text)
+    except sqlite3.Error as e:
+        logging.warning(f"⚠️ Could not store tool payload out of line: {e}")
+        return TextContent(preview=text)
+    return TextContent(preview=text[:INLINE_CHARS], payload_ref=ref)
+
+
+def compact_response(response: Any) -> Any:
+    """CallToolResult (or raw workflow data) -> ToolResponse; already compact values pass through."""
+    if response is None or isinstance(response, ToolResponse):
+        return response
+    content = getattr(response, "content", None)
+    if content is not None:
+        return ToolResponse(
+            content=[_text_content(getattr(item, "text", "") or "") for item in content],
+            isError=bool(getattr(response, "isError", False)),
+        )
+    if isinstance(response, str):
+        return response if len(response) <= INLINE_CHARS else ToolResponse([_text_content(response)])
+    if isinstance(response, (int, float, bool)):
+        return response
+    try:
+        text = json.dumps(response, default=str)
+    except (TypeError, ValueError):
+        text = str(response)
+    return response if len(text) <= INLINE_CHARS else ToolResponse([_text_content(text)])
+
+
+def compact_request(request: Any) -> Any:
+    """Trim long lists in tool arguments (bulk upserts etc.), keeping the first items."""
+    if isinstance(request, dict):
+        return {k: compact_request(v) for k, v in request.items()}
+    if isinstance(request, list) and len(request) > REQUEST_LIST_MAX:
+        return [compact_request(v) for v in request[:REQUEST_LIST_MAX]] + [{"_truncated": len(request) - REQUEST_LIST_MAX}]
+    return request
+
+
+def compact_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(entry, dict):
+        return entry
+    compact = dict(entry)
+    if "response" in compact:
+        compact["response"] = compact_response(compact["response"])
+    if "request" in compact:
+        compact["request"] = compact_request(compact["request"])
+    return compact
+
+
+def compact_service_result(mcp_result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Compact the tool_results of one service's call_mcp result before it goes into state."""
+    if not mcp_result or not mcp_result.get("tool_results"):
+        return mcp_result
+    compact = dict(mcp_result)
+    compact["tool_results"] = [compact_entry(r) for r in mcp_result["tool_results"][-MAX_TOOL_RESULTS:]]
+    return compact
+
+
+def record_tool_result(
+    state: Dict[str, Any],
+    service_name: str,
+    tool_name: str,
+    result: Dict[str, Any],
+    summary_text: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Append one compact tool result to state["mcp_results"][service_name],
+    keeping at most MCP_RESULTS_MAX_TOOL_RESULTS entries per service.
+
+    The mcp_results dict, the service entry, its summary and its tool_results
+    list are all copied, never mutated: the previous values may still be held
+    by a checkpoint or by the caller's input state.
+    """
+    mcp_results = dict(state.get("mcp_results") or {})
+    service_data = dict(mcp_results.get(service_name) or {})
+
+    summary = dict(service_data.get("execution_summary") or {})
+    summary["total_calls"] = summary.get("total_calls", 0) + 1
+    if result.get("status") == "success":
+        summary["successful_calls"] = summary.get("successful_calls", 0) + 1
+    else:
+        summary["failed_calls"] = summary.get("failed_calls", 0) + 1
+
+    tool_res = {
+        "tool_name": tool_name,
+        "status": result.get("status", "unknown"),
+        "response": compact_response(result.get("data", str(result))),
+    }
+    # Summary goes into 'request' so it appears in the orchestrator's progress summary
+    if summary_text:
+        tool_res["request"] = {"Summary": summary_text}
+
+    tool_results = service_data.get("tool_results") or []
+    if len(tool_results) >= MAX_TOOL_RESULTS:
+        # Trim in a batch so the copy isn't repeated on every call once full
+        tool_results = tool_results[len(tool_results) + 1 - MAX_TOOL_RESULTS * 3 // 4:]
+    service_data["execution_summary"] = summary
+    service_data["tool_results"] = tool_results + [tool_res]
+    mcp_results[service_name] = service_data
+
+    state["mcp_results"] = mcp_results
+    return state
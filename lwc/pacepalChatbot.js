@@ -14,6 +14,8 @@ export default class PacepalChatbot extends NavigationMixin(LightningElement) {
     @track messages = [];
 
     websocket = null;
+    threadId = null; // Server conversation thread; sent back on reconnect to resume it
+    resumeToken = null; // Issued with threadId; the server only resumes a thread with its token
     reconnectAttempts = 0;
     maxReconnectAttempts = 5;
 
@@ -37,7 +39,12 @@ export default class PacepalChatbot extends NavigationMixin(LightningElement) {
     connectWebSocket() {
         try {
             this.connectionStatus = 'Connecting...';
-            this.websocket = new WebSocket(this.websocketUrl);
+            let url = this.websocketUrl;
+            if (this.threadId && this.resumeToken) {
+                url += (url.includes('?') ? '&' : '?') + 'thread_id=' + encodeURIComponent(this.threadId)
+                    + '&resume_token=' + encodeURIComponent(this.resumeToken);
+            }
+            this.websocket = new WebSocket(url);
 
             this.websocket.onopen = () => {
                 console.log('WebSocket connected');
@@ -50,12 +57,13 @@ export default class PacepalChatbot extends NavigationMixin(LightningElement) {
                 this.handleWebSocketMessage(event);
             };
 
-            this.websocket.onclose = () => {
+            this.websocket.onclose = (event) => {
                 console.log('WebSocket disconnected');
                 this.connectionStatus = 'Disconnected';
                 this.addSystemMessage('Disconnected from server');
 
-                if (this.isChatOpen && this.reconnectAttempts < this.maxReconnectAttempts) {
+                // 4409: the thread is open in another window; reconnecting would be refused again
+                if (event.code !== 4409 && this.isChatOpen && this.reconnectAttempts < this.maxReconnectAttempts) {
                     this.reconnectAttempts++;
                     setTimeout(() => {
                         this.addSystemMessage(`Reconnecting... (Attempt ${this.reconnectAttempts})`);
@@ -87,11 +95,20 @@ export default class PacepalChatbot extends NavigationMixin(LightningElement) {
 
     handleWebSocketMessage(event) {
         try {
-            this.removeThinkingIndicator();
             const data = JSON.parse(event.data);
             console.log('Received:', data);
 
-            if (data.type === 'status') {
+            // Progress frames only update the thinking indicator while the turn is still running
+            if (data.type === 'progress') {
+                this.updateThinkingIndicator(data.message);
+                return;
+            }
+            this.removeThinkingIndicator();
+
+            if (data.type === 'session') {
+                this.threadId = data.thread_id;
+                this.resumeToken = data.resume_token;
+            } else if (data.type === 'status') {
                 this.addSystemMessage(data.message);
             } else if (data.type === 'response') {
                 this.isSending = false;
@@ -784,12 +801,19 @@ export default class PacepalChatbot extends NavigationMixin(LightningElement) {
         this.pushMessage({
             id: 'thinking',
             type: 'thinking',
-            content: '',
+            content: 'Agent is thinking',
             class: 'message message-agent thinking-message',
             isThinking: true
         });
     }
 
+    updateThinkingIndicator(text) {
+        if (!text || !this.isSending) {
+            return;
+        }
+        this.messages = this.messages.map(m => (m.type === 'thinking' ? { ...m, content: text } : m));
+    }
+
     removeThinkingIndicator() {
         this.messages = this.messages.filter(m => m.type !== 'thinking');
     }
@@ -1,8 +1,10 @@
 class BrevoApiError(Exception):
     """Custom exception for Brevo API errors."""
 
-    def __init__(self, status_code: int, message: str, details: dict | None = None):
+    def __init__(self, status_code: int, message: str, details: dict | None = None, retry_after: float | None = None):
         super().__init__(f"[{status_code}] {message}")
         self.status_code = status_code
         self.message = message
         self.details = details or {}
+        # Seconds to wait before retrying (from the Retry-After header on 429s)
+        self.retry_after = retry_after
@@ -1,15 +1,29 @@
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from mcp.server.fastmcp import FastMCP
 from Error.brevo_error import BrevoApiError
 
-from client.brevo_client import BrevoApiClient
-from tools import send_batch_emails, preview_email, create_email_template,track_email_engagement
-mcp = FastMCP("brevo-mcp1")
+from client.brevo_client import BrevoApiClient, get_shared_client, close_shared_client
+from tools import send_batch_emails, preview_email, create_email_template,track_email_engagement, get_send_job_status
+
+
+@asynccontextmanager
+async def brevo_lifespan(server: FastMCP):
+    """Open the shared Brevo HTTP client with the server and close it on shutdown."""
+    get_shared_client()
+    try:
+        yield {}
+    finally:
+        await close_shared_client()
+
+
+mcp = FastMCP("brevo-mcp1", lifespan=brevo_lifespan)
 
 mcp.tool()(send_batch_emails)
 mcp.tool()(preview_email)
 mcp.tool()(create_email_template)
 mcp.tool()(track_email_engagement)
+mcp.tool()(get_send_job_status)
  
 def main():
     # Initialize and run the server
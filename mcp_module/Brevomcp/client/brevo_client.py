@@ -1,29 +1,81 @@
 import os
 import json
+import random
 import asyncio
+import logging
 from typing import Any, Optional
 
 import httpx  # Fast async HTTP client
 from config import CONFIG
 from Error.brevo_error import BrevoApiError
 
+try:
+    import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
+# Safe to retry on 5xx / network errors; a failed POST may still have been processed
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
 
 class BrevoApiClient:
     """Handles all HTTP communication with the Brevo API."""
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, shared: bool = False):
         self.api_key = api_key or CONFIG["BREVO_API_KEY"]
         self.base_url = base_url or CONFIG["API_BASE_URL"]
         self.timeout = CONFIG["REQUEST_TIMEOUT"] / 1000  # convert ms → seconds
+        # The process-wide client is only closed by close_shared_client()
+        self.shared = shared
 
         if not self.api_key:
             raise ValueError("BREVO_API_KEY is required. Please set it in .env file.")
 
-        # Use a single session for performance
-        self._client = httpx.AsyncClient(timeout=self.timeout)
+        # Use a single session for performance (kept alive across tool calls via get_shared_client)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=_HTTP2_AVAILABLE and CONFIG["HTTP2_ENABLED"],
+            limits=httpx.Limits(
+                max_connections=CONFIG["HTTP_MAX_CONNECTIONS"],
+                max_keepalive_connections=CONFIG["HTTP_MAX_KEEPALIVE_CONNECTIONS"],
+                keepalive_expiry=CONFIG["HTTP_KEEPALIVE_EXPIRY"],
+            ),
+        )
+
+    async def request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        data: Optional[dict] = None,
+        retries: Optional[int] = None
+    ) -> Any:
+        """
+        Send an async request to the Brevo API.
+
+        429s are retried for any method; 5xx and network errors only for idempotent
+        methods. Waits honour Retry-After, otherwise exponential backoff with jitter.
+        Pass retries=0 when the caller does its own retrying.
+        """
+        max_retries = CONFIG["HTTP_MAX_RETRIES"] if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                return await self._request_once(endpoint, method, data)
+            except BrevoApiError as e:
+                retryable = e.status_code == 429 or (
+                    (e.status_code >= 500 or e.status_code in (408, 503)) and method.upper() in _IDEMPOTENT_METHODS
+                )
+                if not retryable or attempt >= max_retries:
+                    raise
+                delay = e.retry_after if e.retry_after is not None else min(
+                    CONFIG["HTTP_BACKOFF_BASE"] * (2 ** attempt), CONFIG["HTTP_BACKOFF_MAX"]
+                ) * (0.5 + random.random())
+                logging.warning(f"🔁 Brevo {method} {endpoint} failed with [{e.status_code}], retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
 
-    async def request(self, endpoint: str, method: str = "GET", data: Optional[dict] = None) -> Any:
-        """Send an async request to the Brevo API."""
+    async def _request_once(self, endpoint: str, method: str, data: Optional[dict]) -> Any:
 
         url = f"{self.base_url}{endpoint}"
         headers = {
@@ -49,6 +101,9 @@ class BrevoApiClient:
 
             return {}
 
+        except BrevoApiError:
+            # Keep the real status (e.g. 429) instead of wrapping it as a 500 below
+            raise
         except httpx.ReadTimeout:
             raise BrevoApiError(408, "Request timeout")
         except httpx.ConnectError as e:
@@ -86,12 +141,42 @@ class BrevoApiClient:
                 raise BrevoApiError(404, "Campaign not found. Check the campaign ID.", error_obj)
             raise BrevoApiError(404, "Resource not found", error_obj)
         elif status == 429:
-            raise BrevoApiError(429, "Rate limit exceeded", error_obj)
+            retry_after = None
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                pass
+            raise BrevoApiError(429, "Rate limit exceeded", error_obj, retry_after=retry_after)
         elif status >= 500:
-            raise BrevoApiError(500, "Server error", error_obj)
+            retry_after = None
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                pass
+            raise BrevoApiError(500, "Server error", error_obj, retry_after=retry_after)
         else:
             raise BrevoApiError(status, message, error_obj)
 
     async def close(self):
-        """Gracefully close the HTTP client."""
+        """Gracefully close the HTTP client (no-op for the shared client)."""
+        if self.shared:
+            return
         await self._client.aclose()
+
+
+_shared_client: Optional[BrevoApiClient] = None
+
+
+def get_shared_client() -> BrevoApiClient:
+    """Process-wide client so connections stay pooled across tool calls."""
+    global _shared_client
+    if _shared_client is None or _shared_client._client.is_closed:
+        _shared_client = BrevoApiClient(shared=True)
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        client, _shared_client = _shared_client, None
+        await client._client.aclose()
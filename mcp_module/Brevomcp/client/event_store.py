@@ -0,0 +1,179 @@
+"""
+Local store for Brevo transactional webhook events.
+
+server.py appends webhook deliveries here; track_email_engagement and the
+email workflow read from it first and only go to the Brevo API for emails the
+store has nothing on. Events are normalized to the names used by the
+statistics API so the same parser works for both sources.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Webhook event name -> statistics API event name (what parse_email_events expects)
+WEBHOOK_EVENT_ALIASES = {
+    "click": "clicks",
+    "unique_opened": "opened",
+    "opened": "opened",
+    "soft_bounce": "softBounces",
+    "hard_bounce": "hard_bounce",
+    "spam": "complaint",
+    "unsubscribed": "unsubscribe",
+    "request": "requests",
+}
+
+
+def _default_store_path() -> Path:
+    override = os.getenv("BREVO_EVENT_STORE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "brevo_events.sqlite3"
+
+
+def normalize_webhook_event(payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map one Brevo webhook payload to a store row; None if it has no email/event."""
+    email = (payload.get("email") or "").strip().lower()
+    event = payload.get("event")
+    if not email or not event:
+        return None
+
+    ts = payload.get("ts_event") or payload.get("ts") or payload.get("ts_epoch")
+    try:
+        ts = float(ts)
+        if ts > 1e12:  # ts_epoch is in milliseconds
+            ts /= 1000.0
+    except (TypeError, ValueError):
+        ts = time.time()
+
+    tags = payload.get("tags") or ([payload["tag"]] if payload.get("tag") else [])
+    return {
+        "email": email,
+        # Empty strings rather than NULL so the UNIQUE key catches redelivered events
+        "message_id": payload.get("message-id") or payload.get("messageId") or "",
+        "event": WEBHOOK_EVENT_ALIASES.get(event, event),
+        "ts": ts,
+        "date": payload.get("date"),
+        "template_id": payload.get("template_id"),
+        "tags": ",".join(str(t) for t in tags) if isinstance(tags, list) else str(tags),
+        "link": payload.get("link") or payload.get("url") or "",
+        "payload": json.dumps(payload, default=str),
+    }
+
+
+class BrevoEventStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else _default_store_path()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS brevo_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    email TEXT NOT NULL,
+                    message_id TEXT,
+                    event TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    date TEXT,
+                    template_id INTEGER,
+                    tags TEXT,
+                    link TEXT,
+                    payload TEXT,
+                    UNIQUE (email, message_id, event, ts, link)
+                );
+                CREATE INDEX IF NOT EXISTS idx_brevo_events_email ON brevo_events (email);
+                CREATE INDEX IF NOT EXISTS idx_brevo_events_message_id ON brevo_events (message_id);
+                CREATE INDEX IF NOT EXISTS idx_brevo_events_event ON brevo_events (event);
+                CREATE INDEX IF NOT EXISTS idx_brevo_events_ts ON brevo_events (ts);
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    def append(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        """Insert webhook payloads; duplicates (Brevo retries) are ignored. Returns rows inserted."""
+        rows = [r for r in (normalize_webhook_event(p) for p in payloads) if r]
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO brevo_events "
+                "(email, message_id, event, ts, date, template_id, tags, link, payload) "
+                "VALUES (:email, :message_id, :event, :ts, :date, :template_id, :tags, :link, :payload)",
+                rows
+            )
+            return conn.total_changes - before
+
+    def events_by_email(
+        self,
+        emails: List[str],
+        message_ids: Optional[List[str]] = None,
+        template_id: Optional[int] = None,
+        since_ts: Optional[float] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Events for the given emails, in the statistics API shape
+        ({email, event, messageId, date, url, tag}, plus the receive time `ts`),
+        keyed by lower-cased email.
+        Emails with no stored events are absent from the result.
+        """
+        if not emails:
+            return {}
+        try:
+            conn = self._connection()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Brevo event store unavailable: {e}")
+            return {}
+
+        wanted = [e.lower() for e in emails]
+        filters, params = [], []
+        if message_ids:
+            filters.append(f"message_id IN ({','.join('?' * len(message_ids))})")
+            params.extend(message_ids)
+        if template_id:
+            filters.append("template_id = ?")
+            params.append(int(template_id))
+        if since_ts:
+            filters.append("ts >= ?")
+            params.append(since_ts)
+        extra = (" AND " + " AND ".join(filters)) if filters else ""
+
+        result: Dict[str, List[Dict[str, Any]]] = {}
+        # Stay well under SQLite's bound-parameter limit
+        for i in range(0, len(wanted), 500):
+            batch = wanted[i:i + 500]
+            rows = conn.execute(
+                f"SELECT email, event, message_id, date, link, tags, ts FROM brevo_events "
+                f"WHERE email IN ({','.join('?' * len(batch))}){extra} ORDER BY ts",
+                batch + params
+            ).fetchall()
+            for email, event, message_id, date, link, tags, ts in rows:
+                result.setdefault(email, []).append({
+                    "email": email,
+                    "event": event,
+                    "messageId": message_id or None,
+                    "date": date,
+                    "url": link or None,
+                    "tag": tags,
+                    "source": "webhook",
+                    "ts": ts,
+                })
+        return result
+
+
+# Process-wide instance
+event_store = BrevoEventStore()
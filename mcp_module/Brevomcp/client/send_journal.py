@@ -0,0 +1,176 @@
+"""
+Append-only journal for resumable send jobs.
+
+A job is one send run, identified by (campaign_id, template_id, run_id).
+Every state change of a chunk is appended as one JSON line and fsync'ed
+before the next step, so after a crash the journal can be replayed to see
+which recipients Brevo already accepted. Retrying the same run skips those
+recipients. Chunks whose outcome is unknown (left pending by a crash, or
+unconfirmed after a 5xx/timeout) must be reconciled against Brevo events
+before their recipients are sent again; see send_batch_emails.
+
+Brevo does not deduplicate sends, so the per-chunk tag is only a label for
+matching events back to a chunk, not an idempotency key.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+CHUNK_PENDING = "pending"
+CHUNK_SENT = "sent"
+CHUNK_FAILED = "failed"
+# Brevo answered 5xx / timed out: the messages may or may not have been accepted
+CHUNK_UNCONFIRMED = "unconfirmed"
+# Outcome settled by looking up Brevo events; "accepted" holds who was found
+CHUNK_RECONCILED = "reconciled"
+UNRESOLVED_STATES = (CHUNK_PENDING, CHUNK_UNCONFIRMED)
+
+
+def _default_journal_dir() -> Path:
+    override = os.getenv("BREVO_SEND_JOURNAL_DIR")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "send_jobs"
+
+
+def make_job_key(campaign_id: str, template_id: Any, run_id: Optional[str] = None) -> str:
+    key = f"{campaign_id}:{template_id}"
+    return f"{key}:{run_id}" if run_id else key
+
+
+def make_chunk_tag(job_key: str, generation: int, emails: List[str]) -> str:
+    digest = hashlib.sha256()
+    digest.update(f"{job_key}|{generation}|".encode("utf-8"))
+    digest.update("|".join(sorted(e.lower() for e in emails)).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+class SendJobJournal:
+    """Replayable per-job JSONL journal."""
+
+    def __init__(self, campaign_id: str, template_id: Any, run_id: Optional[str] = None, journal_dir: Optional[Path] = None):
+        self.job_key = make_job_key(campaign_id, template_id, run_id)
+        self.campaign_id = campaign_id
+        self.template_id = template_id
+        self.run_id = run_id
+        directory = Path(journal_dir) if journal_dir else _default_journal_dir()
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", self.job_key)
+        self.path = directory / f"{safe_name}.jsonl"
+        # generation increments when the job is started over (restart or a new run of a finished job)
+        self.generation = 0
+        self.chunks: Dict[str, Dict[str, Any]] = {}
+        self._replay()
+
+    # ---------- replay ----------
+
+    def _replay(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write is expected; ignore it
+                    continue
+                self._apply(event)
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event.get("event") == "job_reset":
+            self.generation = event.get("generation", self.generation + 1)
+            self.chunks = {}
+            return
+        if event.get("generation", 0) != self.generation:
+            return
+        chunk_key = event.get("chunk_key")
+        if not chunk_key:
+            return
+        chunk = self.chunks.setdefault(chunk_key, {"chunk_key": chunk_key})
+        chunk.update({k: v for k, v in event.items() if k not in ("event", "generation")})
+
+    # ---------- append ----------
+
+    def _append(self, event: Dict[str, Any]) -> None:
+        event = {**event, "ts": time.time(), "job_key": self.job_key, "generation": self.generation}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(event)
+
+    def reset(self) -> None:
+        """Start the job over: earlier confirmations no longer suppress sends."""
+        self.generation += 1
+        self._append({"event": "job_reset"})
+
+    def chunk_tag(self, emails: List[str]) -> str:
+        return make_chunk_tag(self.job_key, self.generation, emails)
+
+    def mark_pending(self, chunk_key: str, chunk_index: int, emails: List[str]) -> None:
+        self._append({"event": "chunk", "chunk_key": chunk_key, "chunk_index": chunk_index,
+                      "state": CHUNK_PENDING, "emails": emails, "attempted_at": time.time()})
+
+    def mark_sent(self, chunk_key: str, accepted: List[Dict[str, Any]], message_ids: List[str]) -> None:
+        self._append({"event": "chunk", "chunk_key": chunk_key, "state": CHUNK_SENT,
+                      "accepted": accepted, "message_ids": message_ids})
+
+    def mark_failed(self, chunk_key: str, error: Optional[str]) -> None:
+        self._append({"event": "chunk", "chunk_key": chunk_key, "state": CHUNK_FAILED, "error": error})
+
+    def mark_unconfirmed(self, chunk_key: str, error: Optional[str]) -> None:
+        self._append({"event": "chunk", "chunk_key": chunk_key, "state": CHUNK_UNCONFIRMED, "error": error,
+                      "attempted_at": time.time()})
+
+    def mark_reconciled(self, chunk_key: str, accepted: List[Dict[str, Any]], resolved: bool) -> None:
+        """
+        Record recipients of an unresolved chunk that Brevo events show as accepted.
+        resolved=False keeps the chunk unconfirmed (the rest are still held back).
+        """
+        self._append({"event": "chunk", "chunk_key": chunk_key, "accepted": accepted,
+                      "state": CHUNK_RECONCILED if resolved else CHUNK_UNCONFIRMED})
+
+    # ---------- queries ----------
+
+    def confirmed_recipients(self) -> Dict[str, Dict[str, Any]]:
+        """email (lower-case) -> {email, message_id, chunk_key} for every accepted recipient."""
+        confirmed = {}
+        for chunk in self.chunks.values():
+            # Sent chunks, plus whoever reconciliation found in unresolved ones
+            for item in chunk.get("accepted", []):
+                email = (item.get("email") or "").lower()
+                if email:
+                    confirmed[email] = {**item, "chunk_key": chunk["chunk_key"]}
+        return confirmed
+
+    def is_chunk_sent(self, chunk_key: str) -> bool:
+        return self.chunks.get(chunk_key, {}).get("state") == CHUNK_SENT
+
+    def unresolved_chunks(self) -> List[Dict[str, Any]]:
+        """Chunks whose outcome is unknown: pending (crash mid-send) or unconfirmed (5xx/timeout)."""
+        return [c for c in self.chunks.values() if c.get("state") in UNRESOLVED_STATES]
+
+    def is_complete(self) -> bool:
+        """Every chunk of this generation has a known outcome."""
+        return bool(self.chunks) and not self.unresolved_chunks()
+
+    def summary(self) -> Dict[str, Any]:
+        states = [c.get("state") for c in self.chunks.values()]
+        return {
+            "job_key": self.job_key,
+            "generation": self.generation,
+            "chunks_total": len(states),
+            "chunks_sent": states.count(CHUNK_SENT),
+            "chunks_pending": states.count(CHUNK_PENDING),
+            "chunks_failed": states.count(CHUNK_FAILED),
+            "chunks_unconfirmed": states.count(CHUNK_UNCONFIRMED),
+            "chunks_reconciled": states.count(CHUNK_RECONCILED),
+            "recipients_confirmed": len(self.confirmed_recipients()),
+        }
@@ -0,0 +1,161 @@
+"""
+Brevo template cache and compiled renderer.
+
+Templates are compiled once into a token list: literal text interleaved with
+parameter slots ({{key}}, {{params.key}}, {{ params.key }}). Rendering a
+preview is then a single join over the tokens, and the params.* names fall
+out of the compile step. Links are extracted from the rendered HTML, since a
+parameter can supply or change an href.
+
+Compiled templates are kept in a JSON file keyed by (template_id, modifiedAt)
+so that short-lived MCP server processes share them. Every lookup re-fetches
+the template and compares modifiedAt, so edits made in the Brevo UI are picked
+up; only the compile step is skipped. Setting BREVO_TEMPLATE_CACHE_TTL_SECONDS
+serves cached templates without that check for the given number of seconds.
+"""
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Union
+
+DEFAULT_TEMPLATE_CACHE_TTL_SECONDS = 0
+
+# {{key}}, {{params.key}}, {{ params.key }} — same variants preview_email always supported
+_SLOT_RE = re.compile(r"\{\{\s*(params\.)?([A-Za-z0-9_]+)\s*\}\}")
+_HREF_RE = re.compile(r'href=[\'"]?(https?://[^\'" >]+)')
+
+# A token is either literal text or a slot: [name, raw_text]
+Token = Union[str, List[str]]
+
+
+def compile_text(text: str) -> List[Token]:
+    tokens: List[Token] = []
+    pos = 0
+    for match in _SLOT_RE.finditer(text or ""):
+        if match.start() > pos:
+            tokens.append(text[pos:match.start()])
+        tokens.append([match.group(2), match.group(0)])
+        pos = match.end()
+    if pos < len(text or ""):
+        tokens.append(text[pos:])
+    return tokens
+
+
+def extract_links(html: str) -> List[str]:
+    """Unique href links in document order."""
+    return list(dict.fromkeys(m.group(1) for m in _HREF_RE.finditer(html or "")))
+
+
+def render_tokens(tokens: List[Token], params: Dict[str, Any]) -> str:
+    """Fill slots from params; slots without a value keep their original text."""
+    out = []
+    for token in tokens:
+        if isinstance(token, str):
+            out.append(token)
+        else:
+            name, raw = token
+            out.append(str(params[name]) if name in params else raw)
+    return "".join(out)
+
+
+class CompiledTemplate:
+    def __init__(self, template_id: int, data: Dict[str, Any]):
+        self.template_id = template_id
+        self.name = data.get("name", "")
+        self.modified_at = data.get("modifiedAt")
+        self.sender = data.get("sender", {}) or {}
+        self.subject = data.get("subject", "") or ""
+        self.html = data.get("htmlContent", "") or ""
+
+        if "subject_tokens" in data:
+            self.subject_tokens = data["subject_tokens"]
+            self.html_tokens = data["html_tokens"]
+            self.param_names = data["param_names"]
+        else:
+            self.subject_tokens = compile_text(self.subject)
+            self.html_tokens = compile_text(self.html)
+            # Only the params.* form is a Brevo template param; bare {{key}} is left to the renderer
+            self.param_names = sorted({m.group(2) for m in _SLOT_RE.finditer(self.html) if m.group(1)})
+
+    def render(self, params: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "subject": render_tokens(self.subject_tokens, params),
+            "html_content": render_tokens(self.html_tokens, params),
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "modifiedAt": self.modified_at,
+            "sender": self.sender,
+            "subject": self.subject,
+            "htmlContent": self.html,
+            "subject_tokens": self.subject_tokens,
+            "html_tokens": self.html_tokens,
+            "param_names": self.param_names,
+        }
+
+
+def _default_cache_path() -> Path:
+    override = os.getenv("BREVO_TEMPLATE_CACHE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "brevo_templates.json"
+
+
+class TemplateCache:
+    """JSON-file cache of compiled templates keyed by (template_id, modifiedAt)."""
+
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: Optional[int] = None):
+        self.path = Path(path) if path else _default_cache_path()
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else int(
+            os.getenv("BREVO_TEMPLATE_CACHE_TTL_SECONDS", DEFAULT_TEMPLATE_CACHE_TTL_SECONDS)
+        )
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, entries: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
+    async def get(self, client, template_id: int) -> CompiledTemplate:
+        key = str(template_id)
+        entries = self._load()
+        entry = entries.get(key)
+        if entry and self.ttl_seconds > 0 and time.time() - entry.get("checked_at", 0) < self.ttl_seconds:
+            return CompiledTemplate(template_id, entry["compiled"])
+
+        data = await client.request(f"/smtp/templates/{template_id}", method="GET")
+        if entry and entry.get("modifiedAt") and entry["modifiedAt"] == data.get("modifiedAt"):
+            compiled = CompiledTemplate(template_id, entry["compiled"])
+        else:
+            compiled = CompiledTemplate(template_id, data)
+
+        entries[key] = {"modifiedAt": compiled.modified_at, "checked_at": time.time(), "compiled": compiled.to_dict()}
+        try:
+            self._save(entries)
+        except OSError:
+            pass  # cache is an optimisation only
+        return compiled
+
+    def invalidate(self, template_id: Optional[int] = None) -> None:
+        entries = self._load() if template_id is not None else {}
+        entries.pop(str(template_id), None)
+        try:
+            self._save(entries)
+        except OSError:
+            pass
+
+
+template_cache = TemplateCache()
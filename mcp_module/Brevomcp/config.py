@@ -36,6 +36,30 @@ CONFIG = {
     "MAX_CAMPAIGNS_SEARCH": 1000,
     "REQUEST_TIMEOUT": 30000, 
 
+    # send_batch_emails chunking / rate limiting
+    "SEND_RATE_PER_SECOND": 5,
+    "SEND_MAX_CONCURRENCY": 4,
+    "SEND_MAX_RETRIES": 3,
+    # Unresolved chunks with no Brevo events after this long are resent
+    "SEND_RECONCILE_GRACE_SECONDS": 900,
+
+    # track_email_engagement bulk event fetch
+    "EVENTS_PAGE_SIZE": 2500,
+    "EVENTS_MAX_PAGES": 40,
+    "EVENTS_BULK_THRESHOLD": 20,
+    "EVENTS_FALLBACK_CONCURRENCY": 10,
+    # Stored webhook events count as complete for an email when its newest one is this recent
+    "EVENTS_STORE_FRESH_SECONDS": 900,
+
+    # Shared HTTP client (client/brevo_client.get_shared_client)
+    "HTTP2_ENABLED": True,
+    "HTTP_MAX_CONNECTIONS": 20,
+    "HTTP_MAX_KEEPALIVE_CONNECTIONS": 10,
+    "HTTP_KEEPALIVE_EXPIRY": 30,
+    "HTTP_MAX_RETRIES": 3,
+    "HTTP_BACKOFF_BASE": 0.5,
+    "HTTP_BACKOFF_MAX": 30,
+
     # Pull from Vault instead of .env
     "API_BASE_URL": brevo_secrets.get("BREVO_BASE_URL", ""),
     "BREVO_API_KEY": brevo_secrets.get("BREVO_API_KEY", "")
@@ -2,5 +2,6 @@ from .send_batch_emails import send_batch_emails
 from .preview_email import preview_email
 from .track_email_engagement import track_email_engagement
 from .create_email_template import create_email_template
+from .get_send_job_status import get_send_job_status
 
-__all__ = ['send_batch_emails', 'preview_email', 'track_email_engagement', 'create_email_template']
\ No newline at end of file
+__all__ = ['send_batch_emails', 'preview_email', 'track_email_engagement', 'create_email_template', 'get_send_job_status']
\ No newline at end of file
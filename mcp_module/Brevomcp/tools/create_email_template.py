@@ -2,7 +2,8 @@ from __future__ import annotations
 from typing import Dict, Any, Optional
 import json
 import traceback
-from client.brevo_client import BrevoApiClient
+from client.brevo_client import get_shared_client
+from client.template_cache import template_cache
 from Error.brevo_error import BrevoApiError
 
 
@@ -33,7 +34,7 @@ async def create_email_template(
     # For robust tool usage, we can default to a known email if None.
     final_sender_email = sender_email or "aleenamathews2001@gmail.com" # Default fallback similar to send_batch_emails
 
-    client = BrevoApiClient()
+    client = get_shared_client()
     
     try:
         payload = {
@@ -52,6 +53,8 @@ async def create_email_template(
         
         # Response for create template is typically: {'id': 123}
         if isinstance(response, dict) and "id" in response:
+             # Drop any cached copy under this id so the next preview compiles the saved HTML
+             template_cache.invalidate(response["id"])
              return json.dumps(response, indent=2)
         elif isinstance(response, dict):
              # Just return whatever valid JSON we got
@@ -71,5 +74,3 @@ async def create_email_template(
             "error": f"Exception calling Brevo: {str(e)}", 
             "traceback": traceback.format_exc()
         })
-    finally:
-        await client.close()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+from typing import Any, Optional
+import json
+
+try:
+    from mcp_module.Brevomcp.client.send_journal import SendJobJournal
+except ImportError:
+    from client.send_journal import SendJobJournal
+
+
+async def get_send_job_status(campaign_id: str, template_id: int, run_id: Optional[str] = None) -> str:
+    """
+    Report the progress of a journaled send job (see send_batch_emails campaign_id / run_id).
+
+    Returns a JSON string with chunk counts by state (sent / pending / failed /
+    unconfirmed / reconciled),
+    the number of confirmed recipients, and the confirmed recipients with their
+    Brevo message IDs. Useful for polling large sends running in the background.
+    """
+    if not campaign_id or not template_id:
+        return json.dumps({"status": "error", "message": "campaign_id and template_id are required"}, indent=2)
+
+    journal = SendJobJournal(campaign_id, template_id, run_id)
+    if not journal.chunks:
+        return json.dumps({"status": "not_found", "job_key": journal.job_key}, indent=2)
+
+    summary = journal.summary()
+    if summary["chunks_pending"]:
+        status = "in_progress"
+    elif summary["chunks_unconfirmed"]:
+        status = "completed_with_unconfirmed"
+    elif summary["chunks_failed"]:
+        status = "completed_with_failures"
+    else:
+        status = "completed"
+
+    return json.dumps({
+        "status": status,
+        **summary,
+        "confirmed": list(journal.confirmed_recipients().values())
+    }, indent=2)
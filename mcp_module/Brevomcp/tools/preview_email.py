@@ -2,10 +2,12 @@
 from typing import List, Dict, Any, Optional
 
 try:
-    from mcp_module.Brevomcp.client.brevo_client import BrevoApiClient
+    from mcp_module.Brevomcp.client.brevo_client import get_shared_client
+    from mcp_module.Brevomcp.client.template_cache import template_cache, extract_links
     from mcp_module.Brevomcp.Error.brevo_error import BrevoApiError
 except ImportError:
-    from client.brevo_client import BrevoApiClient
+    from client.brevo_client import get_shared_client
+    from client.template_cache import template_cache, extract_links
     from Error.brevo_error import BrevoApiError
  
 async def preview_email(
@@ -25,6 +27,8 @@ async def preview_email(
 
     This method fetches the specified Brevo template, applies any dynamic parameters defined for
     each recipient, and renders a personalized version of the email body.
+    The result also includes an "analysis" block with the links found in the
+    rendered previews and the template's params.* names.
  
     Notes:
         - No actual emails are sent; this function is for preview/testing ONLY
@@ -42,35 +46,22 @@ async def preview_email(
     if not template_id or not all_contacts:
         return {"status": "error", "error": "Missing required fields: template_id and recipients/cc/bcc"}
 
-    client = BrevoApiClient()
+    client = get_shared_client()
     try:
-        # Fetch the template
-        template_data = await client.request(f"/smtp/templates/{template_id}", method="GET")
-
-        html_content = template_data.get("htmlContent", "")
-        subject = template_data.get("subject", "")
-        sender = template_data.get("sender", {})
+        # Fetch (or reuse) the compiled template
+        template = await template_cache.get(client, template_id)
+        sender = template.sender
 
         previews = []
+        links: Dict[str, None] = {}
 
         for contact in all_contacts:
             email = contact.get("email")
             name = contact.get("name", "")
             params = contact.get("params", {})
 
-            # Copy content for this contact
-            rendered_html = html_content
-            rendered_subject = subject
-
-            # Replace both {{key}} and {{params.key}} variants
-            for key, value in params.items():
-                rendered_html = rendered_html.replace(f"{{{{{key}}}}}", str(value))
-                rendered_html = rendered_html.replace(f"{{{{ params.{key} }}}}", str(value))
-                rendered_html = rendered_html.replace(f"{{{{params.{key}}}}}", str(value))
-
-                rendered_subject = rendered_subject.replace(f"{{{{{key}}}}}", str(value))
-                rendered_subject = rendered_subject.replace(f"{{{{ params.{key} }}}}", str(value))
-                rendered_subject = rendered_subject.replace(f"{{{{params.{key}}}}}", str(value))
+            rendered = template.render(params)
+            links.update(dict.fromkeys(extract_links(rendered["html_content"])))
 
             previews.append({
                 "recipient": {"email": email, "name": name},
@@ -78,19 +69,24 @@ async def preview_email(
                     "email": sender_email or sender.get("email", ""),
                     "name": sender_name or sender.get("name", "")
                 },
-                "subject": rendered_subject,
-                "original_subject": subject,
-                "html_content": rendered_html,
-                "original_html": html_content,
+                "subject": rendered["subject"],
+                "original_subject": template.subject,
+                "html_content": rendered["html_content"],
+                "original_html": template.html,
                 "params_used": params
             })
 
         return {
             "status": "success",
             "template_id": template_id,
-            "template_name": template_data.get("name", ""),
+            "template_name": template.name,
             "total_recipients": len(previews),
-            "previews": previews
+            "previews": previews,
+            "analysis": {
+                "links": list(links),
+                "params": template.param_names,
+                "modified_at": template.modified_at
+            }
         }
 
     except BrevoApiError as e:
@@ -99,6 +95,3 @@ async def preview_email(
             "error": f"[{e.status_code}] {e.message}",
             "details": e.details
         }
-
-    finally:
-        await client.close()
\ No newline at end of file
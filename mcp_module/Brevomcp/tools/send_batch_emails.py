@@ -1,14 +1,207 @@
 from __future__ import annotations
 from typing import List, Dict, Any, Optional
 import json
+import asyncio
+import logging
+import time
 import traceback
+from datetime import datetime
+from mcp.server.fastmcp import Context
 
 try:
-    from mcp_module.Brevomcp.client.brevo_client import BrevoApiClient
+    from mcp_module.Brevomcp.client.brevo_client import BrevoApiClient, get_shared_client
+    from mcp_module.Brevomcp.client.send_journal import SendJobJournal
+    from mcp_module.Brevomcp.client.event_store import event_store
+    from mcp_module.Brevomcp.tools.track_email_engagement import fetch_events_per_email
     from mcp_module.Brevomcp.Error.brevo_error import BrevoApiError
+    from mcp_module.Brevomcp.config import CONFIG
 except ImportError:
-    from client.brevo_client import BrevoApiClient
+    from client.brevo_client import BrevoApiClient, get_shared_client
+    from client.send_journal import SendJobJournal
+    from client.event_store import event_store
+    from tools.track_email_engagement import fetch_events_per_email
     from Error.brevo_error import BrevoApiError
+    from config import CONFIG
+# Shared with the Linkly server; config has put the project root on sys.path
+from mcp_module.common.rate_limiter import AdaptiveTokenBucket
+
+# Shared across calls in this server process so throttling state carries over
+_send_bucket: Optional[AdaptiveTokenBucket] = None
+
+
+def _get_send_bucket() -> AdaptiveTokenBucket:
+    global _send_bucket
+    if _send_bucket is None:
+        _send_bucket = AdaptiveTokenBucket(rate=CONFIG["SEND_RATE_PER_SECOND"])
+    return _send_bucket
+
+
+def _extract_message_ids(response: Any) -> List[str]:
+    """Brevo returns {"messageId": ...} for one message or {"messageIds": [...]} for messageVersions."""
+    if not isinstance(response, dict):
+        return []
+    if isinstance(response.get("messageIds"), list):
+        return [str(m) for m in response["messageIds"]]
+    if response.get("messageId"):
+        return [str(response["messageId"])]
+    return []
+
+
+def _event_ts(event: Dict[str, Any]) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(event.get("date")).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+async def _reconcile_unresolved(client: BrevoApiClient, journal: SendJobJournal, template_id: Any) -> Dict[str, str]:
+    """
+    Settle chunks whose outcome is unknown (left pending by a crash, or
+    unconfirmed after a 5xx/timeout) before anything is resent.
+
+    Recipients with Brevo events (webhook store first, then the statistics API)
+    since the chunk was attempted are recorded as accepted. The rest are only
+    released for resending once the chunk is older than
+    SEND_RECONCILE_GRACE_SECONDS, since events can lag; until then, or when the
+    lookup itself fails, they are held back. Returns held email -> reason.
+    """
+    chunks = journal.unresolved_chunks()
+    emails = sorted({e.lower() for c in chunks for e in c.get("emails", [])})
+    if not emails:
+        return {}
+    since = min(c.get("attempted_at") or c.get("ts") or 0 for c in chunks) - 60
+
+    found = event_store.events_by_email(emails, template_id=template_id, since_ts=since)
+    missing = [e for e in emails if e not in found]
+    lookup_errors: Dict[str, Any] = {}
+    if missing:
+        api_events: Dict[str, List[Dict[str, Any]]] = {e: [] for e in missing}
+        lookup_errors = await fetch_events_per_email(client, missing, api_events)
+        for email, events in api_events.items():
+            events = [
+                ev for ev in events
+                if (_event_ts(ev) or 0) >= since
+                and (not template_id or ev.get("templateId") in (None, template_id, str(template_id)))
+            ]
+            if events:
+                found[email] = events
+
+    now = time.time()
+    held: Dict[str, str] = {}
+    recovered = 0
+    for chunk in chunks:
+        accepted, unresolved = [], []
+        for email in chunk.get("emails", []):
+            events = found.get(email.lower())
+            if events:
+                message_id = next((ev.get("messageId") for ev in events if ev.get("messageId")), None)
+                accepted.append({"email": email, "message_id": message_id, "source": "reconciled"})
+            else:
+                unresolved.append(email)
+        recovered += len(accepted)
+
+        age = now - (chunk.get("attempted_at") or chunk.get("ts") or now)
+        can_release = age >= CONFIG["SEND_RECONCILE_GRACE_SECONDS"] and not any(e in lookup_errors for e in unresolved)
+        if accepted or can_release:
+            journal.mark_reconciled(chunk["chunk_key"], accepted, resolved=can_release or not unresolved)
+        if not can_release:
+            for email in unresolved:
+                held[email.lower()] = "Outcome of an earlier attempt unknown; waiting for Brevo events before resending"
+
+    logging.info(
+        f"🔎 [send_batch_emails] Reconciled {len(chunks)} unresolved chunk(s): "
+        f"{recovered} recipient(s) confirmed from events, {len(held)} held back"
+    )
+    return held
+
+
+async def _send_chunk(
+    client: BrevoApiClient,
+    bucket: AdaptiveTokenBucket,
+    semaphore: asyncio.Semaphore,
+    chunk_index: int,
+    payload: Dict[str, Any],
+    emails: List[str],
+    per_version_ids: bool,
+    journal: Optional[SendJobJournal] = None,
+) -> Dict[str, Any]:
+    """
+    POST one chunk, retrying 429s through the shared adaptive bucket.
+
+    5xx responses and timeouts are not retried: Brevo may already have accepted
+    the messages, so the chunk is reported "unconfirmed" instead of resent.
+    """
+    max_retries = CONFIG["SEND_MAX_RETRIES"]
+    last_error = None
+
+    chunk_key = None
+    if journal:
+        chunk_key = journal.chunk_tag(emails)
+        # Label only (Brevo does not dedupe on it): lets webhook payloads be traced to this chunk
+        chunk_headers = dict(payload.get("headers") or {})
+        chunk_headers.setdefault("X-Mailin-custom", f"send_chunk:{chunk_key}")
+        payload = {**payload, "headers": chunk_headers}
+
+    async with semaphore:
+        if journal:
+            journal.mark_pending(chunk_key, chunk_index, emails)
+        for attempt in range(max_retries + 1):
+            await bucket.acquire()
+            try:
+                # retries=0: this loop owns retrying so 429s also feed the adaptive bucket
+                response = await client.request("/smtp/email", method="POST", data=payload, retries=0)
+            except BrevoApiError as e:
+                last_error = f"[{e.status_code}] {e.message}"
+                if e.status_code == 429:
+                    bucket.on_throttled(e.retry_after)
+                    logging.warning(f"⏳ [send_batch_emails] Chunk {chunk_index} throttled (429), rate now {bucket.rate:.2f}/s")
+                    continue
+                if e.status_code >= 500 or e.status_code == 408:
+                    logging.error(f"❓ [send_batch_emails] Chunk {chunk_index} outcome unknown ({last_error}); not resending")
+                    if journal:
+                        journal.mark_unconfirmed(chunk_key, last_error)
+                    return {
+                        "chunk_index": chunk_index,
+                        "chunk_key": chunk_key,
+                        "status": "unconfirmed",
+                        "recipients": len(emails),
+                        "message_ids": [],
+                        "accepted": [],
+                        "error": last_error,
+                    }
+                break
+
+            bucket.on_success()
+            message_ids = _extract_message_ids(response)
+            if per_version_ids and len(message_ids) == len(emails):
+                accepted = [{"email": e, "message_id": m} for e, m in zip(emails, message_ids)]
+            else:
+                shared_id = message_ids[0] if message_ids else None
+                accepted = [{"email": e, "message_id": shared_id} for e in emails]
+            if journal:
+                journal.mark_sent(chunk_key, accepted, message_ids)
+            return {
+                "chunk_index": chunk_index,
+                "chunk_key": chunk_key,
+                "status": "sent",
+                "recipients": len(emails),
+                "message_ids": message_ids,
+                "accepted": accepted,
+                "attempts": attempt + 1,
+            }
+
+    logging.error(f"❌ [send_batch_emails] Chunk {chunk_index} failed: {last_error}")
+    if journal:
+        journal.mark_failed(chunk_key, last_error)
+    return {
+        "chunk_index": chunk_index,
+        "chunk_key": chunk_key,
+        "status": "failed",
+        "recipients": len(emails),
+        "message_ids": [],
+        "accepted": [],
+        "error": last_error,
+    }
 
  
  
@@ -22,7 +215,12 @@ async def send_batch_emails(
     cc: Optional[List[Dict[str, Any]]] = None,
     bcc: Optional[List[Dict[str, Any]]] = None,
     tags: Optional[List[str]] = None,
-    headers: Optional[Dict[str, str]] = None
+    headers: Optional[Dict[str, str]] = None,
+    chunk_size: Optional[int] = None,
+    campaign_id: Optional[str] = None,
+    run_id: Optional[str] = None,
+    restart_job: bool = False,
+    ctx: Optional[Context] = None
 ) -> str:
      
     """
@@ -42,7 +240,24 @@ async def send_batch_emails(
         * Create ONE object per recipient with their actual data (no placeholders)
         * Each object should have 'to' (list with one recipient) and 'params' (personalization data)
     
-    Returns a JSON string with success status, message ID, and send statistics.
+    - chunk_size: Optional number of messageVersions per API request (default from config)
+
+    Large recipient lists are split into API-sized chunks and sent concurrently under an
+    adaptive rate limiter that backs off on 429 responses. Recipients processed so far are
+    reported through the MCP context as each chunk finishes.
+
+    - campaign_id: When given, the send is journaled as a job keyed by (campaign_id, template_id, run_id).
+        Retrying an unfinished job resumes it: recipients already accepted by Brevo are skipped, and
+        recipients of chunks with an unknown outcome are checked against Brevo events first.
+    - run_id: Identifies one send run (e.g. one workflow execution). Retrying with the same run_id
+        resumes that run; a new run_id is a new send. Without a run_id, a job whose chunks all
+        finished is started over on the next call.
+    - restart_job: Ignore earlier confirmations for this job and send to everyone again
+
+    Returns a JSON string with overall status ("success", "partial_success" or "error"),
+    per-chunk message IDs, and per-recipient "success" / "failed" / "unconfirmed" lists
+    keyed by email. "unconfirmed" recipients hit a 5xx or timeout and may already have
+    received the email; they are not retried automatically.
     
     NOTE: For previewing/testing email content WITHOUT sending, use the preview_email tool instead.
     """
@@ -69,7 +284,7 @@ async def send_batch_emails(
     if not recipients and not message_versions:
         raise ValueError("Must provide either recipients or message_versions")
 
-    client = BrevoApiClient()
+    client = get_shared_client()
 
     try:
         # CASE 1: Template with individual params (use messageVersions)
@@ -221,11 +436,67 @@ async def send_batch_emails(
         #     if headers:
         #         payload["headers"] = headers
 
-        # Make the API request
-        import logging
-        logging.info(f"📤 [send_batch_emails] Sending payload to Brevo: {json.dumps(payload, indent=2)}")
-        response = await client.request("/smtp/email", method="POST", data=payload)
-        
+        # Resume support: skip recipients an earlier attempt of this run already delivered
+        journal = None
+        already_confirmed = {}
+        held = {}
+        if campaign_id:
+            journal = SendJobJournal(campaign_id, template_id, run_id)
+            if restart_job or (not run_id and journal.is_complete()):
+                # No run id and nothing left to resume: this is a new send, not a retry
+                journal.reset()
+            if journal.unresolved_chunks():
+                held = await _reconcile_unresolved(client, journal, template_id)
+            already_confirmed = journal.confirmed_recipients()
+            if already_confirmed:
+                logging.info(f"♻️ [send_batch_emails] Resuming job {journal.job_key}: {len(already_confirmed)} recipient(s) already sent")
+
+        # Split into API-sized chunks
+        size = min(chunk_size or CONFIG["DEFAULT_BATCH_SIZE"], CONFIG["MAX_BATCH_SIZE"])
+        chunk_jobs = []
+        if "messageVersions" in payload:
+            versions = [
+                v for v in payload.pop("messageVersions")
+                if v["to"][0]["email"].lower() not in already_confirmed
+                and v["to"][0]["email"].lower() not in held
+            ]
+            for i in range(0, len(versions), size):
+                chunk_versions = versions[i:i + size]
+                chunk_jobs.append((
+                    {**payload, "messageVersions": chunk_versions},
+                    [v["to"][0]["email"] for v in chunk_versions],
+                    True
+                ))
+        else:
+            emails = [r["email"] for r in (recipients or []) + cc + bcc if r.get("email")]
+            # One shared message can't go to only part of its recipients, so it waits while any are held
+            if not any(e.lower() in held for e in emails) and not all(e.lower() in already_confirmed for e in emails):
+                chunk_jobs.append((payload, emails, False))
+
+        total_to_send = sum(len(j[1]) for j in chunk_jobs)
+        logging.info(f"📤 [send_batch_emails] Sending {total_to_send} recipient(s) in {len(chunk_jobs)} chunk(s)")
+
+        semaphore = asyncio.Semaphore(CONFIG["SEND_MAX_CONCURRENCY"])
+        bucket = _get_send_bucket()
+        recipients_done = 0
+
+        async def send_and_report(idx, chunk_payload, emails, per_version_ids):
+            # Report recipients processed (sent, failed or unconfirmed) as each chunk finishes
+            nonlocal recipients_done
+            chunk_result = await _send_chunk(client, bucket, semaphore, idx, chunk_payload, emails, per_version_ids, journal)
+            recipients_done += len(emails)
+            if ctx is not None:
+                try:
+                    await ctx.report_progress(recipients_done, total_to_send)
+                except Exception as e:
+                    logging.debug(f"Progress notification failed: {e}")
+            return chunk_result
+
+        chunk_results = await asyncio.gather(*[
+            send_and_report(idx, chunk_payload, emails, per_version_ids)
+            for idx, (chunk_payload, emails, per_version_ids) in enumerate(chunk_jobs)
+        ])
+
         # Determine mode based on what was sent
         if template_id and message_versions:
             mode = "template_with_personalization"
@@ -236,16 +507,46 @@ async def send_batch_emails(
         else:
             mode = "simple_email"
 
+        success = [{**item, "source": "journal"} for item in already_confirmed.values()]
+        failed = []
+        unconfirmed = [{"email": email, "error": reason} for email, reason in held.items()]
+        chunks_summary = []
+        for chunk_result, (_, emails, _) in zip(chunk_results, chunk_jobs):
+            idx = chunk_result["chunk_index"]
+            if chunk_result["status"] == "sent":
+                success.extend({**a, "chunk_index": idx} for a in chunk_result["accepted"])
+            elif chunk_result["status"] == "unconfirmed":
+                unconfirmed.extend({"email": e, "error": chunk_result["error"], "chunk_index": idx} for e in emails)
+            else:
+                failed.extend({"email": e, "error": chunk_result["error"], "chunk_index": idx} for e in emails)
+            chunks_summary.append({k: v for k, v in chunk_result.items() if k != "accepted"})
+
+        if not failed and not unconfirmed:
+            status = "success"
+        elif success:
+            status = "partial_success"
+        else:
+            status = "error"
+
         result = {
-            "status": "success",
+            "status": status,
             "mode": mode,
-            "messageId": response,
+            "messageIds": [m for c in chunk_results for m in c["message_ids"]],
             "template_id": template_id,
-            "recipients_sent": len(recipients) if recipients else len(message_versions) if message_versions else 0,
+            "recipients_sent": len(success),
+            "recipients_failed": len(failed),
+            "recipients_unconfirmed": len(unconfirmed),
             "cc_sent": len(cc),
             "bcc_sent": len(bcc),
-            "tags": tags
+            "tags": tags,
+            "chunks": chunks_summary,
+            "success": success,
+            "failed": failed,
+            # Brevo returned 5xx / timed out: may or may not have been delivered; never auto-resent
+            "unconfirmed": unconfirmed
         }
+        if journal:
+            result["job"] = journal.summary()
 
         return json.dumps(result, indent=2)
 
@@ -259,5 +560,3 @@ async def send_batch_emails(
     except Exception as e:
         # Re-raise other exceptions with traceback
         raise RuntimeError(f"Email sending failed: {str(e)}\n{traceback.format_exc()}")
-    finally:
-        await client.close()
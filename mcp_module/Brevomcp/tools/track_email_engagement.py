@@ -1,16 +1,49 @@
 
 from typing import Any, List, Dict, Optional
 from urllib.parse import urlencode
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
 
 try:
-    from mcp_module.Brevomcp.client.brevo_client import BrevoApiClient
+    from mcp_module.Brevomcp.client.brevo_client import BrevoApiClient, get_shared_client
+    from mcp_module.Brevomcp.client.event_store import event_store
     from mcp_module.Brevomcp.Error.brevo_error import BrevoApiError
+    from mcp_module.Brevomcp.config import CONFIG
 except ImportError:
-    from client.brevo_client import BrevoApiClient
+    from client.brevo_client import BrevoApiClient, get_shared_client
+    from client.event_store import event_store
     from Error.brevo_error import BrevoApiError
- 
+    from config import CONFIG
+
+# Once one of these is stored, later events would not change the engagement flags
+SETTLED_EVENTS = {"clicks", "hard_bounce", "softBounces", "invalid_email", "unsubscribe", "complaint"}
+
+
+def _store_covers(events: List[Dict[str, Any]]) -> bool:
+    """
+    Stored webhook events are enough for an email when they already settle its
+    status, or when the newest one is recent (webhooks are flowing). Otherwise
+    the webhook may have missed later events and the API is asked as well.
+    """
+    if not events:
+        return False
+    if any(e.get("event") in SETTLED_EVENTS for e in events):
+        return True
+    newest = max((e.get("ts") or 0) for e in events)
+    return newest >= time.time() - CONFIG["EVENTS_STORE_FRESH_SECONDS"]
+
+
 async def track_email_engagement(
-emails: List[str]
+emails: List[str],
+tags: Optional[List[str]] = None,
+message_ids: Optional[List[str]] = None,
+template_id: Optional[int] = None,
+start_date: Optional[str] = None,
+end_date: Optional[str] = None,
+days: Optional[int] = None,
+use_event_store: bool = True
  )->Dict[str, Any]:
     """
     Track email engagement (opens, clicks, bounces, deliveries) for one or more
@@ -19,54 +52,204 @@ emails: List[str]
     Use this tool after sending emails to see who engaged. It calls Brevo's
     statistics API, returns per-email metrics plus an overall campaign summary
     with open/click/bounce/delivery rates.
+
+    For large lists pass a filter (tags, message_ids, template_id, or a
+    start_date/end_date (YYYY-MM-DD) or days window): events are then pulled in
+    a few paginated bulk calls and bucketed by email instead of one call per
+    address.
+
+    Events received through the Brevo webhook (/webhooks/brevo) are read from
+    the local event store first; the API is only queried for emails the store
+    has no events for, or whose stored events neither settle the status (click,
+    bounce, unsubscribe, complaint) nor are recent. Set use_event_store=False to
+    always query the API.
     """
-    
+
 
     if not emails:
         return {"status": "error", "error": "Missing required input: emails"}
 
-    client = BrevoApiClient()
+    client = get_shared_client()
     engagement_results: Dict[str, Any] = {}
+    events_by_email: Dict[str, List[Dict[str, Any]]] = {e.lower(): [] for e in emails}
+    fetch_mode = "per_email"
 
-    try:
+    # Webhook-fed events first: emails the store already covers need no API call
+    stored_emails: List[str] = []
+    if use_event_store:
+        stored = event_store.events_by_email(
+            list(emails), message_ids=message_ids, template_id=template_id,
+            since_ts=_window_start_ts(start_date, days)
+        )
         for email in emails:
-            try:
-                events_data = await get_statistics_events(client, email)
-                if events_data:
-                    engagement_results[email] = events_data
-                else:
-                    engagement_results[email] = {
-                        "email": email,
-                        "note": "No events found. Email may not have been opened or tracking disabled.",
-                        "opened": False,
-                        "clicked": False,
-                        "delivered": False,
-                        "bounced": False
-                    }
+            events = stored.get(email.lower())
+            if events:
+                # Kept even if the API is asked too, so a failed API call still reports them
+                events_by_email[email.lower()] = events
+                if _store_covers(events):
+                    stored_emails.append(email)
+    api_emails = [e for e in emails if e not in stored_emails]
+    fallback_emails: List[str] = list(api_emails)
+    if stored_emails:
+        logging.info(f"🗄️ Event store covered {len(stored_emails)}/{len(emails)} email(s)")
 
-            except BrevoApiError as e:
-                engagement_results[email] = {
-                    "status": "error",
-                    "error": f"[{e.status_code}] {e.message}"
-                }
-            except Exception as e:
-                engagement_results[email] = {
-                    "status": "error",
-                    "error": str(e)
-                }
+    has_filter = bool(tags or message_ids or template_id or start_date or end_date or days)
+    use_bulk = has_filter or len(api_emails) >= CONFIG["EVENTS_BULK_THRESHOLD"]
 
-    finally:
-        await client.close()
+    if api_emails and use_bulk:
+        api_events = {e.lower(): [] for e in api_emails}
+        try:
+            complete = await fetch_events_bulk(
+                client, api_events,
+                tags=tags, message_ids=message_ids, template_id=template_id,
+                start_date=start_date, end_date=end_date,
+                # Without any filter, bound the scan to the recent window
+                days=days if has_filter else (days or 7)
+            )
+            fetch_mode = "bulk"
+            # The API sees everything the webhook did; keep stored events where it returned none
+            events_by_email.update({e: ev for e, ev in api_events.items() if ev})
+            # A complete bulk scan is authoritative; only gaps from a truncated scan need per-email calls
+            fallback_emails = [] if complete else [e for e in api_emails if not api_events[e.lower()]]
+        except BrevoApiError as e:
+            logging.warning(f"⚠️ Bulk events fetch failed ([{e.status_code}] {e.message}), falling back to per-email calls")
+
+    if fallback_emails:
+        fetch_mode = "bulk_with_fallback" if fetch_mode == "bulk" else "per_email"
+        per_email_events: Dict[str, List[Dict[str, Any]]] = {}
+        errors = await fetch_events_per_email(client, fallback_emails, per_email_events)
+        events_by_email.update({e: ev for e, ev in per_email_events.items() if ev})
+        # A failed lookup still reports whatever the webhook stored
+        engagement_results.update({e: err for e, err in errors.items() if not events_by_email.get(e.lower())})
+
+    if stored_emails:
+        fetch_mode = f"event_store+{fetch_mode}" if api_emails else "event_store"
+
+    for email in emails:
+        if email in engagement_results:
+            continue
+        events = events_by_email.get(email.lower())
+        if events:
+            engagement_results[email] = parse_email_events(events)
+        else:
+            engagement_results[email] = {
+                "email": email,
+                "note": "No events found. Email may not have been opened or tracking disabled.",
+                "opened": False,
+                "clicked": False,
+                "delivered": False,
+                "bounced": False
+            }
 
     campaign_summary = calculate_campaign_summary(engagement_results)
 
     return {
         "summary": campaign_summary,
         "engagement": engagement_results,
+        "fetch_mode": fetch_mode,
+        "event_store_hits": len(stored_emails),
         "note": "For real-time tracking, configure Brevo webhooks."
     }
 
 
+def _window_start_ts(start_date: Optional[str], days: Optional[int]) -> Optional[float]:
+    """Lower time bound for event store lookups, matching the API's startDate/days filters."""
+    if start_date:
+        try:
+            return datetime.strptime(start_date, "%Y-%m-%d").timestamp()
+        except ValueError:
+            return None
+    if days:
+        return (datetime.now() - timedelta(days=days)).timestamp()
+    return None
+
+
+async def fetch_events_bulk(
+    client: BrevoApiClient,
+    events_by_email: Dict[str, List[Dict[str, Any]]],
+    tags: Optional[List[str]] = None,
+    message_ids: Optional[List[str]] = None,
+    template_id: Optional[int] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    days: Optional[int] = None
+) -> bool:
+    """
+    Page through /smtp/statistics/events with offset pagination and bucket every
+    event for a tracked email in one pass. Returns False if the page cap was hit
+    (the scan may be incomplete), True otherwise.
+    """
+    base_params: Dict[str, Any] = {"limit": CONFIG["EVENTS_PAGE_SIZE"], "sort": "desc"}
+    if template_id:
+        base_params["templateId"] = template_id
+    if start_date and end_date:
+        base_params["startDate"] = start_date
+        base_params["endDate"] = end_date
+    elif days:
+        base_params["days"] = days
+
+    # Brevo filters on one tag / messageId per request
+    variants: List[Dict[str, Any]] = [{}]
+    if message_ids:
+        variants = [{"messageId": m} for m in message_ids]
+    elif tags:
+        variants = [{"tags": t} for t in tags]
+
+    pages = 0
+    for variant in variants:
+        offset = 0
+        while True:
+            if pages >= CONFIG["EVENTS_MAX_PAGES"]:
+                logging.warning(f"⚠️ Events page cap ({CONFIG['EVENTS_MAX_PAGES']}) reached; scan incomplete")
+                return False
+            params = {**base_params, **variant, "offset": offset}
+            response = await client.request(f"/smtp/statistics/events?{urlencode(params)}", method="GET")
+            pages += 1
+            page = response.get("events", []) if isinstance(response, dict) else []
+
+            for event in page:
+                bucket = events_by_email.get((event.get("email") or "").lower())
+                if bucket is not None:
+                    bucket.append(event)
+
+            if len(page) < base_params["limit"]:
+                break
+            offset += base_params["limit"]
+
+    logging.info(f"📥 Bulk events fetch: {pages} page(s), {sum(1 for v in events_by_email.values() if v)} email(s) with events")
+    return True
+
+
+async def fetch_events_per_email(
+    client: BrevoApiClient,
+    emails: List[str],
+    events_by_email: Dict[str, List[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Per-email fallback, run concurrently under a bounded semaphore. Returns error entries by email."""
+    semaphore = asyncio.Semaphore(CONFIG["EVENTS_FALLBACK_CONCURRENCY"])
+    errors: Dict[str, Any] = {}
+
+    async def fetch_one(email: str):
+        async with semaphore:
+            try:
+                events = await get_email_events(client, email)
+                events_by_email[email.lower()] = events
+            except BrevoApiError as e:
+                errors[email] = {"status": "error", "error": f"[{e.status_code}] {e.message}"}
+            except Exception as e:
+                errors[email] = {"status": "error", "error": str(e)}
+
+    await asyncio.gather(*[fetch_one(email) for email in emails])
+    return errors
+
+
+async def get_email_events(client: BrevoApiClient, email: str) -> List[Dict[str, Any]]:
+    """Raw events for a single email address."""
+    params = {"email": email, "limit": 100, "offset": 0}
+    response = await client.request(f"/smtp/statistics/events?{urlencode(params)}", method="GET")
+    return response.get("events", []) if isinstance(response, dict) else []
+
+
 async def get_statistics_events(
     client: BrevoApiClient,
     email: str
@@ -75,14 +258,7 @@ async def get_statistics_events(
     """
     Fetch email engagement data from Brevo's /smtp/statistics/events endpoint.
     """
-    params = {"email": email, "limit": 100, "offset": 0}
-   
-
-    query_string = urlencode(params)
-    url = f"/smtp/statistics/events?{query_string}"
-
-    response = await client.request(url, method="GET")
-    events = response.get("events", [])
+    events = await get_email_events(client, email)
 
     if not events:
         return None
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 import json
+import hashlib
 import logging
 from sentence_transformers import SentenceTransformer
 import chromadb
@@ -129,6 +130,44 @@ def parse_json_from_text(text):
 # CHROMADB MANAGER CLASS
 # ========================================
 
+def content_hash(text: str) -> str:
+    """Stable hash of an embedded document, used to skip unchanged re-embeddings."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def build_field_document(object_name: str, idx: int, field: Dict[str, Any]):
+    """Return (doc_id, text, metadata) for one schema field."""
+    field_name = field.get('apiname')
+    description = field.get('description', '')
+    datatype = field.get('datatype', '')
+    default_value = field.get('defaultValue', '')
+    label = field.get('FieldLabel', field_name) # Uses enriched label or fallback to name
+    
+    # Extract needvalue / isrequired
+    # Checking various casing possibilities including sloppy whitespace
+    need_value = (field.get('needvalue') or 
+                 field.get('needvalue ') or 
+                 field.get(' needvalue ') or 
+                 field.get('needValue') or 
+                 field.get('NeedValue')) or False
+    # Convert to boolean
+    if isinstance(need_value, str):
+        need_value = need_value.lower() == 'true'
+    
+    combined_text = f"fieldapiname: {field_name}, label: {label}, description: {description}, datatype: {datatype}, needvalue: {need_value}"
+    metadata = {
+        "field_name": field_name,
+        "FieldLabel": label, # Persist FieldLabel
+        "object_name": object_name,
+        "description": description,
+        "datatype": datatype,
+        "defaultValue": default_value,
+        "field_index": idx,
+        "needvalue": bool(need_value),
+        "content_hash": content_hash(combined_text)
+    }
+    return f"field_{object_name}_{idx}_{field_name}", combined_text, metadata
+
 class ChromaDBManager:
     """Centralized ChromaDB management with best practices and error handling"""
 
@@ -311,42 +350,15 @@ class ChromaDBManager:
                             logger.warning(f"Skipping field {idx} in {object_name}: missing apiname")
                             continue
                             
-                        doc_id = f"field_{object_name}_{idx}_{field_name}"
+                        doc_id, combined_text, metadata = build_field_document(object_name, idx, field)
                         if doc_id in existing_ids:
                             continue
-
-                        description = field.get('description', '')
-                        datatype = field.get('datatype', '')
-                        default_value = field.get('defaultValue', '')
-                        label = field.get('FieldLabel', field_name) # Uses enriched label or fallback to name
-                        
-                        # Extract needvalue / isrequired
-                        # Checking various casing possibilities including sloppy whitespace
-                        need_value = (field.get('needvalue') or 
-                                     field.get('needvalue ') or 
-                                     field.get(' needvalue ') or 
-                                     field.get('needValue') or 
-                                     field.get('NeedValue')) or False
-                        # Convert to boolean
-                        if isinstance(need_value, str):
-                            need_value = need_value.lower() == 'true'
-                        
-                        combined_text = f"fieldapiname: {field_name}, label: {label}, description: {description}, datatype: {datatype}, needvalue: {need_value}"
                         
                         embedding = get_model().encode(combined_text).tolist()
 
                         documents_to_add.append(combined_text)
                         embeddings_to_add.append(embedding)
-                        metadatas_to_add.append({
-                            "field_name": field_name,
-                            "FieldLabel": label, # Persist FieldLabel
-                            "object_name": object_name,
-                            "description": description,
-                            "datatype": datatype,
-                            "defaultValue": default_value,
-                            "field_index": idx,
-                            "needvalue": bool(need_value)
-                        })
+                        metadatas_to_add.append(metadata)
                         ids_to_add.append(doc_id)
                         
                     except Exception as e:
@@ -488,6 +500,83 @@ class ChromaDBManager:
             logger.error(f"Error searching fields for {object_name} with query '{query}': {e}")
             return []
 
+    def _sync_collection(self, collection, desired: Dict[str, tuple]) -> Dict[str, int]:
+        """
+        Bring a collection in line with `desired` ({doc_id: (text, metadata)}).
+        Only documents whose content hash changed (or are new) are re-embedded;
+        documents no longer in the schema are deleted.
+        """
+        existing = collection.get(include=["metadatas"]) or {}
+        existing_hashes = {
+            doc_id: (meta or {}).get("content_hash")
+            for doc_id, meta in zip(existing.get("ids", []), existing.get("metadatas", []) or [])
+        }
+
+        changed_ids = [
+            doc_id for doc_id, (text, metadata) in desired.items()
+            if existing_hashes.get(doc_id) != metadata["content_hash"]
+        ]
+        stale_ids = [doc_id for doc_id in existing_hashes if doc_id not in desired]
+
+        batch_size = 100
+        for i in range(0, len(changed_ids), batch_size):
+            batch = changed_ids[i:i + batch_size]
+            texts = [desired[doc_id][0] for doc_id in batch]
+            collection.upsert(
+                documents=texts,
+                embeddings=[e.tolist() for e in get_model().encode(texts)],
+                metadatas=[desired[doc_id][1] for doc_id in batch],
+                ids=batch
+            )
+        if stale_ids:
+            collection.delete(ids=stale_ids)
+
+        return {"embedded": len(changed_ids), "deleted": len(stale_ids), "unchanged": len(desired) - len(changed_ids)}
+
+    def sync_embeddings(self, schema_data) -> Dict[str, Dict[str, int]]:
+        """Incrementally sync object and field embeddings with schema_data using content hashes."""
+        if not schema_data:
+            logger.warning("No schema data provided for embedding sync")
+            return {}
+
+        report = {}
+        desired_objects = {}
+        for idx, item in enumerate(schema_data):
+            object_name = item.get('object')
+            if not object_name:
+                continue
+            metadata = {
+                "object_name": object_name,
+                "field_count": len(item.get('fields', [])),
+                "schema_index": idx,
+                "content_hash": content_hash(object_name)
+            }
+            desired_objects[f"obj_{idx}_{object_name}"] = (object_name, metadata)
+
+        report["objects"] = self._sync_collection(self.get_or_create_objects_collection(), desired_objects)
+
+        for item in schema_data:
+            object_name = item.get('object')
+            if not object_name:
+                continue
+            desired_fields = {}
+            for idx, field in enumerate(item.get('fields', [])):
+                if not field.get('apiname'):
+                    continue
+                doc_id, text, metadata = build_field_document(object_name, idx, field)
+                desired_fields[doc_id] = (text, metadata)
+            try:
+                report[object_name] = self._sync_collection(
+                    self.get_or_create_fields_collection(object_name), desired_fields
+                )
+            except Exception as e:
+                logger.error(f"Error syncing field embeddings for {object_name}: {e}")
+                report[object_name] = {"error": str(e)}
+
+        embedded = sum(r.get("embedded", 0) for r in report.values())
+        logger.info(f"✅ Embedding sync complete: {embedded} document(s) re-embedded")
+        return report
+
     def reset_collections(self):
         """Reset all collections with error handling"""
         try:
@@ -1,6 +1,8 @@
 
-from typing import Optional
+import time
+from typing import Optional, Callable, Any
 from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
 import sys
 from pathlib import Path
 
@@ -9,6 +11,11 @@ parent_dir = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from config import get_salesforce_config
+from mcp_module.Salesforcemcp.client.sf_session import (
+    SalesforceSessionCache,
+    DEFAULT_SESSION_TTL_SECONDS,
+    DEFAULT_REFRESH_MARGIN_SECONDS,
+)
 import sys
 import logging
 logging.basicConfig( 
@@ -41,36 +48,92 @@ class SalesforceClient:
         self.sf: Optional[Salesforce] = None
         self.org_type = org_type
         self.config = get_salesforce_config(org_type)
+        self.expires_at: float = 0.0
+        self.session_ttl = DEFAULT_SESSION_TTL_SECONDS
+        self.refresh_margin = DEFAULT_REFRESH_MARGIN_SECONDS
+        self.session_cache = SalesforceSessionCache(org_type, self.config)
 
-    def connect(self) -> bool:
-        """Create a Salesforce session using credentials for selected org."""
-        # Check if already connected (session valid?) - simple check for existence
-        if self.sf:
+    def _session_is_fresh(self) -> bool:
+        return self.sf is not None and time.time() < self.expires_at - self.refresh_margin
+
+    def _restore_cached_session(self) -> bool:
+        """Reuse a session persisted by this or another process, if still valid."""
+        cached = self.session_cache.load()
+        if not cached or cached["expires_at"] - self.refresh_margin <= time.time():
+            return False
+        self.sf = Salesforce(
+            instance_url=cached["instance_url"],
+            session_id=cached["session_id"]
+        )
+        self.expires_at = cached["expires_at"]
+        logger.info(f"♻️ [{self.org_type}] Reusing cached Salesforce session")
+        return True
+
+    def _login(self) -> bool:
+        username = self.config.get("SALESFORCE_USERNAME")
+        password = self.config.get("SALESFORCE_PASSWORD")
+        security_token = self.config.get("SALESFORCE_SECURITY_TOKEN")
+        domain = self.config.get("SALESFORCE_DOMAIN", "login")
+        if not (username and password and security_token):
+            print(f"[{self.org_type}] Missing Salesforce credentials!")
+            return False
+
+        self.sf = Salesforce(
+            username=username,
+            password=password,
+            security_token=security_token,
+            domain=domain
+        )
+        issued_at = time.time()
+        self.expires_at = issued_at + self.session_ttl
+        self.session_cache.save(
+            session_id=self.sf.session_id,
+            instance_url=f"https://{self.sf.sf_instance}",
+            issued_at=issued_at,
+            expires_at=self.expires_at
+        )
+        logger.info(f"🔑 [{self.org_type}] Salesforce login successful")
+        return True
+
+    def connect(self, force_refresh: bool = False) -> bool:
+        """
+        Ensure a usable Salesforce session for the selected org.
+
+        Cheap to call before every operation: reuses the in-memory session while
+        it is fresh, then the shared on-disk cache, and only falls back to a full
+        login when the session is missing or about to expire.
+        """
+        if not force_refresh and self._session_is_fresh():
             return True
 
         try:
-            username = self.config.get("SALESFORCE_USERNAME")
-            password = self.config.get("SALESFORCE_PASSWORD")
-            security_token = self.config.get("SALESFORCE_SECURITY_TOKEN")
-            domain = self.config.get("SALESFORCE_DOMAIN", "login")
-            if not (username and password and security_token):
-                print(f"[{self.org_type}] Missing Salesforce credentials!")
-                return False
-
-            self.sf = Salesforce(
-                username=username,
-                password=password,
-                security_token=security_token,
-                domain=domain
-            )
-            return True
+            if force_refresh:
+                self.session_cache.clear()
+            elif self._restore_cached_session():
+                return True
+            return self._login()
 
         except Exception as e:
             logger.exception(f"❌ [{self.org_type}] Salesforce authentication failed: {e}")
             return False
+
+    def run(self, operation: Callable[[Salesforce], Any]) -> Any:
+        """
+        Run `operation(sf)` and retry once with a fresh login if the session
+        was revoked or expired server-side (HTTP 401).
+        """
+        if not self.connect():
+            raise ConnectionError(f"[{self.org_type}] Salesforce connection not established")
+        try:
+            return operation(self.sf)
+        except SalesforceExpiredSession:
+            logger.warning(f"🔄 [{self.org_type}] Salesforce session expired, re-authenticating")
+            if not self.connect(force_refresh=True):
+                raise
+            return operation(self.sf)
+
 if __name__ == "__main__":
     sf_client = SalesforceClient("agent")
     sf_client.connect()
         
  
-
@@ -0,0 +1,156 @@
+"""
+Field metadata / picklist cache shared by the Salesforce MCP server and the
+LangGraph workflows.
+
+Entries are keyed by (object, field) and hold the field type and its picklist
+values. The cache lives in memory and is mirrored to a small JSON file, so a
+freshly spawned MCP subprocess and the agent process see the same entries
+without another describe/Tooling round trip.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = int(os.getenv("SF_METADATA_CACHE_TTL_SECONDS", "3600"))
+
+
+def _default_cache_path() -> Path:
+    override = os.getenv("SF_METADATA_CACHE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "sf_field_metadata.json"
+
+
+class FieldMetadataCache:
+    """(object, field) -> {type, picklist_values, fetched_at} with TTL and file mirror."""
+
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.path = Path(path) if path else _default_cache_path()
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._loaded_mtime: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(object_name: str, field_name: str) -> str:
+        return f"{object_name}.{field_name}".lower()
+
+    # ---------- persistence ----------
+
+    def _reload_if_changed(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._loaded_mtime:
+            return
+        try:
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            self._loaded_mtime = mtime
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable field metadata cache: {e}")
+
+    def _persist(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, prefix=".sf_field_metadata_")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f)
+            os.replace(tmp_path, self.path)
+            self._loaded_mtime = self.path.stat().st_mtime
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist field metadata cache: {e}")
+
+    # ---------- read ----------
+
+    def get(self, object_name: str, field_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._reload_if_changed()
+            entry = self._entries.get(self._key(object_name, field_name))
+        if not entry or time.time() - entry.get("fetched_at", 0) > self.ttl_seconds:
+            return None
+        return entry
+
+    def has_picklist_value(self, object_name: str, field_name: str, value: str) -> Optional[bool]:
+        """
+        Cheap, network-free check.
+
+        Returns True/False when the field is cached, or None when unknown
+        (cache miss or expired) and the caller has to ask Salesforce.
+        """
+        entry = self.get(object_name, field_name)
+        if entry is None:
+            return None
+        return value in entry.get("picklist_values", [])
+
+    # ---------- write ----------
+
+    def put(self, object_name: str, field_name: str, field_type: Optional[str], picklist_values: List[str]) -> None:
+        with self._lock:
+            self._reload_if_changed()
+            self._entries[self._key(object_name, field_name)] = {
+                "object": object_name,
+                "field": field_name,
+                "type": field_type,
+                "picklist_values": list(picklist_values),
+                "fetched_at": time.time(),
+            }
+            self._persist()
+
+    def put_from_describe(self, object_name: str, describe_result: Dict[str, Any]) -> int:
+        """Cache every picklist field from an sObject describe() result."""
+        now = time.time()
+        count = 0
+        with self._lock:
+            self._reload_if_changed()
+            for field in describe_result.get("fields", []):
+                field_type = field.get("type")
+                if field_type not in ("picklist", "multipicklist"):
+                    continue
+                self._entries[self._key(object_name, field["name"])] = {
+                    "object": object_name,
+                    "field": field["name"],
+                    "type": field_type,
+                    "picklist_values": [p.get("value") for p in field.get("picklistValues", []) if p.get("active", True)],
+                    "fetched_at": now,
+                }
+                count += 1
+            self._persist()
+        return count
+
+    def put_from_tooling(self, object_name: str, field_name: str, metadata: Dict[str, Any]) -> None:
+        """Cache a field from Tooling API CustomField.Metadata."""
+        value_set = metadata.get("valueSet") or {}
+        definition = value_set.get("valueSetDefinition") or {}
+        values = [
+            v.get("valueName") or v.get("fullName")
+            for v in (definition.get("value") or [])
+            if isinstance(v, dict)
+        ]
+        self.put(object_name, field_name, metadata.get("type"), [v for v in values if v])
+
+    def invalidate(self, object_name: str, field_name: Optional[str] = None) -> None:
+        """Drop one field, or every cached field of an object when field_name is None."""
+        with self._lock:
+            self._reload_if_changed()
+            if field_name:
+                removed = self._entries.pop(self._key(object_name, field_name), None) is not None
+            else:
+                prefix = f"{object_name.lower()}."
+                stale = [k for k in self._entries if k.startswith(prefix)]
+                for k in stale:
+                    del self._entries[k]
+                removed = bool(stale)
+            if removed:
+                self._persist()
+
+
+# Process-wide instance
+field_metadata_cache = FieldMetadataCache()
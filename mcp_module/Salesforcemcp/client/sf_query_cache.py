@@ -0,0 +1,218 @@
+"""
+Read-through cache for run_dynamic_soql results.
+
+MCP servers are spawned per call, so the cache is a small SQLite file shared
+by every Salesforce MCP process. Entries are keyed on the normalized query
+text, expire after a short TTL, and are dropped by object name whenever the
+write tools touch that object. Objects reached through relationship fields
+(e.g. Contact.Email in a CampaignMember query) are indexed too; relationship
+names are mapped to objects by convention (Foo__r -> Foo__c, Owner -> User),
+which misses polymorphic lookups like Who/What, so such queries get the
+shorter SOQL_CACHE_RELATIONSHIP_TTL_SECONDS. Hit/miss counters are kept in
+memory and flushed to the stats table every STATS_FLUSH_SECONDS and at exit;
+each flush logs the cumulative hit rate.
+"""
+import atexit
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = int(os.getenv("SOQL_CACHE_TTL_SECONDS", "120"))
+RELATIONSHIP_TTL_SECONDS = int(os.getenv("SOQL_CACHE_RELATIONSHIP_TTL_SECONDS", "30"))
+STATS_FLUSH_SECONDS = 30
+SOQL_CACHE_ENABLED = os.getenv("SOQL_CACHE_ENABLED", "true").lower() == "true"
+
+_FROM_RE = re.compile(r"\bFROM\s+([A-Za-z_][A-Za-z0-9_]*)", re.IGNORECASE)
+_PATH_RE = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)+")
+_LITERAL_RE = re.compile(r"'(?:[^'\\]|\\.)*'")
+# Standard relationship names whose target object has a different name
+_RELATIONSHIP_OBJECTS = {"owner": "user", "createdby": "user", "lastmodifiedby": "user", "parent": None}
+
+
+def _default_cache_path() -> Path:
+    override = os.getenv("SOQL_CACHE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "soql_cache.sqlite3"
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace and drop a trailing semicolon; literals are left untouched."""
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+
+def objects_in_query(query: str) -> List[str]:
+    """All object names after FROM (outer query and subqueries), lower-cased."""
+    return sorted({name.lower() for name in _FROM_RE.findall(query)})
+
+
+def related_objects_in_query(query: str) -> List[str]:
+    """
+    Objects reached through relationship paths (Contact.Email, Foo__r.Bar__c,
+    Contact.Account.Name), lower-cased. String literals are ignored.
+    """
+    related = set()
+    for path in _PATH_RE.findall(_LITERAL_RE.sub("''", query)):
+        for name in path.split(".")[:-1]:
+            name = name.lower()
+            if name.endswith("__r"):
+                related.add(name[:-3] + "__c")
+            elif name in _RELATIONSHIP_OBJECTS:
+                if _RELATIONSHIP_OBJECTS[name]:
+                    related.add(_RELATIONSHIP_OBJECTS[name])
+            else:
+                related.add(name)
+    return sorted(related)
+
+
+class SoqlQueryCache:
+    def __init__(self, path: Optional[Path] = None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.path = Path(path) if path else _default_cache_path()
+        self.ttl_seconds = ttl_seconds
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending_stats = {"hits": 0, "misses": 0}
+        self._last_flush = time.time()
+        atexit.register(self.flush_stats)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS soql_cache ("
+                " query_key TEXT PRIMARY KEY,"
+                " query TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS soql_cache_objects ("
+                " object_name TEXT NOT NULL,"
+                " query_key TEXT NOT NULL,"
+                " PRIMARY KEY (object_name, query_key))"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS soql_cache_stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+    def flush_stats(self) -> None:
+        """Add the in-memory hit/miss counters to the stats table."""
+        pending = [(name, value) for name, value in self._pending_stats.items() if value]
+        self._last_flush = time.time()
+        if not pending:
+            return
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO soql_cache_stats (name, value) VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    pending
+                )
+            self._pending_stats = {"hits": 0, "misses": 0}
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SOQL cache stats flush failed: {e}")
+            return
+        stats = self.stats()
+        logger.info(
+            f"📊 SOQL cache hit rate {stats['hit_rate']:.0%} "
+            f"({stats['hits']} hits / {stats['lookups']} lookups)"
+        )
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        try:
+            row = self._connection().execute(
+                "SELECT payload, expires_at FROM soql_cache WHERE query_key = ?",
+                (self._key(query),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SOQL cache read failed: {e}")
+            return None
+
+        hit = row is not None and row[1] > time.time()
+        self._pending_stats["hits" if hit else "misses"] += 1
+        logger.info(f"{'🎯 SOQL cache HIT' if hit else '🔍 SOQL cache MISS'}")
+        if time.time() - self._last_flush >= STATS_FLUSH_SECONDS:
+            self.flush_stats()
+        return json.loads(row[0]) if hit else None
+
+    def put(self, query: str, result: Dict[str, Any]) -> None:
+        key = self._key(query)
+        related = related_objects_in_query(query)
+        ttl = min(self.ttl_seconds, RELATIONSHIP_TTL_SECONDS) if related else self.ttl_seconds
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO soql_cache (query_key, query, payload, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, normalize_query(query), json.dumps(result, default=str), time.time() + ttl)
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO soql_cache_objects (object_name, query_key) VALUES (?, ?)",
+                    [(obj, key) for obj in set(objects_in_query(query)) | set(related)]
+                )
+                # Opportunistic cleanup keeps the file small
+                conn.execute("DELETE FROM soql_cache WHERE expires_at <= ?", (time.time(),))
+                conn.execute("DELETE FROM soql_cache_objects WHERE query_key NOT IN (SELECT query_key FROM soql_cache)")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SOQL cache write failed: {e}")
+
+    def invalidate_object(self, object_name: str) -> int:
+        """Drop every cached query that reads from object_name, directly or through a relationship."""
+        try:
+            conn = self._connection()
+            with conn:
+                keys = [r[0] for r in conn.execute(
+                    "SELECT query_key FROM soql_cache_objects WHERE object_name = ?",
+                    (object_name.lower(),)
+                )]
+                conn.executemany("DELETE FROM soql_cache WHERE query_key = ?", [(k,) for k in keys])
+                conn.executemany("DELETE FROM soql_cache_objects WHERE query_key = ?", [(k,) for k in keys])
+            if keys:
+                logger.info(f"🧹 SOQL cache: invalidated {len(keys)} query(ies) on {object_name}")
+            return len(keys)
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SOQL cache invalidation failed: {e}")
+            return 0
+
+    def invalidate_all(self) -> None:
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM soql_cache")
+                conn.execute("DELETE FROM soql_cache_objects")
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ SOQL cache clear failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            counters = dict(self._connection().execute("SELECT name, value FROM soql_cache_stats").fetchall())
+        except sqlite3.Error:
+            counters = {}
+        hits = counters.get("hits", 0) + self._pending_stats["hits"]
+        misses = counters.get("misses", 0) + self._pending_stats["misses"]
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "lookups": lookups,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+        }
+
+
+# Process-wide instance
+soql_cache = SoqlQueryCache()
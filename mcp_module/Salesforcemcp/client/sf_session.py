@@ -0,0 +1,119 @@
+"""
+Encrypted on-disk cache for Salesforce sessions.
+
+Every MCP server runs as its own subprocess, so an in-memory session dies with
+the process. This cache persists the access token and instance URL per org so
+a new subprocess can reuse a still-valid session instead of doing a full SOAP
+username/password login. Entries are encrypted with a key derived from the org
+credentials and written atomically so concurrent processes never read a
+half-written file.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # cryptography ships with simple_salesforce (pyjwt[crypto])
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+# Salesforce does not return the session timeout on login, so use the org's
+# configured timeout (default 2 hours) and refresh a few minutes before it.
+DEFAULT_SESSION_TTL_SECONDS = int(os.getenv("SALESFORCE_SESSION_TTL_SECONDS", "7200"))
+DEFAULT_REFRESH_MARGIN_SECONDS = int(os.getenv("SALESFORCE_SESSION_REFRESH_MARGIN_SECONDS", "300"))
+
+
+def _default_cache_dir() -> Path:
+    override = os.getenv("SF_SESSION_CACHE_DIR")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "sf_sessions"
+
+
+class SalesforceSessionCache:
+    """Stores one encrypted session entry per (org_type, username)."""
+
+    def __init__(self, org_type: str, config: Dict[str, Any], cache_dir: Optional[Path] = None):
+        self.org_type = org_type
+        self.username = config.get("SALESFORCE_USERNAME", "")
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self._fernet = self._build_fernet(config)
+
+        user_hash = hashlib.sha256(self.username.encode("utf-8")).hexdigest()[:16]
+        self.path = self.cache_dir / f"{org_type}_{user_hash}.session"
+
+    @staticmethod
+    def _build_fernet(config: Dict[str, Any]):
+        if Fernet is None:
+            logger.warning("⚠️ cryptography not installed - Salesforce session cache disabled")
+            return None
+        secret = "|".join([
+            config.get("SALESFORCE_USERNAME", ""),
+            config.get("SALESFORCE_PASSWORD", ""),
+            config.get("SALESFORCE_SECURITY_TOKEN", ""),
+        ])
+        key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
+        return Fernet(key)
+
+    @property
+    def enabled(self) -> bool:
+        return self._fernet is not None and bool(self.username)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return the cached session if present, decryptable and not expired."""
+        if not self.enabled or not self.path.exists():
+            return None
+        try:
+            payload = json.loads(self._fernet.decrypt(self.path.read_bytes()))
+        except (InvalidToken, ValueError, OSError) as e:
+            logger.warning(f"⚠️ [{self.org_type}] Ignoring unreadable session cache: {e}")
+            return None
+
+        if payload.get("expires_at", 0) <= time.time():
+            return None
+        if not payload.get("session_id") or not payload.get("instance_url"):
+            return None
+        return payload
+
+    def save(self, session_id: str, instance_url: str, issued_at: float, expires_at: float) -> None:
+        """Atomically write the session so other processes can pick it up."""
+        if not self.enabled:
+            return
+        payload = {
+            "session_id": session_id,
+            "instance_url": instance_url,
+            "issued_at": issued_at,
+            "expires_at": expires_at,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            token = self._fernet.encrypt(json.dumps(payload).encode("utf-8"))
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".sf_session_")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(token)
+                os.chmod(tmp_path, 0o600)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning(f"⚠️ [{self.org_type}] Could not persist session cache: {e}")
+
+    def clear(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ [{self.org_type}] Could not clear session cache: {e}")
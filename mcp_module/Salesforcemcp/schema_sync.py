@@ -0,0 +1,209 @@
+"""
+Live org-describe sync for schema_metadata.json and the ChromaDB schema index.
+
+Pulls describeGlobal plus a concurrent describe() per configured object, merges
+the result with the hand-written descriptions in schema_metadata.json (those
+always win), writes the enriched file atomically and then re-embeds only the
+documents whose content hash changed.
+
+Run once:            python -m mcp_module.Salesforcemcp.schema_sync
+Run in background:   start_schema_sync_scheduler() from the FastAPI startup hook
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+from mcp_module.Salesforcemcp.client.sf_client import SalesforceClient
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SCHEMA_PATH = os.path.join(ROOT_DIR, "schema_metadata.json")
+
+SCHEMA_SYNC_ORG_TYPE = os.getenv("SCHEMA_SYNC_ORG_TYPE", "marketing")
+SCHEMA_SYNC_MAX_WORKERS = int(os.getenv("SCHEMA_SYNC_MAX_WORKERS", "5"))
+# Comma-separated extra objects to sync on top of the ones already in schema_metadata.json
+SCHEMA_SYNC_EXTRA_OBJECTS = [o.strip() for o in os.getenv("SCHEMA_SYNC_OBJECTS", "").split(",") if o.strip()]
+# Standard fields are curated by hand; only pull new custom fields unless asked otherwise
+SCHEMA_SYNC_INCLUDE_STANDARD = os.getenv("SCHEMA_SYNC_INCLUDE_STANDARD", "false").lower() == "true"
+
+
+def load_schema(path: str = SCHEMA_PATH) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_schema_atomically(schema: List[Dict[str, Any]], path: str = SCHEMA_PATH) -> None:
+    """Write to a temp file in the same directory, then os.replace() over the target."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".schema_metadata_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(schema, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _format_datatype(field: Dict[str, Any]) -> str:
+    """Render a describe() field type in the same style as the hand-written schema."""
+    field_type = field.get("type", "")
+    if field_type == "reference":
+        return f"Lookup ({', '.join(field.get('referenceTo') or [])})"
+    if field_type in ("string", "textarea") and field.get("length"):
+        label = "Text" if field_type == "string" else "Text Area"
+        return f"{label}({field['length']})"
+    if field_type == "multipicklist":
+        return "Picklist (Multi-Select)"
+    return field_type.capitalize()
+
+
+def _field_from_describe(field: Dict[str, Any]) -> Dict[str, Any]:
+    label = field.get("label") or re.sub(r"__c$", "", field.get("name", ""))
+    required = not field.get("nillable", True) and field.get("createable", False) and not field.get("defaultedOnCreate", False)
+    return {
+        "apiname": field["name"],
+        "description": field.get("inlineHelpText") or label,
+        "datatype": _format_datatype(field),
+        "FieldLabel": label,
+        "needvalue": bool(required),
+    }
+
+
+def merge_schema(
+    hand_written: List[Dict[str, Any]],
+    describes: Dict[str, Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Merge describe() results into the hand-written schema.
+
+    Existing objects and fields keep their order and hand-written text, so their
+    embedding ids and content hashes stay stable; new fields are appended.
+    """
+    merged = [dict(item, fields=[dict(f) for f in item.get("fields", [])]) for item in hand_written]
+    by_object = {item["object"]: item for item in merged if item.get("object")}
+
+    for object_name, describe in describes.items():
+        item = by_object.get(object_name)
+        if item is None:
+            item = {"object": object_name, "description": describe.get("label", object_name), "fields": []}
+            merged.append(item)
+            by_object[object_name] = item
+
+        known = {f.get("apiname") for f in item["fields"]}
+        org_fields = {f["name"] for f in describe.get("fields", [])}
+
+        for field in describe.get("fields", []):
+            if field["name"] in known:
+                continue
+            if not field.get("custom") and not SCHEMA_SYNC_INCLUDE_STANDARD:
+                continue
+            item["fields"].append(_field_from_describe(field))
+
+        missing = sorted(f for f in known if f and f not in org_fields)
+        if missing:
+            logger.warning(f"⚠️ [{object_name}] Hand-written fields not found in org: {missing}")
+
+    return merged
+
+
+def _describe_objects(object_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """describeGlobal once, then describe each configured object concurrently."""
+    client = SalesforceClient(SCHEMA_SYNC_ORG_TYPE)
+    if not client.connect():
+        raise ConnectionError(f"[{SCHEMA_SYNC_ORG_TYPE}] Salesforce connection failed for schema sync")
+
+    global_describe = client.run(lambda sf: sf.describe())
+    available = {s["name"] for s in global_describe.get("sobjects", [])}
+    targets = [o for o in object_names if o in available]
+    skipped = sorted(set(object_names) - available)
+    if skipped:
+        logger.warning(f"⚠️ Objects not in describeGlobal, skipping: {skipped}")
+
+    def describe_one(object_name: str):
+        try:
+            return object_name, client.run(lambda sf: getattr(sf, object_name).describe())
+        except Exception as e:
+            logger.error(f"❌ describe() failed for {object_name}: {e}")
+            return object_name, None
+
+    with ThreadPoolExecutor(max_workers=max(1, SCHEMA_SYNC_MAX_WORKERS)) as pool:
+        results = dict(pool.map(describe_one, targets))
+
+    return {name: result for name, result in results.items() if result}
+
+
+def sync_schema(reembed: bool = True) -> Dict[str, Any]:
+    """
+    Run one describe -> merge -> atomic write -> incremental re-embed pass.
+    Blocking; call via asyncio.to_thread from async code.
+    """
+    hand_written = load_schema()
+    object_names = list(dict.fromkeys(
+        [item["object"] for item in hand_written if item.get("object")] + SCHEMA_SYNC_EXTRA_OBJECTS
+    ))
+
+    logger.info(f"🔄 Schema sync: describing {len(object_names)} object(s)")
+    describes = _describe_objects(object_names)
+    merged = merge_schema(hand_written, describes)
+
+    changed = merged != hand_written
+    if changed:
+        write_schema_atomically(merged)
+        logger.info(f"💾 schema_metadata.json updated ({len(merged)} objects)")
+    else:
+        logger.info("✅ schema_metadata.json already up to date")
+
+    report: Dict[str, Any] = {"objects_described": len(describes), "schema_changed": changed}
+    if reembed:
+        # Imported lazily: loads ChromaDB and the embedding model
+        from mcp_module.Salesforcemcp.chromadbutils import chroma_manager, enrich_schema_with_labels
+        report["embeddings"] = chroma_manager.sync_embeddings(enrich_schema_with_labels(merged))
+    return report
+
+
+_sync_task: Optional[asyncio.Task] = None
+
+
+async def _schema_sync_loop(interval_seconds: int) -> None:
+    while True:
+        try:
+            report = await asyncio.to_thread(sync_schema)
+            logger.info(f"✅ Background schema sync finished: {report.get('objects_described')} object(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Background schema sync failed: {e}")
+        # Jitter so several workers do not hit describe at the same moment
+        await asyncio.sleep(interval_seconds + random.uniform(0, interval_seconds * 0.1))
+
+
+def start_schema_sync_scheduler(interval_seconds: Optional[int] = None) -> Optional[asyncio.Task]:
+    """
+    Schedule the sync on the running event loop. The blocking work runs in a
+    worker thread, so request handling is never blocked. Disabled when the
+    interval is 0 (default: SCHEMA_SYNC_INTERVAL_SECONDS env, unset = off).
+    """
+    global _sync_task
+    if interval_seconds is None:
+        interval_seconds = int(os.getenv("SCHEMA_SYNC_INTERVAL_SECONDS", "0"))
+    if interval_seconds <= 0:
+        return None
+    if _sync_task and not _sync_task.done():
+        return _sync_task
+    _sync_task = asyncio.create_task(_schema_sync_loop(interval_seconds))
+    logger.info(f"⏰ Schema sync scheduled every {interval_seconds}s")
+    return _sync_task
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(sync_schema(), indent=2))
@@ -4,19 +4,23 @@ from Error.sf_error import SalesforceApiError
 from tools import (
     run_dynamic_soql,
     delete_salesforce_record,
+    delete_salesforce_records,
     generate_all_toolinput,
     propose_action,
     upsert_salesforce_records,
-    tooling_execute
+    tooling_execute,
+    check_picklist_value
 )
 # Initialize MCP
 mcp = FastMCP("salesforce-mcp")
 mcp.tool()(run_dynamic_soql)
 mcp.tool()(delete_salesforce_record)
+mcp.tool()(delete_salesforce_records)
 mcp.tool()(generate_all_toolinput)
 mcp.tool()(propose_action)
 mcp.tool()(upsert_salesforce_records)
 mcp.tool()(tooling_execute)
+mcp.tool()(check_picklist_value)
 
 def main():
     mcp.run(transport="stdio")
@@ -1,15 +1,19 @@
 from .run_dynamic_soql import run_dynamic_soql
 from .delete_salesforce_record import delete_salesforce_record
+from .delete_salesforce_records import delete_salesforce_records
 from .generate_all_toolinput import generate_all_toolinput
 from .propose_action import propose_action
 from .upsert_salesforce_records import upsert_salesforce_records
 from .tooling_execute import tooling_execute
+from .check_picklist_value import check_picklist_value
  
 __all__ = [
     'run_dynamic_soql',
     'delete_salesforce_record',
+    'delete_salesforce_records',
     'generate_all_toolinput',
     'propose_action',
     'upsert_salesforce_records',
-    'tooling_execute'
+    'tooling_execute',
+    'check_picklist_value'
 ]
\ No newline at end of file
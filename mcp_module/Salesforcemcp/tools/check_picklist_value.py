@@ -0,0 +1,56 @@
+from client.sf_client import SalesforceClient
+from mcp_module.Salesforcemcp.client.sf_metadata_cache import field_metadata_cache
+import logging
+
+# Lazy initialization
+_sf_client = None
+
+def get_client():
+    global _sf_client
+    if not _sf_client:
+        _sf_client = SalesforceClient("marketing")
+    # Cheap when the session is fresh; refreshes it shortly before expiry
+    _sf_client.connect()
+    return _sf_client
+
+
+def check_picklist_value(object_name: str, field_name: str, value: str) -> dict:
+    """
+    Check whether a picklist field already contains a value.
+
+    Answers from the field metadata cache when possible; on a miss it runs a
+    single describe() for the object and caches all of its picklist fields.
+    Returns a dict with 'exists', 'field_type' and 'source' ("cache" or "describe").
+    """
+    if not object_name or not field_name:
+        return {"error": "object_name and field_name are required"}
+
+    cached = field_metadata_cache.has_picklist_value(object_name, field_name, value)
+    if cached is not None:
+        entry = field_metadata_cache.get(object_name, field_name) or {}
+        return {"exists": cached, "field_type": entry.get("type"), "source": "cache"}
+
+    client = get_client()
+    if client.sf is None:
+        return {"error": "Salesforce connection not established"}
+
+    try:
+        describe_result = client.run(lambda sf: getattr(sf, object_name).describe())
+    except Exception as e:
+        logging.error(f"Describe failed for {object_name}: {e}")
+        return {"error": f"Failed to describe {object_name}: {str(e)}"}
+
+    cached_fields = field_metadata_cache.put_from_describe(object_name, describe_result)
+    logging.info(f"📦 Cached {cached_fields} picklist field(s) for {object_name}")
+
+    entry = field_metadata_cache.get(object_name, field_name)
+    if entry is None:
+        field = next(
+            (f for f in describe_result.get("fields", []) if f.get("name", "").lower() == field_name.lower()),
+            None
+        )
+        if field is None:
+            return {"error": f"Field not found: {object_name}.{field_name}"}
+        return {"exists": False, "field_type": field.get("type"), "source": "describe"}
+
+    return {"exists": value in entry["picklist_values"], "field_type": entry.get("type"), "source": "describe"}
@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 from Error.sf_error import SalesforceApiError
 from client.sf_client import SalesforceClient
+from mcp_module.Salesforcemcp.client.sf_query_cache import soql_cache
 import logging
 
 
@@ -11,7 +12,8 @@ def get_client():
     global _sf_client
     if not _sf_client:
         _sf_client = SalesforceClient("marketing")
-        _sf_client.connect()
+    # Cheap when the session is fresh; refreshes it shortly before expiry
+    _sf_client.connect()
     return _sf_client
 def delete_salesforce_record(object_name: str, record_id: str) -> dict:
     """Deletes a Salesforce record for the specified object using its record ID."""
@@ -32,7 +34,8 @@ def delete_salesforce_record(object_name: str, record_id: str) -> dict:
             return {"error": "Invalid Salesforce record ID format"}
         
         # Delete the record
-        sf.__getattr__(object_name).delete(record_id)
+        client.run(lambda sf: sf.__getattr__(object_name).delete(record_id))
+        soql_cache.invalidate_object(object_name)
         return {"success": True}
         
     except AttributeError as e:
@@ -0,0 +1,129 @@
+from typing import List, Dict, Any
+from client.sf_client import SalesforceClient
+from mcp_module.Salesforcemcp.client.sf_query_cache import soql_cache
+import asyncio
+import logging
+import json
+import os
+
+# sObject Collections accepts at most 200 ids per request
+COLLECTIONS_CHUNK_SIZE = 200
+MAX_CONCURRENT_CHUNKS = int(os.getenv("SF_DELETE_MAX_CONCURRENCY", "4"))
+
+# Lazy initialization
+_sf_client = None
+
+def get_client():
+    global _sf_client
+    if not _sf_client:
+        _sf_client = SalesforceClient("marketing")
+    # Cheap when the session is fresh; refreshes it shortly before expiry
+    _sf_client.connect()
+    return _sf_client
+
+
+def _delete_chunk(client: SalesforceClient, ids: List[str], all_or_none: bool) -> List[Dict[str, Any]]:
+    """DELETE /composite/sobjects?ids=... for one chunk of up to 200 ids."""
+    return client.run(lambda sf: sf.restful(
+        "composite/sobjects",
+        method="DELETE",
+        params={"ids": ",".join(ids), "allOrNone": str(all_or_none).lower()}
+    ))
+
+
+async def delete_salesforce_records(record_ids: List[str], all_or_none: bool = False) -> str:
+    """
+    Delete multiple Salesforce records in bulk using the sObject Collections API.
+
+    Prefer this over delete_salesforce_record whenever more than one record has to be
+    deleted. IDs are sent in chunks of 200 (the Collections limit) with a few chunks
+    in flight at a time, so N deletions cost roughly N/200 requests.
+
+    Args:
+        record_ids: List of 15/18-character Salesforce record IDs (any object types)
+        all_or_none: If True, a failure in a chunk rolls back that whole chunk
+
+    Returns:
+        JSON string with:
+        - success: True when every record was deleted
+        - total_records / successful / failed counts
+        - results: per-record {record_id, success}
+        - errors: per-record failures, or None
+    """
+    if not record_ids or not isinstance(record_ids, list):
+        return json.dumps({
+            "success": False,
+            "error": "record_ids must be a non-empty list"
+        }, indent=2)
+
+    client = get_client()
+    if not client.sf:
+        return json.dumps({
+            "success": False,
+            "error": "Salesforce connection not established"
+        }, indent=2)
+
+    results = []
+    errors = []
+
+    # Validate and de-duplicate while keeping the caller's order
+    valid_ids = []
+    seen = set()
+    for idx, record_id in enumerate(record_ids):
+        record_id = str(record_id or "").strip()
+        if len(record_id) not in (15, 18):
+            errors.append({"index": idx, "record_id": record_id, "error": "Invalid Salesforce record ID format"})
+            continue
+        if record_id in seen:
+            continue
+        seen.add(record_id)
+        valid_ids.append(record_id)
+
+    chunks = [valid_ids[i:i + COLLECTIONS_CHUNK_SIZE] for i in range(0, len(valid_ids), COLLECTIONS_CHUNK_SIZE)]
+    semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENT_CHUNKS))
+
+    logging.info(f"🗑️ [delete_salesforce_records] Deleting {len(valid_ids)} records in {len(chunks)} chunk(s)")
+
+    async def process_chunk(chunk_idx: int, chunk: List[str]):
+        async with semaphore:
+            try:
+                response = await asyncio.to_thread(_delete_chunk, client, chunk, all_or_none)
+                return chunk_idx, chunk, response, None
+            except Exception as e:
+                logging.exception(f"Collections delete failed for chunk {chunk_idx}")
+                return chunk_idx, chunk, None, str(e)
+
+    chunk_outcomes = await asyncio.gather(*[process_chunk(i, c) for i, c in enumerate(chunks)])
+
+    for chunk_idx, chunk, response, chunk_error in sorted(chunk_outcomes, key=lambda o: o[0]):
+        if chunk_error:
+            for record_id in chunk:
+                errors.append({"record_id": record_id, "error": chunk_error})
+            continue
+
+        for record_id, item in zip(chunk, response or []):
+            if item.get("success"):
+                results.append({"record_id": item.get("id") or record_id, "success": True})
+            else:
+                messages = "; ".join(err.get("message", "") for err in item.get("errors", []))
+                errors.append({"record_id": record_id, "error": messages or "Unknown error"})
+
+    successful_count = len(results)
+    failed_count = len(errors)
+
+    # IDs may span several objects, so drop every cached read
+    if successful_count:
+        soql_cache.invalidate_all()
+
+    if failed_count:
+        logging.error(f"❌ [delete_salesforce_records] {failed_count} record(s) failed to delete")
+
+    return json.dumps({
+        "success": failed_count == 0,
+        "total_records": len(record_ids),
+        "successful": successful_count,
+        "failed": failed_count,
+        "chunks": len(chunks),
+        "results": results,
+        "errors": errors if errors else None
+    }, indent=2)
@@ -1208,16 +1208,12 @@ logging.basicConfig(
 # Global instances
 sf_client = SalesforceClient("agent")
 openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-_sf_connected = False
 chroma_manager = None
 _executor = None
 
 def ensure_sf_connected():
-    """Ensure Salesforce is connected"""
-    global _sf_connected
-    if not _sf_connected:
-        _sf_connected = sf_client.connect()
-    return _sf_connected
+    """Ensure Salesforce is connected (refreshes the session before it expires)"""
+    return sf_client.connect()
 
 
 def get_executor():
@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 from Error.sf_error import SalesforceApiError
 from client.sf_client import SalesforceClient
+from mcp_module.Salesforcemcp.client.sf_query_cache import soql_cache, SOQL_CACHE_ENABLED
 import logging
 
 # Lazy initialization
@@ -10,13 +11,15 @@ def get_client():
     global _sf_client
     if not _sf_client:
         _sf_client = SalesforceClient("marketing")
-        _sf_client.connect()
+    # Cheap when the session is fresh; refreshes it shortly before expiry
+    _sf_client.connect()
     return _sf_client
 
-def run_dynamic_soql(query: str) -> dict:
+def run_dynamic_soql(query: str, use_cache: bool = True) -> dict:
     """
     Use this tool when you need to fetch Salesforce data . Returns a dict with 'records' (list of results) and
     'total' (number of records), or an error description if the query fails.
+    Results are cached briefly; set use_cache=False to force a fresh read.
     """
     # Validate query
     if not query or not isinstance(query, str):
@@ -29,18 +32,27 @@ def run_dynamic_soql(query: str) -> dict:
     if "..." in query:
         return {"error": "Refused to execute query with truncated values ('...'). Please provide the full ID."}
 
+    # Serve repeated reads from the short-lived cache
+    if use_cache and SOQL_CACHE_ENABLED:
+        cached = soql_cache.get(query)
+        if cached is not None:
+            return cached
+
     # Check Salesforce connection
     client = get_client()
     if client.sf is None:
         return {"error": "Salesforce connection not established"}
 
     try:
-        result = client.sf.query_all(query)
+        result = client.run(lambda sf: sf.query_all(query))
 
-        return {
+        response = {
             "records": result.get("records", []),
             "total": result.get("totalSize", 0)
         }
+        if SOQL_CACHE_ENABLED:
+            soql_cache.put(query, response)
+        return response
 
     except SalesforceApiError as e:
         logging.exception("SOQL execution failed")
@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional
 
 from Error.sf_error import SalesforceApiError
 from client.sf_client import SalesforceClient
+from mcp_module.Salesforcemcp.client.sf_metadata_cache import field_metadata_cache
 
 _sf_client = None
 
@@ -26,7 +27,8 @@ def get_client() -> SalesforceClient:
     global _sf_client
     if not _sf_client:
         _sf_client = SalesforceClient("marketing")
-        _sf_client.connect()
+    # Cheap when the session is fresh; refreshes it shortly before expiry
+    _sf_client.connect()
     return _sf_client
 
 def tooling_execute(action: str, method: str = "GET", data: Optional[Dict[str, Any]] = None):
@@ -38,10 +40,17 @@ def tooling_execute(action: str, method: str = "GET", data: Optional[Dict[str, A
         raise ValueError("Salesforce connection not established.")
 
     try:
-        results = sf_client.sf.toolingexecute(action, method=method, data=data)
+        results = sf_client.run(lambda sf: sf.toolingexecute(action, method=method, data=data))
     except SalesforceApiError as e:
         logging.exception("Tooling execute failed")
         return {"status": "error", "error": str(e)}
 
+    # Field metadata changed - drop the cached picklist values for it
+    if method.upper() == "PATCH" and action.startswith("sobjects/CustomField/") and isinstance(data, dict):
+        full_name = data.get("FullName") or ""
+        if "." in full_name:
+            object_name, field_name = full_name.split(".", 1)
+            field_metadata_cache.invalidate(object_name, field_name)
+
     # ✅ Return dict directly (less noisy, easier to parse)
     return {"result": results}
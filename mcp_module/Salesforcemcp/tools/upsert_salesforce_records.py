@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 from Error.sf_error import SalesforceApiError
 from client.sf_client import SalesforceClient
+from mcp_module.Salesforcemcp.client.sf_query_cache import soql_cache
 import logging
 import json
 
@@ -11,7 +12,8 @@ def get_client():
     global _sf_client
     if not _sf_client:
         _sf_client = SalesforceClient("marketing")
-        _sf_client.connect()
+    # Cheap when the session is fresh; refreshes it shortly before expiry
+    _sf_client.connect()
     return _sf_client
 
 async def upsert_salesforce_records(
@@ -79,8 +81,6 @@ async def upsert_salesforce_records(
         logging.info(f"🔍 [upsert_salesforce_records] First record: {json.dumps(records[0], indent=2)}")
     
     try:
-        sobject_api = getattr(sf, object_name)
-        
         for idx, record in enumerate(records):
             try:
                 # Extract record_id and fields from the record
@@ -98,7 +98,7 @@ async def upsert_salesforce_records(
                 
                 # -------- UPDATE --------
                 if record_id and str(record_id).strip() != "":
-                    sobject_api.update(record_id, fields)
+                    client.run(lambda sf: getattr(sf, object_name).update(record_id, fields))
                     results.append({
                         "index": idx,
                         "success": True,
@@ -109,7 +109,7 @@ async def upsert_salesforce_records(
                 
                 # -------- CREATE --------
                 else:
-                    create_result = sobject_api.create(fields)
+                    create_result = client.run(lambda sf: getattr(sf, object_name).create(fields))
                     new_id = create_result.get("id")
                     results.append({
                         "index": idx,
@@ -128,6 +128,10 @@ async def upsert_salesforce_records(
                 })
                 failed_count += 1
         
+        # Cached reads of this object are stale now
+        if successful_count:
+            soql_cache.invalidate_object(object_name)
+        
         result_json = {
             "success": failed_count == 0,
             "total_records": len(records),
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class AdaptiveTokenBucket:
+    """
+    Async token bucket whose refill rate adapts to server throttling.
+
+    Each 429 halves the rate (down to `min_rate`) and pauses all callers for the
+    Retry-After period; every success nudges the rate back up towards
+    `max_rate` (AIMD), so sustained throughput settles just under the limit.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        recovery_step: float = 0.1,
+    ):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.min_rate = min_rate
+        self.max_rate = float(max_rate if max_rate is not None else rate)
+        self.recovery_step = recovery_step
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available (and any 429 pause has elapsed)."""
+        while True:
+            async with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    wait = (tokens - self._tokens) / self.rate
+            await asyncio.sleep(wait)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        """Record a 429: back off multiplicatively and pause for Retry-After seconds."""
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+        pause = retry_after if retry_after and retry_after > 0 else 1.0 / self.rate
+        self._paused_until = max(self._paused_until, time.monotonic() + pause)
+
+    def on_success(self) -> None:
+        """Additive recovery towards the configured ceiling."""
+        self.rate = min(self.max_rate, self.rate + self.recovery_step)
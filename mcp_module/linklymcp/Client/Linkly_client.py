@@ -11,7 +11,7 @@ from Error.linkly_error import LinklyApiError
 class LinklyApiClient:
     """Handles all HTTP communication with the Linkly API."""
 
-    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, workspace_id: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None, workspace_id: Optional[str] = None, shared: bool = False):
         self.api_key = api_key or CONFIG["LINKLY_API_KEY"]
         self.base_url = base_url or CONFIG["LINKLY_BASE_URL"]
         self.workspace_id = workspace_id or CONFIG["LINKLY_WORKSPACE"]
@@ -20,8 +20,19 @@ class LinklyApiClient:
         if not self.api_key:
             raise ValueError("LINKLY_API_KEY is required. Please set it in .env file.")
 
-        # Use a single session for performance with follow_redirects
-        self._client = httpx.AsyncClient(timeout=self.timeout, follow_redirects=True)
+        # The process-wide client is only closed by close_shared_client()
+        self.shared = shared
+
+        # Use a single session for performance with follow_redirects (pooled via get_shared_client)
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=CONFIG["MAX_CONNECTIONS"],
+                max_keepalive_connections=CONFIG["MAX_KEEPALIVE_CONNECTIONS"],
+                keepalive_expiry=CONFIG["KEEPALIVE_EXPIRY"],
+            ),
+        )
 
     async def request(self, endpoint: str, method: str = "GET", data: Optional[dict] = None) -> Any:
         """Send an async request to the Linkly API."""
@@ -52,6 +63,8 @@ class LinklyApiClient:
 
             return {}
 
+        except LinklyApiError:
+            raise
         except httpx.ReadTimeout:
             raise LinklyApiError(408, "Request timeout")
         except httpx.ConnectError as e:
@@ -78,12 +91,37 @@ class LinklyApiClient:
         elif status == 404:
             raise LinklyApiError(404, "Resource not found", error_obj)
         elif status == 429:
-            raise LinklyApiError(429, "Rate limit exceeded - Too many requests", error_obj)
+            retry_after = None
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+            except ValueError:
+                pass
+            raise LinklyApiError(429, "Rate limit exceeded - Too many requests", error_obj, retry_after=retry_after)
         elif status >= 500:
             raise LinklyApiError(500, "Linkly server error", error_obj)
         else:
             raise LinklyApiError(status, message, error_obj)
 
     async def close(self):
-        """Gracefully close the HTTP client."""
-        await self._client.aclose()
\ No newline at end of file
+        """Gracefully close the HTTP client (no-op for the shared client)."""
+        if self.shared:
+            return
+        await self._client.aclose()
+
+
+_shared_client: Optional[LinklyApiClient] = None
+
+
+def get_shared_client() -> LinklyApiClient:
+    """Process-wide client so every link creation reuses pooled connections."""
+    global _shared_client
+    if _shared_client is None or _shared_client._client.is_closed:
+        _shared_client = LinklyApiClient(shared=True)
+    return _shared_client
+
+
+async def close_shared_client() -> None:
+    global _shared_client
+    if _shared_client is not None:
+        client, _shared_client = _shared_client, None
+        await client._client.aclose()
\ No newline at end of file
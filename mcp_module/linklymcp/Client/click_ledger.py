@@ -0,0 +1,124 @@
+"""
+Per-campaign click ledger for incremental click tracking.
+
+Every click ingested for a cursor key (normally the campaign id) is recorded
+once, keyed by its click id (or a hash of link/timestamp/visitor when the API
+gives none). The cursor is the newest click timestamp seen, so the next run
+only asks Linkly for clicks since then; running per-link totals are computed
+from the ledger, so overlapping windows never double count.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+
+def _default_ledger_path() -> Path:
+    override = os.getenv("LINKLY_LINK_STORE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "linkly_links.sqlite3"
+
+
+def click_timestamp(click: Dict[str, Any]) -> Optional[float]:
+    value = click.get("timestamp") or click.get("created_at") or click.get("clickedAt")
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _visitor(click: Dict[str, Any]) -> Optional[str]:
+    return click.get("ip") or click.get("ipAddress") or click.get("visitor_id")
+
+
+def _click_key(link_id: str, click: Dict[str, Any]) -> str:
+    if click.get("id") is not None:
+        return f"id:{click['id']}"
+    raw = f"{link_id}|{click.get('timestamp') or click.get('created_at') or click.get('clickedAt')}|{_visitor(click)}"
+    return "h:" + hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ClickLedger:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else _default_ledger_path()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS click_ledger (
+                    cursor_key TEXT NOT NULL,
+                    click_key TEXT NOT NULL,
+                    link_id TEXT NOT NULL,
+                    visitor TEXT,
+                    ts REAL,
+                    PRIMARY KEY (cursor_key, click_key)
+                );
+                CREATE INDEX IF NOT EXISTS idx_click_ledger_link ON click_ledger (cursor_key, link_id);
+                CREATE TABLE IF NOT EXISTS click_cursors (
+                    cursor_key TEXT PRIMARY KEY,
+                    last_ts REAL,
+                    updated_at REAL NOT NULL
+                );
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    def cursor(self, cursor_key: str) -> Optional[float]:
+        """Timestamp of the newest click ingested for this key, or None on first run."""
+        row = self._connection().execute(
+            "SELECT last_ts FROM click_cursors WHERE cursor_key = ?", (cursor_key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, cursor_key: str, clicks_by_link: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Record clicks; returns only the ones not seen before, per link."""
+        conn = self._connection()
+        new_by_link: Dict[str, List[Dict[str, Any]]] = {}
+        newest = self.cursor(cursor_key)
+        with conn:
+            for link_id, clicks in clicks_by_link.items():
+                for click in clicks:
+                    ts = click_timestamp(click)
+                    cur = conn.execute(
+                        "INSERT OR IGNORE INTO click_ledger (cursor_key, click_key, link_id, visitor, ts) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (cursor_key, _click_key(link_id, click), str(link_id), _visitor(click), ts)
+                    )
+                    if cur.rowcount:
+                        new_by_link.setdefault(link_id, []).append(click)
+                        if ts is not None and (newest is None or ts > newest):
+                            newest = ts
+            conn.execute(
+                "INSERT OR REPLACE INTO click_cursors (cursor_key, last_ts, updated_at) VALUES (?, ?, ?)",
+                (cursor_key, newest, time.time())
+            )
+        return new_by_link
+
+    def totals(self, cursor_key: str, link_ids: List[str], unique_only: bool) -> Dict[str, int]:
+        """Running click totals per link for this key (distinct visitors when unique_only)."""
+        count = "COUNT(DISTINCT COALESCE(visitor, click_key))" if unique_only else "COUNT(*)"
+        rows: List[Tuple[str, int]] = self._connection().execute(
+            f"SELECT link_id, {count} FROM click_ledger WHERE cursor_key = ? GROUP BY link_id",
+            (cursor_key,)
+        ).fetchall()
+        found = dict(rows)
+        return {str(l): found.get(str(l), 0) for l in link_ids}
+
+
+click_ledger = ClickLedger()
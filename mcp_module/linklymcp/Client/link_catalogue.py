@@ -0,0 +1,217 @@
+"""
+Local catalogue of workspace links, indexed by campaign.
+
+The workspace link list is synced page by page into SQLite and every link is
+indexed by the `campaign` query parameter parsed from its destination URL, so
+campaign -> link_ids lookups are an index read instead of a substring scan
+over every link. Refreshes are incremental: pages are read newest-first and
+paging stops once links older than the last sync watermark are reached. A
+full resync (which also drops links deleted outside this MCP) runs when the
+last one is older than CATALOGUE_FULL_SYNC_SECONDS.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterable
+from urllib.parse import urlencode, urlparse, parse_qs
+
+from config import CONFIG
+
+CAMPAIGN_PARAMS = ("campaign", "campaign_id", "campaignId")
+# Re-read links created shortly before the watermark to cover clock skew / late writes
+WATERMARK_OVERLAP_SECONDS = 300
+
+
+def _default_catalogue_path() -> Path:
+    override = os.getenv("LINKLY_LINK_STORE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "linkly_links.sqlite3"
+
+
+def campaign_of(link: Dict[str, Any]) -> Optional[str]:
+    """The campaign query parameter of a link's destination, if any."""
+    for field in ("destination", "url", "formatted_url"):
+        value = link.get(field)
+        if not value:
+            continue
+        query = parse_qs(urlparse(value).query)
+        for name in CAMPAIGN_PARAMS:
+            if query.get(name):
+                return query[name][0]
+    return None
+
+
+def _created_ts(link: Dict[str, Any]) -> Optional[float]:
+    value = link.get("created_at") or link.get("createdAt") or link.get("inserted_at")
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def extract_links(response: Any) -> List[Dict[str, Any]]:
+    """Handle the different list shapes the links endpoint returns."""
+    if isinstance(response, list):
+        return response
+    if isinstance(response, dict):
+        return response.get("links") or response.get("data") or response.get("results") or []
+    return []
+
+
+class LinkCatalogue:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else _default_catalogue_path()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS link_catalogue (
+                    link_id INTEGER PRIMARY KEY,
+                    campaign_id TEXT,
+                    destination TEXT,
+                    short_url TEXT,
+                    created_ts REAL,
+                    synced_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_link_catalogue_campaign ON link_catalogue (campaign_id);
+                CREATE TABLE IF NOT EXISTS link_catalogue_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                """
+            )
+            self._local.conn = conn
+        return conn
+
+    # ---------- meta ----------
+
+    def _meta(self, key: str) -> Optional[float]:
+        row = self._connection().execute("SELECT value FROM link_catalogue_meta WHERE key = ?", (key,)).fetchone()
+        return float(row[0]) if row else None
+
+    def _set_meta(self, key: str, value: float) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO link_catalogue_meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    # ---------- writes ----------
+
+    def add_links(self, links: Iterable[Dict[str, Any]], synced_at: Optional[float] = None) -> int:
+        now = synced_at or time.time()
+        rows = []
+        for link in links:
+            link_id = link.get("id") or link.get("link_id")
+            if link_id is None:
+                continue
+            rows.append((
+                int(link_id),
+                campaign_of(link),
+                link.get("destination") or link.get("url"),
+                link.get("full_url") or link.get("short_url"),
+                _created_ts(link) or now,
+                now,
+            ))
+        if rows:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO link_catalogue "
+                    "(link_id, campaign_id, destination, short_url, created_ts, synced_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        return len(rows)
+
+    def remove_links(self, link_ids: List[Any]) -> None:
+        if not link_ids:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany("DELETE FROM link_catalogue WHERE link_id = ?", [(int(i),) for i in link_ids])
+
+    # ---------- sync ----------
+
+    async def refresh(self, client, full: bool = False) -> Dict[str, Any]:
+        """Page through the workspace links newest-first and upsert them."""
+        last_full = self._meta("last_full_sync") or 0
+        if time.time() - last_full > CONFIG["CATALOGUE_FULL_SYNC_SECONDS"]:
+            full = True
+        watermark = None if full else self._meta("watermark")
+
+        started = time.time()
+        page_size = CONFIG["CATALOGUE_PAGE_SIZE"]
+        newest = watermark or 0
+        pages = upserted = 0
+        complete = False
+        previous_first = None
+        for page in range(1, CONFIG["CATALOGUE_MAX_PAGES"] + 1):
+            params = {"page": page, "page_size": page_size, "sort_by": "created_at", "sort_dir": "desc"}
+            response = await client.request(
+                f"/api/v1/workspace/{client.workspace_id}/links?{urlencode(params)}", method="GET"
+            )
+            links = extract_links(response)
+            first = (links[0].get("id") or links[0].get("link_id")) if links else None
+            if first is not None and first == previous_first:
+                # Endpoint ignored the page parameter and returned the same list again
+                complete = True
+                break
+            previous_first = first
+            pages += 1
+            upserted += self.add_links(links, synced_at=started)
+            created = [t for t in (_created_ts(l) for l in links) if t is not None]
+            if created:
+                newest = max(newest, max(created))
+
+            if len(links) < page_size:
+                complete = True
+                break
+            if watermark and created and min(created) < watermark - WATERMARK_OVERLAP_SECONDS:
+                complete = True
+                break
+        else:
+            logging.warning(f"⚠️ Link catalogue page cap ({CONFIG['CATALOGUE_MAX_PAGES']}) reached")
+
+        if full and complete:
+            # Anything not seen in a complete full pass no longer exists in the workspace
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM link_catalogue WHERE synced_at < ?", (started,))
+            self._set_meta("last_full_sync", started)
+        if newest:
+            self._set_meta("watermark", newest)
+        self._set_meta("last_refresh", started)
+
+        logging.info(f"📚 Link catalogue {'full' if full else 'incremental'} sync: {pages} page(s), {upserted} link(s)")
+        return {"mode": "full" if full else "incremental", "pages": pages, "links": upserted, "complete": complete}
+
+    # ---------- reads ----------
+
+    async def links_for_campaign(self, client, campaign_id: str, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Links for a campaign from the index, refreshing first if the catalogue is stale."""
+        max_age = CONFIG["CATALOGUE_REFRESH_SECONDS"] if max_age is None else max_age
+        last_refresh = self._meta("last_refresh") or 0
+        if time.time() - last_refresh > max_age:
+            await self.refresh(client)
+
+        rows = self._connection().execute(
+            "SELECT link_id, short_url, destination FROM link_catalogue WHERE campaign_id = ? ORDER BY link_id",
+            (str(campaign_id),)
+        ).fetchall()
+        return [{"link_id": r[0], "short_url": r[1], "destination": r[2]} for r in rows]
+
+
+link_catalogue = LinkCatalogue()
@@ -0,0 +1,112 @@
+"""
+Persistent mapping of (campaign, contact, destination URL) -> (link_id, short_url).
+
+generate_uniqueurl checks it before calling Linkly and records every link it
+creates, so retried or re-sent campaigns reuse existing short links instead of
+creating duplicates in the workspace. delete_links forgets the links it
+removes. SQLite keeps it shared across the short-lived MCP server processes.
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+
+# (campaign_id, contact_email, destination_url)
+LinkKey = Tuple[str, str, str]
+
+
+def _default_store_path() -> Path:
+    override = os.getenv("LINKLY_LINK_STORE_PATH")
+    if override:
+        return Path(override)
+    return Path.home() / ".cache" / "rebuildma" / "linkly_links.sqlite3"
+
+
+class LinkStore:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else _default_store_path()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS short_links (
+                    campaign_id TEXT NOT NULL,
+                    contact_email TEXT NOT NULL,
+                    destination_url TEXT NOT NULL,
+                    link_id TEXT NOT NULL,
+                    short_url TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (campaign_id, contact_email, destination_url)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_short_links_link_id ON short_links (link_id)")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _normalize(key: LinkKey) -> LinkKey:
+        campaign_id, email, url = key
+        return (str(campaign_id), (email or "").strip().lower(), url)
+
+    def get_many(self, keys: Iterable[LinkKey]) -> Dict[LinkKey, Dict[str, Any]]:
+        """Known links for the given keys (returned under the keys as passed); unknown keys are absent."""
+        originals = {self._normalize(k): k for k in keys}
+        keys = list(originals)
+        if not keys:
+            return {}
+        conn = self._connection()
+        found: Dict[LinkKey, Dict[str, Any]] = {}
+        # One campaign per call in practice; filter the rest in Python
+        for campaign_id in {k[0] for k in keys}:
+            rows = conn.execute(
+                "SELECT contact_email, destination_url, link_id, short_url FROM short_links WHERE campaign_id = ?",
+                (campaign_id,)
+            ).fetchall()
+            for email, url, link_id, short_url in rows:
+                # Linkly ids are integers; keep the type callers got from the API
+                found[(campaign_id, email, url)] = {
+                    "link_id": int(link_id) if link_id.isdigit() else link_id,
+                    "short_url": short_url
+                }
+        return {originals[k]: found[k] for k in keys if k in found}
+
+    def put_many(self, entries: Iterable[Tuple[LinkKey, str, Optional[str]]]) -> None:
+        """entries: (key, link_id, short_url)"""
+        now = time.time()
+        rows = [
+            (*self._normalize(key), str(link_id), short_url, now)
+            for key, link_id, short_url in entries if link_id is not None
+        ]
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO short_links "
+                "(campaign_id, contact_email, destination_url, link_id, short_url, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def forget_links(self, link_ids: List[Any]) -> int:
+        if not link_ids:
+            return 0
+        conn = self._connection()
+        ids = [str(i) for i in link_ids]
+        with conn:
+            cur = conn.execute(
+                f"DELETE FROM short_links WHERE link_id IN ({','.join('?' * len(ids))})", ids
+            )
+        return cur.rowcount
+
+
+link_store = LinkStore()
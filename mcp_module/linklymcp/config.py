@@ -26,7 +26,29 @@ linkly_secrets = read_secret("linkly")
  
 
 CONFIG = {
-     
+    # Shared HTTP client (Client/Linkly_client.get_shared_client)
+    "MAX_CONNECTIONS": 20,
+    "MAX_KEEPALIVE_CONNECTIONS": 10,
+    "KEEPALIVE_EXPIRY": 30,
+
+    # Link creation: bulk endpoint (if the workspace plan exposes one) or pipelined single creates
+    "BULK_CREATE_ENDPOINT": linkly_secrets.get("LINKLY_BULK_ENDPOINT", ""),
+    "BULK_CREATE_SIZE": 100,
+    "CREATE_CONCURRENCY": 10,
+    "CREATE_RATE_PER_SECOND": 10,
+    "CREATE_MAX_RETRIES": 3,
+
+    # Local link catalogue (Client/link_catalogue.py)
+    "CATALOGUE_PAGE_SIZE": 100,
+    "CATALOGUE_MAX_PAGES": 500,
+    "CATALOGUE_REFRESH_SECONDS": 60,
+    "CATALOGUE_FULL_SYNC_SECONDS": 86400,
+
+    # track_link_clicks: one paged workspace click export, split locally by link
+    "CLICKS_EXPORT_ENDPOINT": linkly_secrets.get("LINKLY_CLICKS_EXPORT_ENDPOINT", "/api/v1/workspace/{workspace_id}/clicks/export"),
+    "CLICKS_PAGE_SIZE": 1000,
+    "CLICKS_MAX_PAGES": 200,
+    "CLICKS_FALLBACK_CONCURRENCY": 10,
 
     # Pull from Vault instead of .env
     "LINKLY_BASE_URL": linkly_secrets.get("LINKLY_BASE_URL", ""),
@@ -1,8 +1,21 @@
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from mcp.server.fastmcp import FastMCP
+from Client.Linkly_client import get_shared_client, close_shared_client
 from tools import create_short_link,generate_uniqueurl,track_link_clicks,delete_links
 
-mcp = FastMCP("linkly-mcp")
+
+@asynccontextmanager
+async def linkly_lifespan(server: FastMCP):
+    """Open the shared Linkly HTTP client with the server and close it on shutdown."""
+    get_shared_client()
+    try:
+        yield {}
+    finally:
+        await close_shared_client()
+
+
+mcp = FastMCP("linkly-mcp", lifespan=linkly_lifespan)
 
  
 
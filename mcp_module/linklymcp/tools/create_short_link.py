@@ -1,7 +1,28 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from urllib.parse import urlencode, urlparse, parse_qs, urlunparse
-from Client.Linkly_client import LinklyApiClient
+import asyncio
+import logging
+from Client.Linkly_client import LinklyApiClient, get_shared_client
 from Error.linkly_error import LinklyApiError
+from config import CONFIG
+# Shared with the Brevo server; config has put the project root on sys.path
+from mcp_module.common.rate_limiter import AdaptiveTokenBucket
+
+# Set once the bulk endpoint has been rejected so later calls skip straight to single creates
+_bulk_unsupported = False
+
+# Shared by every link creation in this server process so 429 backoff is global
+_create_bucket: Optional[AdaptiveTokenBucket] = None
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+def _get_create_bucket() -> AdaptiveTokenBucket:
+    global _create_bucket
+    if _create_bucket is None:
+        _create_bucket = AdaptiveTokenBucket(rate=CONFIG["CREATE_RATE_PER_SECOND"])
+    return _create_bucket
+
 
 async def create_short_link(
     url: str
@@ -13,23 +34,122 @@ async def create_short_link(
     (e.g., for email campaigns or personalized outreach). Returns full link
     details or an error message.
     """
-    client = LinklyApiClient()
-    
+    client = get_shared_client()
+
     try:
-       
+
         payload = {
             "workspace_id": client.workspace_id,
             "url": url
         }
         # Linkly API endpoint: POST /api/v1/link
         result = await client.request("/api/v1/link", method="POST", data=payload)
-        
+
         return result
-        
+
     except LinklyApiError as e:
         return {
             "error": f"[{e.status_code}] {e.message}",
             "details": e.details
         }
-    finally:
-        await client.close()
+
+
+async def _create_bulk(client: LinklyApiClient, urls: List[str]) -> Optional[List[Dict[str, Any]]]:
+    """
+    One request for many destinations. Returns results in input order, or None
+    when bulk creation is not available (not configured, rejected, or a reply
+    that cannot be mapped back one-to-one).
+    """
+    global _bulk_unsupported
+    endpoint = CONFIG["BULK_CREATE_ENDPOINT"]
+    if not endpoint or _bulk_unsupported:
+        return None
+
+    payload = {
+        "workspace_id": client.workspace_id,
+        "links": [{"url": url} for url in urls]
+    }
+    try:
+        response = await client.request(endpoint.format(workspace_id=client.workspace_id), method="POST", data=payload)
+    except LinklyApiError as e:
+        if e.status_code in (400, 404, 405):
+            _bulk_unsupported = True
+            logging.warning(f"⚠️ Linkly bulk create rejected ([{e.status_code}]), using single creates")
+        return None
+
+    links = response.get("links") if isinstance(response, dict) else response
+    if not isinstance(links, list) or len(links) != len(urls):
+        logging.warning("⚠️ Linkly bulk create reply did not match the request, using single creates")
+        return None
+    return links
+
+
+async def create_short_links(
+    urls: List[str],
+    on_progress: Optional[ProgressCallback] = None
+) -> List[Dict[str, Any]]:
+    """
+    Create one short link per entry in urls (duplicates included), in order.
+
+    Uses the bulk endpoint when configured, in chunks of BULK_CREATE_SIZE.
+    Everything else goes through a work queue drained by CREATE_CONCURRENCY
+    workers that share one adaptive token bucket: a 429 slows all workers and
+    the throttled item is re-queued. Failed entries carry an "error" key.
+    on_progress(done, total) is awaited as links complete.
+    """
+    client = get_shared_client()
+    total = len(urls)
+    results: List[Optional[Dict[str, Any]]] = [None] * total
+    done = 0
+
+    async def report(count: int):
+        nonlocal done
+        done += count
+        if on_progress:
+            await on_progress(done, total)
+
+    size = CONFIG["BULK_CREATE_SIZE"]
+    for start in range(0, total, size):
+        chunk = await _create_bulk(client, urls[start:start + size])
+        if chunk is None:
+            break
+        results[start:start + len(chunk)] = chunk
+        await report(len(chunk))
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, result in enumerate(results):
+        if result is None:
+            queue.put_nowait((index, 0))
+    if queue.empty():
+        return results
+
+    bucket = _get_create_bucket()
+    max_retries = CONFIG["CREATE_MAX_RETRIES"]
+
+    async def worker():
+        while True:
+            try:
+                index, attempt = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await bucket.acquire()
+            try:
+                results[index] = await client.request(
+                    "/api/v1/link", method="POST",
+                    data={"workspace_id": client.workspace_id, "url": urls[index]}
+                )
+                bucket.on_success()
+            except LinklyApiError as e:
+                if e.status_code == 429 and attempt < max_retries:
+                    bucket.on_throttled(e.retry_after)
+                    queue.put_nowait((index, attempt + 1))
+                    continue
+                results[index] = {"error": f"[{e.status_code}] {e.message}", "details": e.details}
+            except Exception as e:
+                results[index] = {"error": str(e)}
+            await report(1)
+
+    workers = min(CONFIG["CREATE_CONCURRENCY"], queue.qsize())
+    await asyncio.gather(*[worker() for _ in range(workers)])
+    logging.info(f"🔗 Created {total} link(s); create rate settled at {bucket.rate:.1f}/s")
+    return results
@@ -1,6 +1,8 @@
 from typing import List, Optional
-from Client.Linkly_client import LinklyApiClient
+from Client.Linkly_client import get_shared_client
 from Error.linkly_error import LinklyApiError
+from Client.link_store import link_store
+from Client.link_catalogue import link_catalogue
 
 
 async def delete_links(
@@ -17,7 +19,7 @@ async def delete_links(
     Returns:
         dict with deletion results or error
     """
-    client = LinklyApiClient()
+    client = get_shared_client()
     
     try:
         # Safety check
@@ -32,36 +34,10 @@ async def delete_links(
             # If campaign_id provided, show what would be deleted
             if campaign_id:
                 try:
-                    links_endpoint = f"/api/v1/workspace/{client.workspace_id}/links"
-                    links_response = await client.request(links_endpoint, method="GET")
-                    
-                    links_data = []
-                    if isinstance(links_response, list):
-                        links_data = links_response
-                    elif isinstance(links_response, dict):
-                        links_data = (
-                            links_response.get("links") or 
-                            links_response.get("data") or 
-                            links_response.get("results") or 
-                            []
-                        )
-                    
-                    matching_links = []
-                    for link in links_data:
-                        all_urls = f"{link.get('destination', '')} {link.get('formatted_url', '')} {link.get('url', '')}"
-                        patterns = [
-                            f"campaign={campaign_id}",
-                            f"campaign_id={campaign_id}",
-                            f"campaignId={campaign_id}",
-                            campaign_id
-                        ]
-                        
-                        if any(pattern in all_urls for pattern in patterns):
-                            matching_links.append({
-                                "link_id": link.get("id"),
-                                "short_url": link.get("full_url", ""),
-                                "destination": link.get("destination", "")[:100]
-                            })
+                    matching_links = [
+                        {**l, "destination": (l.get("destination") or "")[:100]}
+                        for l in await link_catalogue.links_for_campaign(client, campaign_id)
+                    ]
                     
                     preview_info["preview"] = {
                         "campaign_id": campaign_id,
@@ -113,56 +89,13 @@ async def delete_links(
         # Step 1: Get link IDs if campaign_id provided
         if campaign_id and not link_ids:
             try:
-                links_endpoint = f"/api/v1/workspace/{client.workspace_id}/links"
-                debug_info["steps"].append(f"Fetching links from: {links_endpoint}")
-                
-                links_response = await client.request(links_endpoint, method="GET")
-                
-                link_ids = []
-                links_data = []
-                
-                # Handle different response formats
-                if isinstance(links_response, list):
-                    links_data = links_response
-                elif isinstance(links_response, dict):
-                    links_data = (
-                        links_response.get("links") or 
-                        links_response.get("data") or 
-                        links_response.get("results") or 
-                        []
-                    )
-                
-                debug_info["steps"].append(f"Total links retrieved: {len(links_data)}")
-                
-                # Find links matching the campaign
-                for link in links_data:
-                    link_destination = link.get("destination", "")
-                    link_formatted = link.get("formatted_url", "")
-                    link_url = link.get("url", "")
-                    link_id = link.get("id") or link.get("link_id")
-                    link_short_url = link.get("full_url") or link.get("short_url", "")
-                    
-                    # Combine all possible URL fields
-                    all_urls = f"{link_destination} {link_formatted} {link_url}"
-                    
-                    # Check multiple patterns for campaign matching
-                    patterns = [
-                        f"campaign={campaign_id}",
-                        f"campaign_id={campaign_id}",
-                        f"campaignId={campaign_id}",
-                        campaign_id
-                    ]
-                    
-                    if any(pattern in all_urls for pattern in patterns):
-                        if link_id:
-                            link_ids.append(int(link_id))
-                            debug_info["links_found"].append({
-                                "link_id": link_id,
-                                "short_url": link_short_url,
-                                "destination": link_destination[:100]
-                            })
-                
-                debug_info["total_links_checked"] = len(links_data)
+                # Campaign -> links from the local catalogue index (incrementally synced)
+                catalogue_links = await link_catalogue.links_for_campaign(client, campaign_id)
+                link_ids = [int(l["link_id"]) for l in catalogue_links]
+                debug_info["links_found"] = [
+                    {**l, "destination": (l.get("destination") or "")[:100]} for l in catalogue_links
+                ]
+                debug_info["steps"].append(f"Link catalogue returned {len(link_ids)} link(s) for campaign")
                 debug_info["matching_links_found"] = len(link_ids)
                 
                 if not link_ids:
@@ -170,7 +103,6 @@ async def delete_links(
                         "status": "no_links_found",
                         "message": f"No links found for campaign '{campaign_id}'",
                         "campaign_id": campaign_id,
-                        "total_links_checked": len(links_data),
                         "debug_info": debug_info if debug else None,
                         "suggestion": "Check if campaign_id matches exactly. Enable debug=True to see all links."
                     }
@@ -314,6 +246,14 @@ async def delete_links(
                     if debug:
                         debug_info["steps"].append(f"✗ Failed to delete link {link_id}: {error_msg}")
         
+        # Deleted links must not be handed out again by generate_uniqueurl
+        try:
+            deleted_ids = [r["link_id"] for r in deletion_results["successful"]]
+            link_store.forget_links(deleted_ids)
+            link_catalogue.remove_links(deleted_ids)
+        except Exception as e:
+            debug_info["steps"].append(f"Link store/catalogue cleanup failed: {e}")
+
         # Step 4: Build summary response
         total_deleted = len(deletion_results["successful"])
         total_failed = len(deletion_results["failed"])
@@ -358,5 +298,3 @@ async def delete_links(
             "message": str(e),
             "traceback": traceback.format_exc() if debug else None
         }
-    finally:
-        await client.close()
\ No newline at end of file
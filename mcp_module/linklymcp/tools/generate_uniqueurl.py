@@ -1,6 +1,10 @@
 from .utilis import extract_urls_from_template, format_url_with_tracking
-from .create_short_link import create_short_link
+from .create_short_link import create_short_links
+from Client.link_store import link_store
+from Client.link_catalogue import link_catalogue
+from mcp.server.fastmcp import Context
 import asyncio
+import logging
 
 async def generate_uniqueurl(
     campaign_id: str,
@@ -9,17 +13,30 @@ async def generate_uniqueurl(
     template_content: str | None = None,
     urls: list[str] | None = None,
     batch_size: int = 50,
-    delay_between_batches: float = 0.5
+    delay_between_batches: float = 0.5,
+    reuse_existing: bool = True,
+    ctx: Context | None = None
 ) -> dict:
     """
     Generate unique, trackable Linkly URLs for all contacts in a campaign.
 
     Use this tool when you need one short link per contact for personalized
     engagement tracking. Supports multiple base URLs and batch processing.
+
+    All contact x URL pairs go into one work queue (bulk endpoint when
+    available) drained by a fixed pool of workers under a shared adaptive rate
+    limit, so total time follows the Linkly rate limit rather than the number
+    of contacts. Progress is reported through the MCP context (and logged) as
+    links complete, and each result is mapped back to its contact in URL order.
+    batch_size and delay_between_batches are accepted for compatibility; pacing
+    is now done by the rate limiter.
+
+    Links already created for the same (campaign, contact, destination) are
+    reused from the local link store instead of creating duplicates; pass
+    reuse_existing=False to force new links.
     """
-    print(f"DEBUG: generate_uniqueurl called with {len(contacts)} contacts")
+    logging.info(f"🔗 generate_uniqueurl called with {len(contacts)} contacts")
 
-    
     if not contacts or not campaign_id:
         return {
             "status": "error",
@@ -42,43 +59,10 @@ async def generate_uniqueurl(
 
     results = []
     total_links_created = 0
-    
-    # Helper function to create a single short link with error handling
-    async def create_link_for_contact(contact_email: str, contact_name: str, url: str, url_index: int = 0):
-        formatted_url = format_url_with_tracking(url, campaign_id, contact_email)
-        
-        try:
-            result = await create_short_link(formatted_url)
-            
-            if "error" in result:
-                return {
-                    "url_index": url_index,
-                    "original_url": url,
-                    "formatted_url": formatted_url,
-                    "short_url": None,
-                    "status": "error",
-                    "error": result["error"],
-                }
-            else:
-                return {
-                    "url_index": url_index,
-                    "original_url": url,
-                    "formatted_url": formatted_url,
-                    "short_url": result.get("full_url"),
-                    "link_id": result.get("id"),
-                    "status": "success",
-                }
-        except Exception as e:
-            return {
-                "url_index": url_index,
-                "original_url": url,
-                "formatted_url": formatted_url,
-                "short_url": None,
-                "status": "error",
-                "error": str(e),
-            }
-    
-    # Process each contact
+
+    # Resolve each contact's URL list up front, then create every link in one pass
+    contact_entries = []  # (result dict, urls) in contact order
+    pairs = []            # (contact result, url index, original url, formatted url)
     for contact in contacts:
         contact_email = contact.get("email")
         contact_name = contact.get("name", "")
@@ -119,50 +103,92 @@ async def generate_uniqueurl(
             })
             continue
         
-        # Create short links for all URLs for this contact
         contact_result = {
             "contact": {"email": contact_email, "name": contact_name},
-            "links": [],
+            "links": [None] * len(contact_urls),
             "status": "pending"
         }
-        
-        # Process URLs in batches to avoid overwhelming the API
-        all_tasks = []
+        results.append(contact_result)
         for idx, url in enumerate(contact_urls):
-            task = create_link_for_contact(contact_email, contact_name, url, idx)
-            all_tasks.append(task)
-        
-        # Execute in batches
-        link_results = []
-        for i in range(0, len(all_tasks), batch_size):
-            batch = all_tasks[i:i + batch_size]
-            batch_results = await asyncio.gather(*batch, return_exceptions=True)
-            link_results.extend(batch_results)
-            
-            # Add delay between batches to avoid rate limiting
-            if i + batch_size < len(all_tasks):
-                await asyncio.sleep(delay_between_batches)
-        
-        # Process results
-        success_count = 0
-        error_count = 0
-        
-        for link_result in link_results:
-            if isinstance(link_result, Exception):
-                contact_result["links"].append({
-                    "status": "error",
-                    "error": str(link_result)
-                })
-                error_count += 1
-            else:
-                contact_result["links"].append(link_result)
-                if link_result["status"] == "success":
-                    success_count += 1
-                    total_links_created += 1
-                else:
-                    error_count += 1
+            formatted_url = format_url_with_tracking(url, campaign_id, contact_email)
+            pairs.append((contact_result, idx, url, formatted_url))
+
+    async def on_progress(done: int, total: int):
+        if ctx is not None:
+            try:
+                await ctx.report_progress(done, total)
+            except Exception as e:
+                logging.debug(f"Progress notification failed: {e}")
+        # Log roughly every 10%
+        step = max(1, total // 10)
+        if done % step == 0 or done == total:
+            logging.info(f"🔗 generate_uniqueurl: {done}/{total} links")
+
+    # Reuse links from earlier runs of this campaign; only the rest cost Linkly calls
+    def pair_key(pair):
+        return (campaign_id, pair[0]["contact"]["email"], pair[3])
+
+    known = {}
+    if reuse_existing:
+        try:
+            known = link_store.get_many(pair_key(p) for p in pairs)
+        except Exception as e:
+            logging.warning(f"⚠️ Link store lookup failed, creating all links: {e}")
+    to_create = [p for p in pairs if pair_key(p) not in known]
+    if known:
+        logging.info(f"♻️ generate_uniqueurl: reusing {len(pairs) - len(to_create)}/{len(pairs)} existing links")
+
+    try:
+        created = await create_short_links([p[3] for p in to_create], on_progress=on_progress)
+    except Exception as e:
+        created = [{"error": str(e)}] * len(to_create)
+
+    try:
+        link_store.put_many(
+            (pair_key(p), r.get("id"), r.get("full_url"))
+            for p, r in zip(to_create, created) if "error" not in r
+        )
+        # Index new links by campaign right away so click tracking sees them without a resync
+        link_catalogue.add_links(r for r in created if "error" not in r)
+    except Exception as e:
+        logging.warning(f"⚠️ Could not record created links in the link store: {e}")
+
+    outcomes = [(p, r, False) for p, r in zip(to_create, created)]
+    for p in pairs:
+        existing = known.get(pair_key(p))
+        if existing:
+            outcomes.append((p, {"id": existing["link_id"], "full_url": existing["short_url"]}, True))
+    links_reused = len(pairs) - len(to_create)
+
+    for (contact_result, idx, url, formatted_url), result, reused in outcomes:
+        if "error" in result:
+            contact_result["links"][idx] = {
+                "url_index": idx,
+                "original_url": url,
+                "formatted_url": formatted_url,
+                "short_url": None,
+                "status": "error",
+                "error": result["error"],
+            }
+        else:
+            contact_result["links"][idx] = {
+                "url_index": idx,
+                "original_url": url,
+                "formatted_url": formatted_url,
+                "short_url": result.get("full_url"),
+                "link_id": result.get("id"),
+                "status": "success",
+                "reused": reused,
+            }
+
+    # Set overall status for each contact
+    for contact_result in results:
+        if contact_result.get("status") != "pending":
+            continue
+        success_count = sum(1 for l in contact_result["links"] if l["status"] == "success")
+        error_count = len(contact_result["links"]) - success_count
+        total_links_created += success_count
         
-        # Set overall status for this contact
         if success_count > 0 and error_count == 0:
             contact_result["status"] = "success"
         elif success_count > 0 and error_count > 0:
@@ -171,19 +197,18 @@ async def generate_uniqueurl(
             contact_result["status"] = "failed"
         
         contact_result["summary"] = {
-            "total_urls": len(contact_urls),
+            "total_urls": len(contact_result["links"]),
             "successful_links": success_count,
             "failed_links": error_count
         }
-        
-        results.append(contact_result)
 
     # Build response
     response = {
         "status": "success",
         "campaign_id": campaign_id,
         "total_contacts": len(results),
-        "total_links_created": total_links_created,
+        "total_links_created": total_links_created - links_reused,
+        "total_links_reused": links_reused,
         "total_links_attempted": sum(len(r.get("links", [])) for r in results),
         "results": results,
     }
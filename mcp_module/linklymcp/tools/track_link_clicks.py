@@ -1,9 +1,82 @@
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from urllib.parse import urlencode, urlparse, parse_qs
-from Client.Linkly_client import LinklyApiClient
+from Client.Linkly_client import get_shared_client
 from Error.linkly_error import LinklyApiError
+from Client.link_catalogue import link_catalogue
+from Client.click_ledger import click_ledger, click_timestamp
+from config import CONFIG
 import asyncio
+import logging
+
+
+def _click_link_id(click: Dict[str, Any]) -> Optional[str]:
+    link_id = click.get("link_id") or click.get("linkId")
+    if link_id is None and isinstance(click.get("link"), dict):
+        link_id = click["link"].get("id")
+    return str(link_id) if link_id is not None else None
+
+
+async def fetch_clicks_aggregated(
+    client,
+    link_ids: List[str],
+    base_params: Dict[str, str],
+    unique_only: bool,
+    exclude_bots: bool
+) -> Optional[tuple]:
+    """
+    Fetch raw clicks for the whole workspace over the date window in a few
+    pages and split them by link locally. Returns (per-link results in the same
+    shape as the per-link path, pages fetched), or None if the export is unavailable or its
+    rows cannot be attributed to links (caller falls back to per-link calls).
+    """
+    wanted = {str(l) for l in link_ids}
+    by_link: Dict[str, List[Dict[str, Any]]] = {l: [] for l in wanted}
+    endpoint = CONFIG["CLICKS_EXPORT_ENDPOINT"].format(workspace_id=client.workspace_id)
+    page_size = CONFIG["CLICKS_PAGE_SIZE"]
+    params = {k: v for k, v in base_params.items() if k not in ("frequency", "unique")}
+
+    pages = 0
+    for page in range(1, CONFIG["CLICKS_MAX_PAGES"] + 1):
+        try:
+            response = await client.request(
+                f"{endpoint}?{urlencode({**params, 'page': page, 'page_size': page_size})}", method="GET"
+            )
+        except LinklyApiError as e:
+            logging.warning(f"⚠️ Workspace click export unavailable ([{e.status_code}] {e.message})")
+            return None
+        pages += 1
+
+        rows = response if isinstance(response, list) else (
+            (response.get("clicks") or response.get("data") or response.get("results") or [])
+            if isinstance(response, dict) else []
+        )
+        if rows and _click_link_id(rows[0]) is None:
+            logging.warning("⚠️ Workspace click export rows carry no link id; cannot split by link")
+            return None
+        for click in rows:
+            if exclude_bots and click.get("bot"):
+                continue
+            bucket = by_link.get(_click_link_id(click))
+            if bucket is not None:
+                bucket.append(click)
+        if len(rows) < page_size:
+            break
+    else:
+        logging.warning(f"⚠️ Click export page cap ({CONFIG['CLICKS_MAX_PAGES']}) reached; falling back to per-link calls")
+        return None
+
+    logging.info(f"📊 Workspace click export: {pages} page(s) for {len(wanted)} link(s)")
+    results = []
+    for link_id in link_ids:
+        clicks = by_link[str(link_id)]
+        if unique_only:
+            visitors = {c.get("ip") or c.get("ipAddress") or c.get("visitor_id") for c in clicks}
+            click_count = len(visitors - {None}) or len(clicks)
+        else:
+            click_count = len(clicks)
+        results.append({"link_id": link_id, "click_count": click_count, "clicks": clicks, "error": None})
+    return results, pages
 
 async def track_link_clicks(
     campaign_id: Optional[str] = None,
@@ -14,18 +87,39 @@ async def track_link_clicks(
     exclude_bots: bool = True,
     unique_only: bool = True,
     frequency: str = "day",
-    debug: bool = False
+    debug: bool = False,
+    aggregate: bool = True,
+    incremental: bool = False,
+    cursor_key: Optional[str] = None
 ) -> dict:
     """
     Track link clicks and campaign engagement using the Linkly API.
     
-    PARALLEL APPROACH: Makes all API calls in parallel using asyncio.gather
-    to minimize total execution time and stay within rate limits.
+    AGGREGATED APPROACH: By default clicks for the whole workspace are fetched
+    once over the date window (a few paged requests) and split per link
+    locally. If that export is unavailable, falls back to one request per link
+    through a bounded semaphore. Set aggregate=False to force per-link calls.
+
+    incremental=True keeps a local click ledger per cursor_key (defaults to
+    campaign_id): only clicks since the last run are fetched, clicks_per_link
+    holds running totals, and new_clicks_per_link what this run added.
     """
 
-    client = LinklyApiClient()
+    client = get_shared_client()
     
     try:
+        ledger_key = None
+        cursor_start = None
+        if incremental:
+            ledger_key = cursor_key or campaign_id or (
+                "links:" + ",".join(sorted(str(l) for l in link_ids)) if link_ids else None
+            )
+            last_ts = click_ledger.cursor(ledger_key) if ledger_key else None
+            if last_ts and not start_date:
+                # Only the aggregated export can use this: the ledger drops clicks already counted.
+                # API windows are whole days.
+                cursor_start = (datetime.fromtimestamp(last_ts) - timedelta(days=1)).strftime("%Y-%m-%d")
+
         # Default to last 30 days
         if not start_date:
             start_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
@@ -42,48 +136,13 @@ async def track_link_clicks(
         # Step 1: Get link IDs if campaign_id provided but no link_ids
         if campaign_id and not link_ids:
             try:
-                links_endpoint = f"/api/v1/workspace/{client.workspace_id}/links"
-                debug_info["steps"].append(f"Fetching links from: {links_endpoint}")
-                debug_info["api_calls_made"] += 1
-                
-                links_response = await client.request(links_endpoint, method="GET")
-                
-                link_ids = []
-                links_data = []
-                
-                # Handle different response formats
-                if isinstance(links_response, list):
-                    links_data = links_response
-                elif isinstance(links_response, dict):
-                    links_data = (links_response.get("links") or 
-                                 links_response.get("data") or 
-                                 links_response.get("results") or [])
-                
-                debug_info["steps"].append(f"Got {len(links_data)} total links")
-                
-                # Find links matching the campaign
-                for link in links_data:
-                    link_destination = link.get("destination", "")
-                    link_formatted = link.get("formatted_url", "")
-                    link_url = link.get("url", "")
-                    link_id = link.get("id") or link.get("link_id")
-                    
-                    all_urls = f"{link_destination} {link_formatted} {link_url}"
-                    
-                    patterns = [
-                        f"campaign={campaign_id}",
-                        f"campaign_id={campaign_id}",
-                        f"campaignId={campaign_id}",
-                        campaign_id
-                    ]
-                    
-                    if any(pattern in all_urls for pattern in patterns):
-                        if link_id:
-                            link_ids.append(str(link_id))
-                            if debug:
-                                debug_info["steps"].append(f"✓ Matched link {link_id}")
-                
-                debug_info["total_links_checked"] = len(links_data)
+                # Campaign -> links from the local catalogue index (incrementally synced)
+                catalogue_links = await link_catalogue.links_for_campaign(client, campaign_id)
+                link_ids = [str(l["link_id"]) for l in catalogue_links]
+                debug_info["steps"].append(f"Link catalogue returned {len(link_ids)} link(s) for campaign")
+                if debug:
+                    debug_info["links_found"] = catalogue_links
+
                 debug_info["matching_links_found"] = len(link_ids)
                 
                 if not link_ids:
@@ -116,7 +175,7 @@ async def track_link_clicks(
         # ============================================================
         
         if debug:
-            debug_info["steps"].append(f"\n⚡ Fetching clicks for {len(link_ids)} links in PARALLEL...")
+            debug_info["steps"].append(f"\n⚡ Fetching clicks for {len(link_ids)} links...")
         
         # Build base params (correct parameter names per API docs)
         base_params = {
@@ -183,12 +242,46 @@ async def track_link_clicks(
                     "error": str(e)
                 }
         
-        # Execute all requests in parallel
-        results = await asyncio.gather(*[fetch_link_clicks(link_id) for link_id in link_ids])
-        debug_info["api_calls_made"] += len(link_ids)
+        results = None
+        if aggregate:
+            export_params = {**base_params, "start": cursor_start} if cursor_start else base_params
+            aggregated = await fetch_clicks_aggregated(client, link_ids, export_params, unique_only, exclude_bots)
+            if aggregated:
+                results, pages = aggregated
+                debug_info["api_calls_made"] += pages
+                debug_info["execution_mode"] = "aggregated"
+
+        if results is None:
+            # Per-link fallback over the full requested window (never the ledger cursor),
+            # bounded so thousands of links don't hit the API at once
+            semaphore = asyncio.Semaphore(CONFIG["CLICKS_FALLBACK_CONCURRENCY"])
+
+            async def fetch_bounded(link_id: str):
+                async with semaphore:
+                    return await fetch_link_clicks(link_id)
+
+            results = await asyncio.gather(*[fetch_bounded(link_id) for link_id in link_ids])
+            debug_info["api_calls_made"] += len(link_ids)
+            debug_info["execution_mode"] = "per_link"
+
+        new_clicks_per_link = None
+        if ledger_key and debug_info["execution_mode"] == "aggregated":
+            new_by_link = click_ledger.ingest(
+                ledger_key, {str(r["link_id"]): r["clicks"] for r in results}
+            )
+            totals = click_ledger.totals(ledger_key, [str(r["link_id"]) for r in results], unique_only)
+            new_clicks_per_link = {l: len(c) for l, c in new_by_link.items()}
+            for r in results:
+                r["click_count"] = totals[str(r["link_id"])]
+                r["clicks"] = new_by_link.get(str(r["link_id"]), [])
+            logging.info(f"🧾 Incremental clicks for {ledger_key}: {sum(new_clicks_per_link.values())} new since {cursor_start or start_date}")
+        elif ledger_key:
+            # Per-link traffic counts carry no click rows to de-duplicate; report the full window
+            logging.warning("⚠️ Incremental tracking needs the workspace click export; returning full-window counts")
         
         # Process results
         clicks_per_link = {}
+        last_click_per_link = {}
         all_clicks = []
         errors_per_link = {}
         
@@ -202,6 +295,9 @@ async def track_link_clicks(
             
             if clicks:
                 all_clicks.extend(clicks)
+                stamps = [t for t in (click_timestamp(c) for c in clicks if isinstance(c, dict)) if t is not None]
+                if stamps:
+                    last_click_per_link[link_id] = max(stamps)
             
             if error:
                 errors_per_link[link_id] = error
@@ -216,7 +312,6 @@ async def track_link_clicks(
         if debug:
             debug_info["steps"].append(f"\n📊 Total clicks: {total_clicks}")
             debug_info["steps"].append(f"Total API calls: {debug_info['api_calls_made']}")
-            debug_info["execution_mode"] = "parallel"
             debug_info["clicks_per_link"] = clicks_per_link
             if errors_per_link:
                 debug_info["errors_per_link"] = errors_per_link
@@ -339,6 +434,11 @@ async def track_link_clicks(
                 "engagement_rate": f"{engagement_rate:.1f}%"
             },
             "clicks_per_link": clicks_per_link,
+            "last_click_per_link": last_click_per_link,
+            "fetch_mode": debug_info["execution_mode"],
+            "incremental": new_clicks_per_link is not None,
+            "new_clicks_per_link": new_clicks_per_link,
+            "api_calls_made": debug_info["api_calls_made"],
             "analytics": {
                 "by_contact": clicks_by_contact,
                 "by_date": dict(sorted(clicks_by_date.items())) if clicks_by_date else {},
@@ -377,5 +477,3 @@ async def track_link_clicks(
             "message": str(e),
             "traceback": traceback.format_exc()
         }
-    finally:
-        await client.close()
\ No newline at end of file
@@ -1,4 +1,6 @@
 from core.state import MarketingState
+from core.result_store import LazyResultSets, compact_result_sets
+from core.tool_results import compact_service_result
 from baseagent import get_member_dependency, call_mcp_v2
 import logging
 from langchain_core.messages import AIMessage
@@ -22,7 +24,7 @@ async def review_proposal_node(state: MarketingState) -> Command:
         return Command(goto="dynamic_caller", update={"error": "Missing proposal data"})
 
     # ✅ Extract contact/related record info from result_sets (populated by Safe Execution)
-    result_sets = state.get("shared_result_sets", {})
+    result_sets = LazyResultSets(state.get("shared_result_sets") or {})
     contact_count = 0
     related_records = []
     
@@ -168,7 +170,7 @@ async def dynamic_caller(state: MarketingState) -> Command:
         
         # ✅ CAPTURE INTERMEDIATE RESULTS (contacts, etc.)
         # If we executed safe tools, their results are here. We MUST persist them.
-        partial_results = mcp_result.get("result_sets", {})
+        partial_results = compact_result_sets(mcp_result.get("result_sets", {}))
         
         logging.info(f"🛑 [DynamicCaller] Proposal generated. Handing off to ReviewProposal node.")
         
@@ -183,6 +185,12 @@ async def dynamic_caller(state: MarketingState) -> Command:
         )
 
     # 4. STANDARD COMPLETION (Success or Error)
+    # Large result sets go to the result store; state (and mcp_results) keep handles
+    if mcp_result and mcp_result.get("result_sets"):
+        mcp_result["result_sets"] = compact_result_sets(mcp_result["result_sets"])
+    # Tool responses are previewed in state; full payloads are reloaded on demand
+    mcp_result = compact_service_result(mcp_result)
+
     # Store results
     results = state.get("mcp_results") or {}
     results[service_name] = mcp_result
@@ -3,15 +3,24 @@
 FastAPI WebSocket endpoint for real-time agent communication
 """
 import asyncio
+import hmac
+import re
+import time
 import uuid
 import json
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+import os
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import Command
 from dotenv import load_dotenv
 from core.mcp_loader import preload_mcp_tools
+from mcp_module.Salesforcemcp.schema_sync import start_schema_sync_scheduler
+from mcp_module.Brevomcp.client.event_store import event_store
+from core.engagement_scheduler import start_engagement_scheduler
+from core.result_store import current_session, LazyResultSets
+from core.session_tokens import issue_resume_token, verify_resume_token
+from core.checkpointer import open_checkpointer, close_checkpointer, start_checkpoint_pruner, thread_exists, touch_thread
 from baseagent import get_member_dependency
 from graph.orchestrator import build_orchestrator_graph
 from core.state import MarketingState
@@ -34,12 +43,30 @@ logging.basicConfig(
 
 app = FastAPI()
 
+# Shared, disk-backed checkpointer and the orchestrator graph compiled against it,
+# both created once on startup; sessions are isolated purely by thread_id
+checkpointer = None
+agent_graph = None
+
+# Threads with an open WebSocket; a second connection to the same thread is refused so
+# two clients never run turns against one checkpoint concurrently
+active_threads = set()
+
  
 
 
 @app.on_event("startup")
 async def startup_event():
     """Pre-load MCP tools on server startup"""
+    global checkpointer, agent_graph
+    checkpointer = await open_checkpointer()
+    start_checkpoint_pruner(checkpointer)
+
+    # Compiles the orchestrator plus every workflow subgraph once for all connections
+    started = time.perf_counter()
+    agent_graph = build_orchestrator_graph(checkpointer=checkpointer)
+    logging.info(f"🧩 Orchestrator graph compiled in {time.perf_counter() - started:.2f}s")
+
     try:
         logging.info("🚀 Starting Marketing Agent Server...")
         # Get registry which contains configs for all MCPs
@@ -72,6 +99,21 @@ async def startup_event():
     except Exception as e:
         logging.error(f"❌ Error during startup tool preloading: {e}")
 
+    # Keep schema_metadata.json / vector index in sync with the org (opt-in via SCHEMA_SYNC_INTERVAL_SECONDS)
+    start_schema_sync_scheduler()
+
+    # Periodically re-run the engagement workflow for recently sent campaigns (ENGAGEMENT_SYNC_ENABLED)
+    start_engagement_scheduler()
+
+    if not os.getenv("BREVO_WEBHOOK_TOKEN"):
+        logging.warning("⚠️ BREVO_WEBHOOK_TOKEN is not set; /webhooks/brevo will reject all deliveries")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    if checkpointer is not None:
+        await close_checkpointer(checkpointer)
+
 class MessageRequest(BaseModel):
     message: str
 
@@ -83,21 +125,150 @@ class MessageResponse(BaseModel):
     salesforce_data: bool = False
 
 
+@app.post("/webhooks/brevo")
+async def brevo_webhook(request: Request):
+    """Ingest Brevo transactional webhook events (single event or batched list) into the local event store."""
+    # Fail closed: webhook events drive bounce/engagement status and Salesforce updates
+    expected_token = os.getenv("BREVO_WEBHOOK_TOKEN")
+    if not expected_token:
+        raise HTTPException(status_code=403, detail="Webhook disabled: BREVO_WEBHOOK_TOKEN is not configured")
+    auth = request.headers.get("authorization", "")
+    token = request.query_params.get("token") or (auth[7:] if auth.lower().startswith("bearer ") else "")
+    if not hmac.compare_digest(token.encode("utf-8"), expected_token.encode("utf-8")):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be JSON")
+
+    events = body if isinstance(body, list) else [body]
+    try:
+        inserted = await asyncio.to_thread(event_store.append, events)
+    except Exception as e:
+        logging.error(f"❌ Failed to store Brevo webhook events: {e}")
+        # Non-2xx makes Brevo retry the delivery later
+        raise HTTPException(status_code=503, detail="Event store unavailable")
+
+    logging.info(f"📨 Brevo webhook: {len(events)} event(s) received, {inserted} new")
+    return {"received": len(events), "stored": inserted}
+
+
+# Client-facing labels for graph nodes in "progress" frames; other nodes get a generic label
+NODE_LABELS = {
+    "marketing_orchestrator": "Understanding your request",
+    "orchestrator": "Planning next step",
+    "dynamic_caller": "Called a service",
+    "review_proposal": "Preparing proposal for review",
+    "completion": "Summarizing results",
+    "preview_template": "Loaded email template",
+    "analyze_links": "Analyzed links in the template",
+    "link_shortener": "Generated tracked links",
+    "send_email": "Sent emails",
+    "track_delivery": "Checked delivery status",
+    "update_salesforce": "Updated Salesforce records",
+    "fetch_data": "Loaded campaign members",
+    "track_clicks": "Fetched link clicks",
+    "score_engagement": "Scored engagement",
+    "update_engagement": "Updated engagement in Salesforce",
+}
+
+
+def _progress_frame(namespace, mode, chunk) -> list:
+    """Turn one astream item into zero or more small "progress" frames (never the raw state)."""
+    path = [ns.split(":")[0] for ns in namespace]
+    if mode == "custom":
+        data = chunk if isinstance(chunk, dict) else {"message": str(chunk)}
+        return [{"type": "progress", "path": path, **data}]
+
+    frames = []
+    for node, update in (chunk or {}).items():
+        if node.startswith("__"):
+            continue
+        frame = {
+            "type": "progress",
+            "stage": "node",
+            "node": node,
+            "path": path,
+            "message": NODE_LABELS.get(node, f"Finished {node.replace('_', ' ')}"),
+        }
+        shared = update.get("shared_result_sets") if isinstance(update, dict) else None
+        if shared:
+            # Partial results: record counts only; handles are not loaded
+            lazy = LazyResultSets(shared)
+            frame["result_counts"] = {name: lazy.count(name) for name in shared}
+        frames.append(frame)
+    return frames
+
+
+async def stream_turn(websocket: WebSocket, graph_input, config) -> None:
+    """
+    Run one graph turn with astream, forwarding node completions ("updates",
+    including subgraph nodes) and emit_progress events ("custom") to the client.
+    The final state is read from the checkpointer afterwards, as before.
+
+    Progress delivery is best-effort: if a send fails (e.g. the client went
+    away) the stream is still drained, so the run completes like ainvoke did
+    instead of stopping halfway through an email send or Salesforce upsert.
+    """
+    deliver = True
+    async for namespace, mode, chunk in agent_graph.astream(
+        graph_input, config, stream_mode=["updates", "custom"], subgraphs=True
+    ):
+        if not deliver:
+            continue
+        for frame in _progress_frame(namespace, mode, chunk):
+            try:
+                await websocket.send_json(frame)
+            except Exception as e:
+                logging.warning(f"⚠️ Progress delivery stopped ({e}); finishing the turn without it")
+                deliver = False
+                break
+
+
 @app.websocket("/ws/chat")
 async def run_agent(websocket: WebSocket):
     await websocket.accept()
     
-    # 🧠 STATEFUL MEMORY: Persistent checkpointer for this connection
-    memory = MemorySaver()
-    agent_graph = build_orchestrator_graph(checkpointer=memory)
-    
-    # Generate unique session ID for this connection
-    session_id = str(uuid.uuid4())
-    logging.info(f"🔌 New WebSocket connection. Assigned Session ID: {session_id}")
+    # 🧠 STATEFUL MEMORY: agent_graph and its checkpointer are shared; state is keyed by thread_id
+    # Reconnecting clients pass their previous thread_id and the resume_token issued with it
+    requested = websocket.query_params.get("thread_id") or ""
+    if requested and re.fullmatch(r"[A-Za-z0-9-]{8,64}", requested) and verify_resume_token(
+        requested, websocket.query_params.get("resume_token")
+    ):
+        session_id = requested
+    else:
+        if requested:
+            logging.warning("🔒 Resume refused: missing or invalid resume token; starting a new thread")
+        session_id = str(uuid.uuid4())
+
     thread_config = {"configurable": {"thread_id": session_id}} 
+    resumed = session_id == requested and await thread_exists(checkpointer, session_id)
+    logging.info(f"🔌 New WebSocket connection. {'Resumed' if resumed else 'Assigned'} Session ID: {session_id}")
+
+    if session_id in active_threads:
+        logging.warning(f"🔒 Thread {session_id} already has an open connection; refusing the new one")
+        await websocket.send_json({
+            "type": "error",
+            "message": "This conversation is already open in another window."
+        })
+        await websocket.close(code=4409)
+        return
+    # No await between the check and the add, so this is atomic on the event loop
+    active_threads.add(session_id)
+
+    # Large result sets stored during this connection are tagged with its session
+    current_session.set(session_id)
 
 
     try:
+        await websocket.send_json({
+            "type": "session",
+            "thread_id": session_id,
+            "resume_token": issue_resume_token(session_id),
+            "resumed": resumed
+        })
+
         while True:
             # 1. RECEIVE message
             data = await websocket.receive_text()
@@ -118,7 +289,9 @@ async def run_agent(websocket: WebSocket):
                 # Command(resume=value) sends 'value' as the result of the interrupt() call
                 res_command = Command(resume=user_message)
                 
-                final_state = await agent_graph.ainvoke(res_command, thread_config)
+                await stream_turn(websocket, res_command, thread_config)
+                await touch_thread(checkpointer, session_id)
+                final_state = (await agent_graph.aget_state(thread_config)).values
                 
             else:
                 # ▶️ IDLE: Start a new turn
@@ -163,7 +336,8 @@ async def run_agent(websocket: WebSocket):
                 }
                 
                 # Run the graph (no try/except for GraphInterrupt as it may just return)
-                await agent_graph.ainvoke(initial_input, thread_config)
+                await stream_turn(websocket, initial_input, thread_config)
+                await touch_thread(checkpointer, session_id)
                 
                 # 🔍 Check resulting state for interrupts
                 # 🔍 Check resulting state for interrupts
@@ -257,6 +431,8 @@ async def run_agent(websocket: WebSocket):
             "type": "error",
             "message": str(e)
         })
+    finally:
+        active_threads.discard(session_id)
             
 
 
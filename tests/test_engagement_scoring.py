@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.engagement_scoring import signal_stream, score_members, changed_members, update_fields
+
+
+def _members():
+    return {
+        "member_id": ["cm1", "cm2", "cm3"],
+        "email": ["a@x.com", "b@x.com", "c@x.com"],
+        "name": ["A", "B", "C"],
+        "link_id": ["101", "102", "103"],
+        "status": ["Sent", "Responded", "Sent"],
+    }
+
+
+class TestEngagementScoring(unittest.TestCase):
+
+    def test_signal_stream_only_counts_matching_message_ids(self):
+        events = {
+            "a@x.com": [
+                {"event": "opened", "messageId": "<m-a>", "date": "2024-05-01T10:00:00Z"},
+                # Same address, earlier campaign's message
+                {"event": "clicks", "messageId": "<old>", "date": "2024-04-01T10:00:00Z"},
+            ],
+            # No message recorded for this send
+            "b@x.com": [{"event": "opened", "messageId": "<m-b>"}],
+        }
+        signals = list(signal_stream(events, {"a@x.com": "<m-a>"}, {"103": 2, "102": 0}, {}))
+
+        self.assertEqual([s[:4] for s in signals], [
+            ("email", "a@x.com", "opened", 1),
+            ("link", "103", "linkly_click", 2),
+        ])
+
+    def test_changed_members_never_downgrades_status(self):
+        members = _members()
+        scores = score_members(members, iter([("email", "b@x.com", "opened", 1, 100.0)]))
+
+        changed = changed_members(members, scores, {})
+        self.assertEqual(len(changed), 1)
+        self.assertEqual(changed[0]["member_id"], "cm2")
+        self.assertEqual(changed[0]["new_status"], "Responded")
+
+    def test_click_marks_member_responded(self):
+        members = _members()
+        scores = score_members(members, iter([("link", "101", "linkly_click", 1, 100.0)]))
+
+        changed = changed_members(members, scores, {})
+        self.assertEqual(changed[0]["new_status"], "Responded")
+        self.assertEqual(changed[0]["score"], 5.0)
+
+    def test_changed_members_skips_unchanged(self):
+        members = _members()
+        scores = score_members(members, iter([
+            ("email", "a@x.com", "opened", 1, 100.0),
+            ("email", "c@x.com", "opened", 1, 200.0),
+        ]))
+        previous = {
+            "cm1": {"score": 1.0, "last_engaged_at": 100.0},
+            "cm3": {"score": 1.0, "last_engaged_at": 150.0},
+        }
+
+        changed = changed_members(members, scores, previous)
+        self.assertEqual([m["member_id"] for m in changed], ["cm3"])
+
+    def test_update_fields_writes_status_only_by_default(self):
+        member = {"status": "Sent", "new_status": "Responded", "score": 5.0, "last_engaged_at": 100.0}
+        with patch("core.engagement_scoring.SCORE_FIELD", None), \
+                patch("core.engagement_scoring.LAST_ENGAGED_FIELD", None):
+            self.assertEqual(update_fields(member, None), {"Status": "Responded"})
+
+    def test_update_fields_writes_configured_fields(self):
+        member = {"status": "Responded", "new_status": "Responded", "score": 5.0, "last_engaged_at": 86400.0}
+        with patch("core.engagement_scoring.SCORE_FIELD", "Engagement_Score__c"), \
+                patch("core.engagement_scoring.LAST_ENGAGED_FIELD", "Last_Engaged__c"):
+            self.assertEqual(update_fields(member, {"score": 1.0}), {
+                "Engagement_Score__c": 5.0,
+                "Last_Engaged__c": "1970-01-02T00:00:00Z",
+            })
+            # Nothing changed since the last write
+            self.assertEqual(update_fields(member, {"score": 5.0, "last_engaged_at": 86400.0}), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import tempfile
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from mcp_module.Brevomcp.client.send_journal import (
+    SendJobJournal, CHUNK_PENDING, CHUNK_UNCONFIRMED, CHUNK_RECONCILED
+)
+
+
+class TestSendJobJournal(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _journal(self, run_id="run-1"):
+        return SendJobJournal("camp_001", 42, run_id=run_id, journal_dir=self.dir)
+
+    def test_resume_after_partial_send(self):
+        journal = self._journal()
+        sent_key = journal.chunk_tag(["a@x.com", "b@x.com"])
+        journal.mark_pending(sent_key, 0, ["a@x.com", "b@x.com"])
+        journal.mark_sent(sent_key, [{"email": "a@x.com", "message_id": "m1"}, {"email": "B@x.com", "message_id": "m2"}], ["m1", "m2"])
+        failed_key = journal.chunk_tag(["c@x.com"])
+        journal.mark_pending(failed_key, 1, ["c@x.com"])
+        journal.mark_failed(failed_key, "[400] Bad request")
+
+        # A new process replays the journal from disk
+        resumed = self._journal()
+        self.assertEqual(set(resumed.confirmed_recipients()), {"a@x.com", "b@x.com"})
+        self.assertEqual(resumed.confirmed_recipients()["b@x.com"]["message_id"], "m2")
+        self.assertTrue(resumed.is_complete())
+        self.assertEqual(resumed.summary()["chunks_failed"], 1)
+
+    def test_torn_last_line_is_ignored(self):
+        journal = self._journal()
+        key = journal.chunk_tag(["a@x.com"])
+        journal.mark_pending(key, 0, ["a@x.com"])
+        journal.mark_sent(key, [{"email": "a@x.com", "message_id": "m1"}], ["m1"])
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write('{"event": "chunk", "chunk_key": "')
+
+        self.assertIn("a@x.com", self._journal().confirmed_recipients())
+
+    def test_reset_bumps_generation_and_clears_confirmations(self):
+        journal = self._journal()
+        key = journal.chunk_tag(["a@x.com"])
+        journal.mark_pending(key, 0, ["a@x.com"])
+        journal.mark_sent(key, [{"email": "a@x.com", "message_id": "m1"}], ["m1"])
+
+        journal.reset()
+        self.assertEqual(journal.generation, 1)
+        self.assertEqual(journal.confirmed_recipients(), {})
+        self.assertNotEqual(journal.chunk_tag(["a@x.com"]), key)
+
+        # Events from the old generation stay ignored after replay
+        replayed = self._journal()
+        self.assertEqual(replayed.generation, 1)
+        self.assertEqual(replayed.confirmed_recipients(), {})
+
+    def test_runs_are_separate_jobs(self):
+        journal = self._journal("run-1")
+        key = journal.chunk_tag(["a@x.com"])
+        journal.mark_pending(key, 0, ["a@x.com"])
+        journal.mark_sent(key, [{"email": "a@x.com", "message_id": "m1"}], ["m1"])
+
+        self.assertEqual(self._journal("run-2").confirmed_recipients(), {})
+        self.assertIn("a@x.com", self._journal("run-1").confirmed_recipients())
+
+    def test_pending_chunk_is_unresolved_not_confirmed(self):
+        journal = self._journal()
+        key = journal.chunk_tag(["a@x.com", "b@x.com"])
+        journal.mark_pending(key, 0, ["a@x.com", "b@x.com"])
+
+        # Crash here: the replayed chunk has an unknown outcome and confirms nobody
+        resumed = self._journal()
+        unresolved = resumed.unresolved_chunks()
+        self.assertEqual([c["state"] for c in unresolved], [CHUNK_PENDING])
+        self.assertEqual(unresolved[0]["emails"], ["a@x.com", "b@x.com"])
+        self.assertIsNotNone(unresolved[0]["attempted_at"])
+        self.assertEqual(resumed.confirmed_recipients(), {})
+        self.assertFalse(resumed.is_complete())
+
+    def test_partial_reconciliation_keeps_chunk_unresolved(self):
+        journal = self._journal()
+        key = journal.chunk_tag(["a@x.com", "b@x.com"])
+        journal.mark_pending(key, 0, ["a@x.com", "b@x.com"])
+        journal.mark_unconfirmed(key, "[500] Server error")
+
+        journal.mark_reconciled(key, [{"email": "a@x.com", "message_id": "m1"}], resolved=False)
+        resumed = self._journal()
+        self.assertEqual(set(resumed.confirmed_recipients()), {"a@x.com"})
+        self.assertEqual([c["state"] for c in resumed.unresolved_chunks()], [CHUNK_UNCONFIRMED])
+
+        resumed.mark_reconciled(key, [{"email": "a@x.com", "message_id": "m1"}], resolved=True)
+        self.assertEqual(resumed.chunks[key]["state"], CHUNK_RECONCILED)
+        self.assertTrue(resumed.is_complete())
+        self.assertEqual(resumed.summary()["chunks_reconciled"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from unittest.mock import patch
+import tempfile
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import core.session_tokens as session_tokens
+
+
+class TestSessionTokens(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.secret_path = os.path.join(self._tmp.name, "session_secret")
+        session_tokens._key = None
+
+    def tearDown(self):
+        session_tokens._key = None
+        self._tmp.cleanup()
+
+    def _env(self):
+        return patch.dict(os.environ, {"SESSION_TOKEN_SECRET_PATH": self.secret_path}, clear=False)
+
+    def test_token_only_resumes_its_own_thread(self):
+        with self._env(), patch.dict(os.environ, {"SESSION_TOKEN_SECRET": ""}):
+            token = session_tokens.issue_resume_token("thread-aaaa")
+            self.assertTrue(session_tokens.verify_resume_token("thread-aaaa", token))
+            self.assertFalse(session_tokens.verify_resume_token("thread-bbbb", token))
+            self.assertFalse(session_tokens.verify_resume_token("thread-aaaa", None))
+
+    def test_generated_key_survives_restart(self):
+        with self._env(), patch.dict(os.environ, {"SESSION_TOKEN_SECRET": ""}):
+            token = session_tokens.issue_resume_token("thread-aaaa")
+            # A restarted server reads the same key back from disk
+            session_tokens._key = None
+            self.assertTrue(session_tokens.verify_resume_token("thread-aaaa", token))
+            self.assertEqual(os.stat(self.secret_path).st_mode & 0o777, 0o600)
+
+
+if __name__ == '__main__':
+    unittest.main()
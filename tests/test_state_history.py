@@ -0,0 +1,51 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langchain_core.messages import HumanMessage, AIMessage
+from core.state import merge_history, add_messages_bounded
+
+
+class TestStateHistory(unittest.TestCase):
+
+    @patch('core.state.SESSION_HISTORY_MAX_ITEMS', 5)
+    def test_merge_history_keeps_newest_items(self):
+        left = [{"turn": i} for i in range(4)]
+        merged = merge_history(left, [{"turn": 4}, {"turn": 5}, {"turn": 6}])
+
+        self.assertEqual([h["turn"] for h in merged], [2, 3, 4, 5, 6])
+        # The previous value (held by earlier checkpoints/snapshots) is untouched
+        self.assertEqual(len(left), 4)
+        self.assertIsNot(merged, left)
+
+    def test_merge_history_handles_missing_sides(self):
+        self.assertEqual(merge_history(None, [{"turn": 0}]), [{"turn": 0}])
+        self.assertEqual(merge_history([{"turn": 0}], None), [{"turn": 0}])
+
+    @patch('core.state.MESSAGE_HISTORY_MAX', 8)
+    def test_trimmed_messages_start_at_human_message(self):
+        history = []
+        for i in range(4):
+            history += [
+                HumanMessage(content=f"q{i}", id=f"h{i}"),
+                AIMessage(content=f"tool {i}", id=f"t{i}"),
+                AIMessage(content=f"a{i}", id=f"a{i}"),
+            ]
+        merged = add_messages_bounded(history[:-1], [history[-1]])
+
+        self.assertLessEqual(len(merged), 8)
+        self.assertIsInstance(merged[0], HumanMessage)
+        self.assertEqual(merged[-1].content, "a3")
+
+    @patch('core.state.MESSAGE_HISTORY_MAX', 8)
+    def test_short_history_is_not_trimmed(self):
+        history = [HumanMessage(content="q", id="h"), AIMessage(content="a", id="a")]
+        self.assertEqual(len(add_messages_bounded(history, [])), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
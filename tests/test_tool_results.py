@@ -0,0 +1,76 @@
+import unittest
+from unittest.mock import patch
+from types import SimpleNamespace
+import tempfile
+import sys
+import os
+
+# Add project root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.result_store import ResultSetStore
+from core.tool_results import compact_response, compact_service_result, record_tool_result, INLINE_CHARS
+
+
+class TestToolResults(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = ResultSetStore(path=os.path.join(self._tmp.name, "result_sets.sqlite3"))
+        patcher = patch('core.tool_results.result_store', self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_truncated_response_reloads_full_text(self):
+        text = "x" * (INLINE_CHARS * 2 + 7)
+        response = compact_response(SimpleNamespace(content=[SimpleNamespace(text=text)], isError=False))
+
+        item = response.content[0]
+        self.assertEqual(len(item.preview), INLINE_CHARS)
+        self.assertIsNotNone(item.payload_ref)
+        self.assertEqual(item.text, text)
+
+    def test_small_response_stays_inline(self):
+        response = compact_response(SimpleNamespace(content=[SimpleNamespace(text="ok")], isError=False))
+        self.assertIsNone(response.content[0].payload_ref)
+        self.assertEqual(response.content[0].text, "ok")
+
+    def test_long_request_lists_are_truncated(self):
+        result = compact_service_result({"tool_results": [{
+            "tool_name": "upsert_salesforce_records",
+            "request": {"records": [{"record_id": i} for i in range(30)]},
+        }]})
+        records = result["tool_results"][0]["request"]["records"]
+        self.assertEqual(records[0], {"record_id": 0})
+        self.assertEqual(records[-1], {"_truncated": 10})
+
+    @patch('core.tool_results.MAX_TOOL_RESULTS', 8)
+    def test_record_tool_result_keeps_newest_entries(self):
+        state = {}
+        for i in range(12):
+            record_tool_result(state, "Salesforce MCP", "upsert", {"status": "success", "data": {"i": i}})
+
+        service = state["mcp_results"]["Salesforce MCP"]
+        self.assertLessEqual(len(service["tool_results"]), 8)
+        self.assertEqual(service["tool_results"][-1]["response"], {"i": 11})
+        self.assertEqual(service["execution_summary"]["total_calls"], 12)
+
+    def test_record_tool_result_does_not_mutate_previous_results(self):
+        state = {}
+        record_tool_result(state, "Salesforce MCP", "query", {"status": "success", "data": {"i": 0}})
+        previous = state["mcp_results"]
+        previous_service = previous["Salesforce MCP"]
+
+        record_tool_result(state, "Salesforce MCP", "upsert", {"status": "error", "data": {"i": 1}})
+
+        self.assertEqual(len(previous_service["tool_results"]), 1)
+        self.assertEqual(previous_service["execution_summary"], {"total_calls": 1, "successful_calls": 1})
+        self.assertIsNot(state["mcp_results"], previous)
+        self.assertEqual(len(state["mcp_results"]["Salesforce MCP"]["tool_results"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
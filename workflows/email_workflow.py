@@ -1,10 +1,16 @@
 import logging
 import re
 import json
+import uuid
 from typing import Dict, Any, List
 from langgraph.graph import StateGraph, END
 from core.state import MarketingState
 from baseagent import get_member_dependency, execute_single_tool
+from mcp_module.Brevomcp.client.event_store import event_store
+from core.engagement_store import engagement_store
+from core.result_store import materialize
+from core.tool_results import record_tool_result
+from core.progress import emit_progress, tool_progress
 
 # Constants
 # Constants
@@ -16,31 +22,7 @@ def _update_mcp_results(state: MarketingState, service_name: str, tool_name: str
     """
     Manually update mcp_results so the Orchestrator sees the work.
     """
-    mcp_results = state.get("mcp_results", {}) or {}
-    service_data = mcp_results.get(service_name, {"execution_summary": {}, "tool_results": []})
-    
-    # Update stats
-    summary = service_data.get("execution_summary", {})
-    summary["total_calls"] = summary.get("total_calls", 0) + 1
-    if result.get("status") == "success":
-        summary["successful_calls"] = summary.get("successful_calls", 0) + 1
-    else:
-        summary["failed_calls"] = summary.get("failed_calls", 0) + 1
-    service_data["execution_summary"] = summary
-        
-    # Append result
-    tool_res = {
-        "tool_name": tool_name,
-        "status": result.get("status", "unknown"),
-        "response": result.get("data", str(result)), 
-        # approximate structure for Orchestrator summarizer
-    }
-    service_data["tool_results"].append(tool_res)
-    
-    # Write back
-    mcp_results[service_name] = service_data
-    state["mcp_results"] = mcp_results
-    return state
+    return record_tool_result(state, service_name, tool_name, result)
 
 # async def preview_template_node(state: MarketingState) -> MarketingState:
 #     """
@@ -149,7 +131,7 @@ async def preview_template_node(state: MarketingState) -> MarketingState:
     contacts = []
     
     if "campaign" in shared_data:
-        campaigns = shared_data["campaign"]
+        campaigns = materialize(shared_data["campaign"])
         if campaigns:
              campaign_data = campaigns[0]
              campaign_id = campaign_data.get("Id")
@@ -174,7 +156,7 @@ async def preview_template_node(state: MarketingState) -> MarketingState:
                          template_id = None
      
     if "contacts" in shared_data:
-        contacts = shared_data["contacts"]
+        contacts = materialize(shared_data["contacts"])
         
     logging.info(f"   Campaign ID: {campaign_id}, Template ID: {template_id}, Contacts: {len(contacts)}")
 
@@ -270,7 +252,9 @@ async def preview_template_node(state: MarketingState) -> MarketingState:
                 "contacts": contacts,
                 "preview_data": result["data"],
                 "campaign_id": campaign_id,
-                "campaign_name": campaign_name
+                "campaign_name": campaign_name,
+                # One id per workflow run, checkpointed before send_email so a retry resumes the same send job
+                "send_run_id": uuid.uuid4().hex
             }
             # Safe update to handle case where context might be None
             ctx = state.get("email_workflow_context") or {}
@@ -303,7 +287,17 @@ async def analyze_links_node(state: MarketingState) -> MarketingState:
     found_urls = []
     template_params = set()
     
-    if preview_data and "previews" in preview_data:
+    analysis = preview_data.get("analysis") if preview_data else None
+    if analysis:
+        # Compiled-template analysis from preview_email: no need to re-scan the HTML
+        template_params.update(analysis.get("params", []))
+        if template_params:
+            logging.info(f"   📝 Found template params: {template_params}")
+        found_urls = [u for u in analysis.get("links", []) if "unsubscribe" not in u.lower()]
+        if found_urls:
+            has_links = True
+            logging.info(f"   🔗 Found {len(found_urls)} unique links: {found_urls}")
+    elif preview_data and "previews" in preview_data:
         html_content = preview_data["previews"][0].get("html_content", "")
         # Regex to find links
         # Looking for href="http..." or https...
@@ -363,9 +357,11 @@ async def link_shortener_node(state: MarketingState) -> MarketingState:
     }
 
     short_links_map = {} # {contact_id: {original: {short_url, link_id}}}
+    progress_message = f"Generating tracked links for {len(linkly_contacts)} contacts"
+    emit_progress(progress_message, total=len(linkly_contacts) * len(found_urls))
     
     try:
-        res = await execute_single_tool(LINKLY_SERVICE, "generate_uniqueurl", gen_args)
+        res = await execute_single_tool(LINKLY_SERVICE, "generate_uniqueurl", gen_args, progress_callback=tool_progress(progress_message))
         
         if res["status"] == "success":
             data = res["data"]
@@ -396,6 +392,7 @@ async def link_shortener_node(state: MarketingState) -> MarketingState:
                     logging.warning(f"   ⚠️ Could not map Linkly result for {c_email} back to a Contact ID")
 
             ctx["short_links_map"] = short_links_map
+            emit_progress(f"Generated tracked links for {len(short_links_map)} contacts", done=len(short_links_map), total=len(linkly_contacts))
             state = _update_mcp_results(state, LINKLY_SERVICE, "generate_uniqueurl", res)
             
         else:
@@ -538,35 +535,50 @@ async def send_email_node(state: MarketingState) -> MarketingState:
         "sender_email": "aleenamathews2001@gmail.com", 
         "sender_name": "Aleena Mathews"
     }
-    
+    # Journal the send per (campaign, template, run) so a retry of this run after a crash resumes
+    # instead of double-sending to recipients Brevo already accepted
+    if ctx.get("campaign_id"):
+        send_args["campaign_id"] = ctx["campaign_id"]
+        if ctx.get("send_run_id"):
+            send_args["run_id"] = ctx["send_run_id"]
+    
+    progress_message = f"Sending email to {len(recipients)} recipients"
+    emit_progress(progress_message, total=len(recipients))
     try:
-        res = await execute_single_tool(BREVO_SERVICE, "send_batch_emails", send_args)
+        res = await execute_single_tool(BREVO_SERVICE, "send_batch_emails", send_args, progress_callback=tool_progress(progress_message))
         if res["status"] == "success":
-            logging.info("   ✅ Batch email sent successfully")
             send_data = res["data"]
+            if isinstance(send_data, dict) and send_data.get("status") in ("partial_success", "error"):
+                logging.warning(f"   ⚠️ Batch email send finished with status '{send_data.get('status')}'")
+            else:
+                logging.info("   ✅ Batch email sent successfully")
             
             # --- Parsing Logic Restored ---
             successfully_sent_emails = set()
             failed_sends = {}
+            message_ids_by_email = {}
+            recipient_emails = [r["email"].lower() for r in recipients if r.get("email")]
             
             # Parse Brevo response - handle multiple possible formats
             if isinstance(send_data, dict):
-                # Format 1: {"success": [...], "failed": [...]}
+                # Format 1: {"success": [...], "failed": [...]} (per-recipient status from chunked sends)
                 success_list = send_data.get("success", [])
                 failed_list = send_data.get("failed", [])
                 
-                # Format 2: {"messageIds": ["<id1>", "<id2>"], ...} - indicates all succeeded
+                # Format 2: {"messageIds": ["<id1>", "<id2>"], ...} - one id per accepted messageVersion
                 message_ids = send_data.get("messageIds", [])
                 
                 # Process success list if present
-                if success_list:
+                if isinstance(success_list, list):
                     for item in success_list:
                         email = item.get("email", "").lower() if isinstance(item, dict) else str(item).lower()
                         if email:
                             successfully_sent_emails.add(email)
+                            if isinstance(item, dict) and item.get("message_id"):
+                                message_ids_by_email[email] = item["message_id"]
                 
                 # Process failed list if present
-                if failed_list:
+                if isinstance(failed_list, list):
                     for item in failed_list:
                         if isinstance(item, dict):
                             email = item.get("email", "").lower()
@@ -579,21 +591,33 @@ async def send_email_node(state: MarketingState) -> MarketingState:
                             failed_sends[email] = error
                             logging.warning(f"   ❌ Email failed for {email}: {error}")
                 
-                # Format 3: If messageIds present but no explicit success/failed lists
-                # This means Brevo accepted all emails for sending
+                # Format 3: Only messageIds - accept only when there is exactly one id per recipient
                 if message_ids and not success_list and not failed_list:
-                    logging.info(f"   ℹ️ Brevo returned {len(message_ids)} messageIds - all emails accepted")
-                    # We need to map back to emails since messageIds don't contain them
-                    successfully_sent_emails = set([r["email"].lower() for r in recipients if r.get("email")])
+                    if len(message_ids) == len(recipient_emails):
+                        logging.info(f"   ℹ️ Brevo returned {len(message_ids)} messageIds - all emails accepted")
+                        successfully_sent_emails = set(recipient_emails)
+                    else:
+                        logging.warning(f"   ⚠️ Brevo returned {len(message_ids)} messageIds for {len(recipient_emails)} recipients")
             
-            # Fallback: If response format is unexpected, assume all succeeded
-            if not successfully_sent_emails and not failed_sends:
-                logging.info("   ℹ️ Brevo response format not recognized, assuming all sent successfully")
-                successfully_sent_emails = set([r["email"].lower() for r in recipients if r.get("email")])
+            # Unknown format or recipients missing from both lists: do NOT assume they were sent.
+            # They are recorded as unconfirmed so Salesforce status is left untouched for them.
+            # Chunks that hit a 5xx/timeout are reported separately; they may have been delivered
+            unconfirmed_errors = {
+                (item.get("email") or "").lower(): item.get("error")
+                for item in (send_data.get("unconfirmed") or [] if isinstance(send_data, dict) else [])
+                if isinstance(item, dict)
+            }
+            unconfirmed = [e for e in recipient_emails if e not in successfully_sent_emails and e not in failed_sends]
+            if unconfirmed:
+                logging.warning(f"   ⚠️ {len(unconfirmed)} recipient(s) have no confirmed send status")
+                for email in unconfirmed:
+                    reason = unconfirmed_errors.get(email) or "send status not reported by Brevo"
+                    failed_sends[email] = f"Unconfirmed: {reason}"
             
             ctx["send_result"] = send_data
             ctx["successfully_sent_emails"] = successfully_sent_emails
             ctx["failed_sends"] = failed_sends
+            ctx["message_ids_by_email"] = message_ids_by_email
             
             logging.info(f"   📊 Parsed Send Results: {len(successfully_sent_emails)} sent, {len(failed_sends)} failed")
             
@@ -610,7 +634,9 @@ async def send_email_node(state: MarketingState) -> MarketingState:
 
 async def track_delivery_status_node(state: MarketingState) -> MarketingState:
     """
-    detects bounced emails immediately after sending using the track_email_engagement tool.
+    detects bounced emails immediately after sending.
+    Webhook events already in the local event store are used directly; only emails the
+    store has nothing on go through the track_email_engagement tool.
     Bounced emails are moved from successfully_sent_emails to failed_sends.
     """
     logging.info("🕵️ [EmailWorkflow] Step 4.5: Checking Immediate Delivery/Bounce Status")
@@ -627,19 +653,43 @@ async def track_delivery_status_node(state: MarketingState) -> MarketingState:
         
     # Convert set to list for API call
     emails_to_check = list(successfully_sent)
-    
-    # We call track_email_engagement
+    bounced_detected = []
+
+    # Answer from webhook events for this send's message ids where we have them
+    message_ids = list(set((ctx.get("message_ids_by_email") or {}).values()) - {None})
+    if message_ids:
+        try:
+            stored = event_store.events_by_email(emails_to_check, message_ids=message_ids)
+        except Exception as e:
+            logging.warning(f"   ⚠️ Event store lookup failed: {e}")
+            stored = {}
+        bounce_events = {"hard_bounce", "softBounces", "invalid_email", "blocked"}
+        for email in list(emails_to_check):
+            events = stored.get(email.lower())
+            if not events:
+                continue
+            emails_to_check.remove(email)
+            if any(ev.get("event") in bounce_events for ev in events):
+                bounced_detected.append(email)
+                logging.warning(f"   🚨 Detected BOUNCE for {email} (webhook)")
+        if stored:
+            logging.info(f"   🗄️ Event store answered for {len(successfully_sent) - len(emails_to_check)} email(s)")
+
+    # We call track_email_engagement for the rest
     # It returns { "engagement": { "email": { "bounced": bool, ... } } }
     
     try:
-        logging.info(f"   🔍 Checking status for {len(emails_to_check)} emails...")
-        res = await execute_single_tool(BREVO_SERVICE, "track_email_engagement", {"emails": emails_to_check})
-        
-        if res["status"] == "success":
-            data = res["data"]
-            engagement = data.get("engagement", {})
-            
-            bounced_detected = []
+        res = None
+        if emails_to_check:
+            logging.info(f"   🔍 Checking status for {len(emails_to_check)} emails...")
+            # Bulk mode: events for this template from today, bucketed by email server-side
+            track_args = {"emails": emails_to_check, "days": 1}
+            if ctx.get("template_id"):
+                track_args["template_id"] = int(ctx["template_id"])
+            res = await execute_single_tool(BREVO_SERVICE, "track_email_engagement", track_args)
+        
+        if res is None or res["status"] == "success":
+            engagement = res["data"].get("engagement", {}) if res else {}
             
             for email, metrics in engagement.items():
                 # metrics might be an error dict if email invalid, or data dict
@@ -657,7 +707,8 @@ async def track_delivery_status_node(state: MarketingState) -> MarketingState:
             ctx["failed_sends"] = failed_sends
             
             logging.info(f"   ✅ Delivery check complete. Found {len(bounced_detected)} bounces.")
-            state = _update_mcp_results(state, BREVO_SERVICE, "track_email_engagement", res)
+            if res:
+                state = _update_mcp_results(state, BREVO_SERVICE, "track_email_engagement", res)
             
         else:
             logging.warning(f"   ⚠️ Delivery check failed: {res.get('error')}")
@@ -682,6 +733,15 @@ async def update_salesforce_node(state: MarketingState) -> MarketingState:
     successfully_sent_emails = ctx.get("successfully_sent_emails", set())
     failed_sends = ctx.get("failed_sends", {})
 
+    if campaign_id and successfully_sent_emails:
+        # Let the background engagement sync start tracking this campaign
+        try:
+            engagement_store.register_campaign(campaign_id)
+            # Lets engagement scoring attribute Brevo events to this campaign's send
+            engagement_store.record_messages(campaign_id, ctx.get("message_ids_by_email") or {})
+        except Exception as e:
+            logging.warning(f"   ⚠️ Could not register campaign for engagement sync: {e}")
+
     # We need to update CampaignMember status.
     # Record structure: {CampaignId, ContactId, Status="Sent", ...}
     
@@ -800,6 +860,7 @@ async def update_salesforce_node(state: MarketingState) -> MarketingState:
         "records": records_to_upsert
     }
     
+    emit_progress(f"Updating {len(records_to_upsert)} CampaignMembers in Salesforce", total=len(records_to_upsert))
     try:
         res = await execute_single_tool(SALESFORCE_SERVICE, "upsert_salesforce_records", upsert_args)
         
@@ -1,48 +1,70 @@
+import asyncio
 import logging
+import os
 import re
 from typing import Dict, Any, List
 from langgraph.graph import StateGraph, END
 from core.state import MarketingState
 from baseagent import get_member_dependency, execute_single_tool
 from langchain_core.messages import AIMessage
+from core.engagement_store import engagement_store
+from core.result_store import materialize, compact_result_sets, is_handle, first_record
+from core.tool_results import record_tool_result
+from core.progress import emit_progress
+from core.engagement_scoring import signal_stream, score_members, changed_members, update_fields
+from mcp_module.Brevomcp.client.event_store import event_store
 
 # Constants
 LINKLY_SERVICE = "Linkly MCP"
 SALESFORCE_SERVICE = "Salesforce MCP"
+# ctx keys summary_node reads; persisted so a precomputed run can be replayed
+SUMMARY_CONTEXT_KEYS = (
+    "target_campaign_id", "members_who_clicked", "total_clicks_found", "update_summary", "updated_count", "scoring_summary"
+)
+# CampaignMember records per upsert_salesforce_records call
+UPSERT_BATCH_SIZE = int(os.getenv("ENGAGEMENT_UPSERT_BATCH_SIZE", "1000"))
 
 def _update_mcp_results(state: MarketingState, service_name: str, tool_name: str, result: Dict[str, Any], summary_text: str = None):
     """
     Manually update mcp_results so the Orchestrator sees the work.
     """
-    mcp_results = state.get("mcp_results", {}) or {}
-    service_data = mcp_results.get(service_name, {"execution_summary": {}, "tool_results": []})
-    
-    # Update stats
-    summary = service_data.get("execution_summary", {})
-    summary["total_calls"] = summary.get("total_calls", 0) + 1
-    if result.get("status") == "success":
-        summary["successful_calls"] = summary.get("successful_calls", 0) + 1
-    else:
-        summary["failed_calls"] = summary.get("failed_calls", 0) + 1
-    service_data["execution_summary"] = summary
-        
-    # Append result
-    tool_res = {
-        "tool_name": tool_name,
-        "status": result.get("status", "unknown"),
-        "response": result.get("data", str(result)), 
+    return record_tool_result(state, service_name, tool_name, result, summary_text)
+
+def _normalize_link_ids(values: List[Any]) -> List[str]:
+    """LinkId__c comes back from Salesforce as a float (e.g. 12345.0); Linkly keys are integer strings."""
+    out = []
+    for v in values:
+        if isinstance(v, float) and v.is_integer():
+            out.append(str(int(v)))
+        else:
+            s = str(v)
+            out.append(s[:-2] if s.endswith(".0") else s)
+    return out
+
+
+def _member_columns(rows: List[Dict[str, Any]], require_link: bool = True) -> Dict[str, List[Any]]:
+    """
+    Split member rows into columns (by default only rows with a LinkId__c).
+    Field names for flattened email/name columns are resolved once from the
+    first row instead of scanning every row's keys.
+    """
+    rows = [r for r in rows if isinstance(r, dict) and (r.get("LinkId__c") or not require_link)]
+    if not rows:
+        return {"link_id": [], "member_id": [], "email": [], "name": [], "status": []}
+    keys = list(rows[0].keys())
+    email_key = next((k for k in keys if "email" in k.lower()), None)
+    name_key = next((k for k in keys if "name" in k.lower() and "contact" in k.lower()), None)
+    contacts = [r.get("Contact") if isinstance(r.get("Contact"), dict) else {} for r in rows]
+    links = [r.get("LinkId__c") for r in rows]
+    normalized = iter(_normalize_link_ids([l for l in links if l]))
+    return {
+        "link_id": [next(normalized) if l else None for l in links],
+        "member_id": [r.get("Id") for r in rows],
+        "email": [c.get("Email") or (r.get(email_key) if email_key else None) for r, c in zip(rows, contacts)],
+        "name": [c.get("Name") or (r.get(name_key) if name_key else None) for r, c in zip(rows, contacts)],
+        "status": [r.get("Status") for r in rows],
     }
-    
-    # Inject summary into 'request' so it appears in Orchestrator progress_summary
-    if summary_text:
-        tool_res["request"] = {"Summary": summary_text}
-        
-    service_data["tool_results"].append(tool_res)
-    
-    # Write back
-    mcp_results[service_name] = service_data
-    state["mcp_results"] = mcp_results
-    return state
+
 
 async def fetch_missing_data_node(state: MarketingState) -> MarketingState:
     logging.info("🕵️ [EngagementWorkflow] Step 0: Resolving Target Data")
@@ -74,9 +96,9 @@ async def fetch_missing_data_node(state: MarketingState) -> MarketingState:
         campaign_data = shared_data.get("campaign") or shared_data.get("campaigns")
         
         if campaign_data:
-            # Handle list or single item
-            if isinstance(campaign_data, list) and campaign_data:
-                found_campaign_id = campaign_data[0].get("Id")
+            # Handle list, stored set or single item
+            if isinstance(campaign_data, list) or is_handle(campaign_data):
+                found_campaign_id = (first_record(campaign_data) or {}).get("Id")
             elif isinstance(campaign_data, dict):
                 found_campaign_id = campaign_data.get("Id")
             
@@ -120,6 +142,23 @@ async def fetch_missing_data_node(state: MarketingState) -> MarketingState:
             except Exception as e:
                 logging.error(f"   ❌ Error searching for campaign: {e}")
     # ============================================================================
+    # STEP 1b: Serve the background sync's precomputed summary when it is fresh
+    # ============================================================================
+    if found_campaign_id and not ctx.get("background_sync"):
+        try:
+            engagement_store.register_campaign(found_campaign_id)
+            precomputed = None if "refresh" in user_goal else engagement_store.get_summary(found_campaign_id)
+        except Exception as e:
+            logging.warning(f"   ⚠️ Engagement store unavailable: {e}")
+            precomputed = None
+        if precomputed:
+            logging.info(f"   ⚡ Using precomputed engagement summary for {found_campaign_id}")
+            ctx.update(precomputed["context"])
+            ctx["precomputed_at"] = precomputed["computed_at"]
+            state["engagement_workflow_context"] = ctx
+            return state
+
+    # ============================================================================
     # STEP 2: If we have Campaign ID, fetch CampaignMembers (if not already loaded)
     # ============================================================================
     if found_campaign_id and not campaign_members:
@@ -145,19 +184,6 @@ async def fetch_missing_data_node(state: MarketingState) -> MarketingState:
                 
                 logging.info(f"   ✅ Fetched {len(campaign_members)} CampaignMembers")
                 
-                # Log details for debugging
-                for idx, member in enumerate(campaign_members):
-                    if isinstance(member, dict):
-                        link_id = member.get("LinkId__c")
-                        status = member.get("Status")
-                        
-                        # Extract contact info
-                        contact = member.get("Contact", {})
-                        email = contact.get("Email") if isinstance(contact, dict) else None
-                        name = contact.get("Name") if isinstance(contact, dict) else None
-                        
-                        logging.info(f"   📋 Member {idx + 1}: ID={member.get('Id')}, LinkId={link_id}, Status={status}, Contact={name} ({email})")
-                
                 # Update MCP results
                 _update_mcp_results(state, SALESFORCE_SERVICE, "run_dynamic_soql", res, f"Fetched {len(campaign_members)} members")
             else:
@@ -172,23 +198,16 @@ async def fetch_missing_data_node(state: MarketingState) -> MarketingState:
     # ============================================================================
     target_link_ids = []
     if campaign_members:
-        for member in campaign_members:
-            if isinstance(member, dict):
-                link_id = member.get("LinkId__c")
-                if link_id:
-                    # Normalize: remove .0 if present
-                    link_id_str = str(link_id)
-                    if link_id_str.endswith(".0"):
-                        link_id_str = link_id_str[:-2]
-                    target_link_ids.append(link_id_str)
-        
-        logging.info(f"   🔗 Extracted {len(target_link_ids)} Link IDs: {target_link_ids}")
+        target_link_ids = _member_columns(campaign_members)["link_id"]
+        logging.info(f"   🔗 Extracted {len(target_link_ids)} Link IDs from {len(campaign_members)} members")
     
     # ============================================================================
     # STEP 4: Store results in state
     # ============================================================================
     if campaign_members:
-        state.setdefault("shared_result_sets", {})["campaign_members"] = campaign_members
+        shared = dict(state.get("shared_result_sets") or {})
+        shared["campaign_members"] = campaign_members
+        state["shared_result_sets"] = compact_result_sets(shared)
     
     if target_link_ids:
         ctx["target_link_ids"] = target_link_ids
@@ -226,10 +245,10 @@ async def track_clicks_node_v2(state: MarketingState) -> MarketingState:
     # Build Link ID → Member mapping
     link_to_member_map = {}  # {link_id: {member_id, email, status}}
     
-    potential_lists = [shared_data.get("campaign_members"), shared_data.get("contacts")]
     found_members = []
     
-    for lst in potential_lists:
+    for key in ("campaign_members", "contacts"):
+        lst = materialize(shared_data.get(key))
         if lst and isinstance(lst, list) and len(lst) > 0:
             if isinstance(lst[0], dict):
                 found_members = lst
@@ -239,59 +258,18 @@ async def track_clicks_node_v2(state: MarketingState) -> MarketingState:
         # Update campaign ID if we missed it
         if not target_campaign_id:
              target_campaign_id = found_members[0].get("CampaignId")
-             
-        for row in found_members:
-            if not isinstance(row, dict):
-                logging.warning(f"   ⚠️ Skipping non-dict row: {row}")
-                continue
-            
-            # Extract name and email safely
-            c_email = None
-            c_name = None
-            try:
-                contact_obj = row.get("Contact")
-                if contact_obj and isinstance(contact_obj, dict):
-                    c_email = contact_obj.get("Email")
-                    c_name = contact_obj.get("Name")
-                
-                # Fallback: check for flattened fields
-                if not c_email:
-                    for key in row.keys():
-                        if 'email' in key.lower():
-                            c_email = row.get(key)
-                            break
-                            
-                if not c_name:
-                    for key in row.keys():
-                        if 'name' in key.lower() and 'contact' in key.lower():
-                             # e.g. Contact.Name
-                            c_name = row.get(key)
-                            break
-                            
-            except Exception as e:
-                logging.warning(f"   ⚠️ Error extracting contact details: {e}")
-            
-            member_id = row.get("Id")
-            status = row.get("Status")
-            link_id = row.get("LinkId__c")
-            
-            # Map by Link ID (this is the key!)
-            if link_id:
-                # Normalize: remove .0 if present to match Linkly's integer strings
-                lid_str = str(link_id)
-                if lid_str.endswith(".0"):
-                    lid_str = lid_str[:-2]
-                    
-                link_to_member_map[lid_str] = {
-                    "member_id": member_id,
-                    "email": c_email,
-                    "name": c_name or "Unknown Member",
-                    "status": status
-                }
-                logging.info(f"   🔗 Mapped Link {link_id} → {c_name} (ID: {member_id})")
-        
-        logging.info(f"   🗺️ Built Link→Member map with {len(link_to_member_map)} entries")
-        logging.info(f"   📊 Link IDs in Salesforce: {list(link_to_member_map.keys())}")
+
+        cols = _member_columns(found_members)
+        link_to_member_map = {
+            lid: {"member_id": mid, "email": email, "name": name or "Unknown Member", "status": status}
+            for lid, mid, email, name, status in zip(
+                cols["link_id"], cols["member_id"], cols["email"], cols["name"], cols["status"]
+            )
+        }
+        logging.info(
+            f"   🗺️ Built Link→Member map with {len(link_to_member_map)} entries "
+            f"({len(found_members) - len(cols['link_id'])} member(s) without a link)"
+        )
     else:
         logging.warning("   ⚠️ No CampaignMember records found in shared data")
                  
@@ -308,6 +286,11 @@ async def track_clicks_node_v2(state: MarketingState) -> MarketingState:
     
     if not track_args.get("link_ids") and target_campaign_id:
         track_args["campaign_id"] = target_campaign_id
+
+    # Only fetch clicks since the last check of this campaign; totals come from Linkly MCP's click ledger
+    if target_campaign_id:
+        track_args["incremental"] = True
+        track_args["cursor_key"] = target_campaign_id
         
     if not track_args:
         logging.error("   ❌ Missing Campaign ID or Link IDs. Cannot track.")
@@ -324,41 +307,25 @@ async def track_clicks_node_v2(state: MarketingState) -> MarketingState:
             data = res["data"]
             clicks_per_link = data.get("clicks_per_link", {}) or {}
             
-            logging.info(f"   🔍 Linkly click data per link: {clicks_per_link}")
+            # Join clicked links against the member map in one pass over the key sets
+            clicked = {str(k): v for k, v in clicks_per_link.items() if v and v > 0}
+            matched = clicked.keys() & link_to_member_map.keys()
+            members_who_clicked = [
+                {**link_to_member_map[lid], "link_id": lid, "click_count": clicked[lid]}
+                for lid in sorted(matched)
+            ]
+            unmatched = len(clicked) - len(matched)
+            logging.info(f"   🎯 {len(clicked)} link(s) with clicks, {len(matched)} matched to CampaignMembers")
+            if unmatched:
+                logging.warning(f"   ⚠️ {unmatched} clicked link(s) have no matching CampaignMember in Salesforce")
             
-            # Match clicked links to CampaignMembers
-            members_who_clicked = []  # List of {member_id, email, status, link_id, click_count}
-            
-            for link_id_str, click_count in clicks_per_link.items():
-                if click_count > 0:
-                    logging.info(f"   🎯 Link {link_id_str} has {click_count} click(s)")
-                    
-                    # Look up the member who owns this link
-                    member_info = link_to_member_map.get(str(link_id_str))
-                    
-                    if member_info:
-                        member_id = member_info.get("member_id")
-                        email = member_info.get("email")
-                        status = member_info.get("status")
-                        
-                        c_name = member_info.get("name")
-                        
-                        members_who_clicked.append({
-                            "member_id": member_id,
-                            "email": email,
-                            "name": c_name,
-                            "status": status,
-                            "link_id": link_id_str,
-                            "click_count": click_count
-                        })
-                        
-                        logging.info(f"   ✅ MATCH FOUND: Link {link_id_str} → Member {member_id} (Email: {email}, Status: {status})")
-                    else:
-                        logging.warning(f"   ⚠️ Link {link_id_str} has clicks but NO matching CampaignMember found in Salesforce")
-                        logging.warning(f"   Available Link IDs in map: {list(link_to_member_map.keys())}")
-            
-            # Store results
+            # Store results; the scoring step merges these with Brevo events
             ctx["members_who_clicked"] = members_who_clicked
+            ctx["clicks_per_link"] = {str(k): v for k, v in clicks_per_link.items()}
+            ctx["last_click_per_link"] = {str(k): v for k, v in (data.get("last_click_per_link") or {}).items()}
+            if data.get("incremental"):
+                new_clicks = sum((data.get("new_clicks_per_link") or {}).values())
+                logging.info(f"   🧾 {new_clicks} new click(s) since last check")
             ctx["total_clicks_found"] = sum(clicks_per_link.values())
             
             summary_msg = f"Found {len(members_who_clicked)} member(s) who clicked"
@@ -386,69 +353,126 @@ async def track_clicks_node_v2(state: MarketingState) -> MarketingState:
     state["engagement_workflow_context"] = ctx
     return state
 
-async def update_engagement_node(state: MarketingState) -> MarketingState:
-    logging.info("☁️ [EngagementWorkflow] Step 2: Updating CampaignMember Status in Salesforce")
-    
+async def score_engagement_node(state: MarketingState) -> MarketingState:
+    logging.info("📈 [EngagementWorkflow] Step 2: Scoring Engagement (Brevo events + Linkly clicks)")
+
     ctx = state.get("engagement_workflow_context", {})
-    members_who_clicked = ctx.get("members_who_clicked", [])
-    
-    if not members_who_clicked:
-        logging.info("   ℹ️ No members to update (no clicks found).")
-        ctx["update_summary"] = "No clicks detected, no updates needed."
+    campaign_id = ctx.get("target_campaign_id")
+    members = materialize((state.get("shared_result_sets") or {}).get("campaign_members")) or []
+    cols = _member_columns(members, require_link=False)
+
+    if not campaign_id or not cols["member_id"]:
+        ctx["members_to_update"] = []
         state["engagement_workflow_context"] = ctx
         return state
-        
-    records_to_update = []
-    
-    for member_data in members_who_clicked:
-        member_id = member_data.get("member_id")
-        email = member_data.get("email")
-        current_status = member_data.get("status")
-        link_id = member_data.get("link_id")
-        click_count = member_data.get("click_count")
-        
-        # Only update if status is NOT already "Responded"
-        if current_status != "Responded":
-            records_to_update.append({
-                "record_id": member_id,
-                "fields": {
-                    "Status": "Responded"
-                }
-            })
-            logging.info(f"   📝 Queuing update: Member {member_id} (Email: {email}, Link: {link_id}) - {current_status} → Responded ({click_count} clicks)")
-        else:
-            logging.info(f"   ⏭️ Skipping Member {member_id} (Email: {email}): already Responded")
 
-    if not records_to_update:
-        logging.info("   ℹ️ All clicked members already have 'Responded' status.")
-        ctx["update_summary"] = "All members already marked as Responded."
+    try:
+        message_ids_by_email = engagement_store.message_ids(campaign_id)
+        previous = engagement_store.member_scores(campaign_id)
+        emails = [e.lower() for e in cols["email"] if e and e.lower() in message_ids_by_email]
+        brevo_events = await asyncio.to_thread(event_store.events_by_email, emails) if emails else {}
+    except Exception as e:
+        logging.warning(f"   ⚠️ Engagement store unavailable, scoring Linkly clicks only: {e}")
+        message_ids_by_email, previous, brevo_events = {}, {}, {}
+
+    signals = signal_stream(
+        brevo_events, message_ids_by_email,
+        ctx.get("clicks_per_link") or {}, ctx.get("last_click_per_link") or {}
+    )
+    scores = score_members(cols, signals)
+    changed = changed_members(cols, scores, previous)
+
+    # Anyone who clicked, in email or on their Linkly link, for the summary
+    ctx["members_who_clicked"] = [
+        {
+            "member_id": cols["member_id"][i], "email": cols["email"][i], "name": cols["name"][i] or "Unknown Member",
+            "status": cols["status"][i], "link_id": cols["link_id"][i],
+            "click_count": acc["linkly_clicks"] + acc["email_clicks"]
+        }
+        for i, acc in scores.items() if acc["linkly_clicks"] + acc["email_clicks"] > 0
+    ]
+    ctx["total_clicks_found"] = max(
+        ctx.get("total_clicks_found", 0), sum(m["click_count"] for m in ctx["members_who_clicked"])
+    )
+    ctx["members_to_update"] = changed
+    ctx["scoring_summary"] = (
+        f"Scored {len(scores)} engaged member(s) out of {len(cols['member_id'])}; {len(changed)} changed since the last run."
+    )
+    logging.info(f"   📈 {ctx['scoring_summary']} ({sum(len(v) for v in brevo_events.values())} Brevo event(s))")
+
+    state["engagement_workflow_context"] = ctx
+    return state
+
+async def update_engagement_node(state: MarketingState) -> MarketingState:
+    logging.info("☁️ [EngagementWorkflow] Step 3: Writing Changed Engagement to Salesforce")
+    
+    ctx = state.get("engagement_workflow_context", {})
+    campaign_id = ctx.get("target_campaign_id")
+    members_to_update = ctx.get("members_to_update", [])
+    
+    if not members_to_update:
+        logging.info("   ℹ️ No engagement changes since the last run.")
+        ctx["update_summary"] = (
+            "All members already marked as Responded." if ctx.get("members_who_clicked")
+            else "No clicks detected, no updates needed."
+        )
         state["engagement_workflow_context"] = ctx
         return state
-        
-    logging.info(f"   🚀 Updating {len(records_to_update)} CampaignMember record(s)...")
 
-    upsert_args = {
-        "object_name": "CampaignMember",
-        "records": records_to_update
-    }
-    
     try:
-        res = await execute_single_tool(SALESFORCE_SERVICE, "upsert_salesforce_records", upsert_args)
-        
+        previous = engagement_store.member_scores(campaign_id) if campaign_id else {}
+    except Exception:
+        previous = {}
+
+    records_to_update, pending = [], []
+    local_only = []
+    for member in members_to_update:
+        fields = update_fields(member, previous.get(member["member_id"]))
+        if fields:
+            records_to_update.append({"record_id": member["member_id"], "fields": fields})
+            pending.append(member)
+        else:
+            # Score moved but no Salesforce field is configured for it
+            local_only.append(member)
+
+    status_changes = sum(1 for r in records_to_update if "Status" in r["fields"])
+    logging.info(f"   🚀 Updating {len(records_to_update)} CampaignMember record(s) ({status_changes} status change(s))")
+
+    updated = 0
+    errors = []
+    for start in range(0, len(records_to_update), UPSERT_BATCH_SIZE):
+        batch = records_to_update[start:start + UPSERT_BATCH_SIZE]
+        try:
+            res = await execute_single_tool(
+                SALESFORCE_SERVICE, "upsert_salesforce_records", {"object_name": "CampaignMember", "records": batch}
+            )
+        except Exception as e:
+            logging.error(f"   ❌ Salesforce update exception: {e}")
+            errors.append(str(e))
+            continue
         if res["status"] == "success":
-            logging.info(f"   ✅ Successfully updated {len(records_to_update)} CampaignMember(s) to 'Responded'")
-            state = _update_mcp_results(state, SALESFORCE_SERVICE, "upsert_salesforce_records", res, f"Updated {len(records_to_update)} records to Responded")
-            ctx["update_summary"] = f"Successfully updated {len(records_to_update)} CampaignMembers to 'Responded'."
-            ctx["updated_count"] = len(records_to_update)
+            updated += len(batch)
+            state = _update_mcp_results(state, SALESFORCE_SERVICE, "upsert_salesforce_records", res, f"Updated {len(batch)} CampaignMember records")
+            if campaign_id:
+                engagement_store.save_member_scores(campaign_id, pending[start:start + UPSERT_BATCH_SIZE])
         else:
             logging.warning(f"   ⚠️ Salesforce update failed: {res.get('error')}")
-            ctx["update_error"] = res.get("error")
-            ctx["update_summary"] = f"Update failed: {res.get('error')}"
+            errors.append(str(res.get("error")))
+        emit_progress(
+            f"Updated {updated} of {len(records_to_update)} CampaignMembers",
+            done=updated, total=len(records_to_update), failed_batches=len(errors)
+        )
 
-    except Exception as e:
-        logging.error(f"   ❌ Salesforce update exception: {e}")
-        ctx["update_error"] = str(e)
-        ctx["update_summary"] = f"Update exception: {e}"
+    if campaign_id and local_only:
+        engagement_store.save_member_scores(campaign_id, local_only)
+
+    ctx["updated_count"] = updated
+    if errors:
+        ctx["update_error"] = errors[0]
+        ctx["update_summary"] = f"Updated {updated} of {len(records_to_update)} CampaignMembers; {len(errors)} batch(es) failed: {errors[0]}"
+    else:
+        ctx["update_summary"] = f"Successfully updated {updated} CampaignMembers ({status_changes} set to 'Responded')."
+    logging.info(f"   ✅ {ctx['update_summary']}")
 
     state["engagement_workflow_context"] = ctx
     return state
@@ -457,7 +481,7 @@ async def summary_node(state: MarketingState) -> MarketingState:
     """
     Final node to generate summary and ensure workflow termination.
     """
-    logging.info("🏁 [EngagementWorkflow] Step 3: Summary & Completion")
+    logging.info("🏁 [EngagementWorkflow] Step 4: Summary & Completion")
     
     ctx = state.get("engagement_workflow_context", {})
     
@@ -508,11 +532,21 @@ async def summary_node(state: MarketingState) -> MarketingState:
     else:
         msg = "I checked for engagement, but I didn't find any clicks for this campaign yet."
 
+    if ctx.get("scoring_summary"):
+        msg += f"\n\n📈 {ctx['scoring_summary']}"
+
     if error:
         msg += f"\n\n⚠️ {error}"
     if update_error:
         msg += f"\n\n⚠️ Update Issue: {update_error}"
         
+    campaign_id = ctx.get("target_campaign_id")
+    if campaign_id and not error and not update_error and not ctx.get("precomputed_at"):
+        try:
+            engagement_store.save_summary(campaign_id, msg, {k: ctx[k] for k in SUMMARY_CONTEXT_KEYS if k in ctx})
+        except Exception as e:
+            logging.warning(f"   ⚠️ Could not save engagement summary: {e}")
+
     logging.info(f"\n{msg}")
     
     # Return AIMessage to signal completion
@@ -523,15 +557,21 @@ def build_engagement_workflow():
     
     builder.add_node("fetch_data", fetch_missing_data_node)
     builder.add_node("track_clicks", track_clicks_node_v2)
+    builder.add_node("score_engagement", score_engagement_node)
     builder.add_node("update_engagement", update_engagement_node)
     builder.add_node("summary_node", summary_node)
 
     # Set Entry Point
     builder.set_entry_point("fetch_data")
     
-    # Linear Flow
-    builder.add_edge("fetch_data", "track_clicks")
-    builder.add_edge("track_clicks", "update_engagement")
+    # Linear Flow (a fresh precomputed summary skips straight to the summary)
+    builder.add_conditional_edges(
+        "fetch_data",
+        lambda state: "summary_node" if (state.get("engagement_workflow_context") or {}).get("precomputed_at") else "track_clicks",
+        {"summary_node": "summary_node", "track_clicks": "track_clicks"}
+    )
+    builder.add_edge("track_clicks", "score_engagement")
+    builder.add_edge("score_engagement", "update_engagement")
     builder.add_edge("update_engagement", "summary_node")
     builder.add_edge("summary_node", END)
 
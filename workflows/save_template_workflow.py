@@ -2,7 +2,9 @@ import logging
 import json
 from langgraph.graph import StateGraph, END
 from core.state import MarketingState
+from core.result_store import materialize
 from baseagent import execute_single_tool
+from mcp_module.Salesforcemcp.client.sf_metadata_cache import field_metadata_cache
 from typing import Dict, Any, Optional
 import urllib.parse
 
@@ -284,6 +286,11 @@ async def ensure_picklist_value(object_name: str, field_name: str, value: str) -
     """
     logging.info(f"🛠️ Ensuring picklist value '{value}' exists in {object_name}.{field_name}")
 
+    # 0) Common case: value already known to exist -> no MCP process, no network
+    if field_metadata_cache.has_picklist_value(object_name, field_name, value):
+        logging.info(f"✅ Picklist value already exists (cached): '{value}'")
+        return True
+
     # DeveloperName is field api name without __c
     # Email_template__c -> Email_template
     dev_name = field_name.replace("__c", "")
@@ -326,6 +333,8 @@ async def ensure_picklist_value(object_name: str, field_name: str, value: str) -
 
     logging.info(f"✅ Found CustomField: {field_id}")
 
+    field_metadata_cache.put_from_tooling(object_name, field_name, metadata)
+
     # 2) Validate type
     field_type = metadata.get("type")
     if field_type not in ("Picklist", "MultiselectPicklist"):
@@ -382,6 +391,9 @@ async def ensure_picklist_value(object_name: str, field_name: str, value: str) -
         logging.error(f"❌ Tooling API error: {update_res.get('error')}")
         return False
 
+    # Cached values are stale now; the next check re-reads them from Salesforce
+    field_metadata_cache.invalidate(object_name, field_name)
+
     # PATCH often returns 204; if no explicit error, treat as success
     logging.info(f"✅ Successfully added/ensured '{value}' on {object_name}.{field_name}")
     return True
@@ -428,7 +440,7 @@ async def prepare_link_node(state: MarketingState) -> MarketingState:
     # ✅ DYNAMIC CAMPAIGN LOOKUP (Updated to remove hardcoding)
     # We look for ANY campaign in the shared state (assuming current context)
     shared_results = state.get("shared_result_sets", {})
-    campaigns = shared_results.get("campaign", [])
+    campaigns = materialize(shared_results.get("campaign", []))
     logging.info(f"campaign data: {campaigns}")
     
     # Fallback to key 'campaigns' (plural) if planner stored it that way